@@ -29,6 +29,14 @@ def get_url():
     return settings.database_url
 
 
+def include_object(object, name, type_, reflected, compare_to):
+    # schedules.time_slot is a generated column managed by migration 0002
+    # (PostgreSQL only); it is intentionally absent from the models.
+    if type_ == "column" and name == "time_slot" and reflected and compare_to is None:
+        return False
+    return True
+
+
 def run_migrations_offline() -> None:
     """Run migrations in 'offline' mode.
 
@@ -47,6 +55,7 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -70,7 +79,9 @@ def run_migrations_online() -> None:
 
     with connectable.connect() as connection:
         context.configure(
-            connection=connection, target_metadata=target_metadata
+            connection=connection,
+            target_metadata=target_metadata,
+            include_object=include_object,
         )
 
         with context.begin_transaction():
@@ -0,0 +1,134 @@
+"""initial schema
+
+Revision ID: 0001
+Revises: 
+Create Date: 2024-01-15 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'subjects',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=200), nullable=False),
+        sa.Column('acronym', sa.String(length=10), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('credits', sa.Integer(), nullable=False),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_subjects_id'), 'subjects', ['id'], unique=False)
+    op.create_index(op.f('ix_subjects_code'), 'subjects', ['code'], unique=True)
+
+    op.create_table(
+        'teachers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('employee_id', sa.String(length=20), nullable=False),
+        sa.Column('first_name', sa.String(length=100), nullable=False),
+        sa.Column('last_name', sa.String(length=100), nullable=False),
+        sa.Column('email', sa.String(length=200), nullable=False),
+        sa.Column('phone', sa.String(length=20), nullable=True),
+        sa.Column('department', sa.String(length=100), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('email'),
+    )
+    op.create_index(op.f('ix_teachers_id'), 'teachers', ['id'], unique=False)
+    op.create_index(op.f('ix_teachers_employee_id'), 'teachers', ['employee_id'], unique=True)
+
+    op.create_table(
+        'class_types',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('acronym', sa.String(length=10), nullable=False),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('color', sa.String(length=7), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('name'),
+        sa.UniqueConstraint('acronym'),
+    )
+    op.create_index(op.f('ix_class_types_id'), 'class_types', ['id'], unique=False)
+
+    op.create_table(
+        'classrooms',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('code', sa.String(length=20), nullable=False),
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('building', sa.String(length=100), nullable=True),
+        sa.Column('floor', sa.Integer(), nullable=True),
+        sa.Column('capacity', sa.Integer(), nullable=True),
+        sa.Column('description', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_classrooms_id'), 'classrooms', ['id'], unique=False)
+    op.create_index(op.f('ix_classrooms_code'), 'classrooms', ['code'], unique=True)
+
+    op.create_table(
+        'schedules',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('class_type_id', sa.Integer(), nullable=False),
+        sa.Column('classroom_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('day_of_week', sa.Integer(), nullable=False),
+        sa.Column('start_time', sa.Time(), nullable=False),
+        sa.Column('end_time', sa.Time(), nullable=False),
+        sa.Column('semester', sa.String(length=20), nullable=False),
+        sa.Column('week_start', sa.Date(), nullable=False),
+        sa.Column('week_end', sa.Date(), nullable=False),
+        sa.Column('notes', sa.Text(), nullable=True),
+        sa.Column('is_active', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['subject_id'], ['subjects.id']),
+        sa.ForeignKeyConstraint(['class_type_id'], ['class_types.id']),
+        sa.ForeignKeyConstraint(['classroom_id'], ['classrooms.id']),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_schedules_id'), 'schedules', ['id'], unique=False)
+
+    op.create_table(
+        'subject_teachers',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('subject_id', sa.Integer(), nullable=False),
+        sa.Column('teacher_id', sa.Integer(), nullable=False),
+        sa.Column('is_primary', sa.Boolean(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['subject_id'], ['subjects.id']),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id']),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_subject_teachers_id'), 'subject_teachers', ['id'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_subject_teachers_id'), table_name='subject_teachers')
+    op.drop_table('subject_teachers')
+    op.drop_index(op.f('ix_schedules_id'), table_name='schedules')
+    op.drop_table('schedules')
+    op.drop_index(op.f('ix_classrooms_code'), table_name='classrooms')
+    op.drop_index(op.f('ix_classrooms_id'), table_name='classrooms')
+    op.drop_table('classrooms')
+    op.drop_index(op.f('ix_class_types_id'), table_name='class_types')
+    op.drop_table('class_types')
+    op.drop_index(op.f('ix_teachers_employee_id'), table_name='teachers')
+    op.drop_index(op.f('ix_teachers_id'), table_name='teachers')
+    op.drop_table('teachers')
+    op.drop_index(op.f('ix_subjects_code'), table_name='subjects')
+    op.drop_index(op.f('ix_subjects_id'), table_name='subjects')
+    op.drop_table('subjects')
@@ -0,0 +1,83 @@
+"""schedule overlap exclusion constraints
+
+Stores each schedule slot as a time range and lets PostgreSQL reject
+overlapping active schedules for the same classroom or teacher within a
+semester and day. Existing overlapping active rows must be fixed before
+upgrading; find them with the same self-join the constraints use, e.g.
+
+    SELECT a.id, b.id FROM schedules a JOIN schedules b
+      ON a.id < b.id AND a.is_active AND b.is_active
+     AND a.semester = b.semester AND a.day_of_week = b.day_of_week
+     AND (a.classroom_id = b.classroom_id OR a.teacher_id = b.teacher_id)
+     AND a.start_time < b.end_time AND b.start_time < a.end_time;
+
+Rows whose end_time is not after start_time cannot be stored as a range:
+they are deactivated (and noted) before the column is added, and their
+time_slot is NULL so they never take part in the constraints. Other
+databases keep the application-level check.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2024-01-20 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS btree_gist')
+    # tsrange() rechaza un fin anterior al inicio: desactivar esos horarios
+    op.execute(
+        """
+        UPDATE schedules
+        SET is_active = false,
+            notes = concat_ws(' ', notes, '[Desactivado: hora de fin no posterior a la de inicio]')
+        WHERE end_time <= start_time AND is_active
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE schedules ADD COLUMN time_slot tsrange
+        GENERATED ALWAYS AS (
+            CASE WHEN end_time > start_time
+                THEN tsrange(DATE '2000-01-01' + start_time, DATE '2000-01-01' + end_time, '[)')
+            END
+        ) STORED
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE schedules ADD CONSTRAINT ex_schedules_classroom_overlap
+        EXCLUDE USING gist (
+            semester WITH =, day_of_week WITH =, classroom_id WITH =, time_slot WITH &&
+        ) WHERE (is_active)
+        """
+    )
+    op.execute(
+        """
+        ALTER TABLE schedules ADD CONSTRAINT ex_schedules_teacher_overlap
+        EXCLUDE USING gist (
+            semester WITH =, day_of_week WITH =, teacher_id WITH =, time_slot WITH &&
+        ) WHERE (is_active)
+        """
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+
+    op.execute('ALTER TABLE schedules DROP CONSTRAINT IF EXISTS ex_schedules_teacher_overlap')
+    op.execute('ALTER TABLE schedules DROP CONSTRAINT IF EXISTS ex_schedules_classroom_overlap')
+    op.execute('ALTER TABLE schedules DROP COLUMN IF EXISTS time_slot')
@@ -0,0 +1,33 @@
+"""change counters
+
+Per-scope version counters bumped in the same transaction as each write.
+They key the export cache and let every worker see the same data version.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2024-02-01 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_counters',
+        sa.Column('scope', sa.String(length=100), nullable=False),
+        sa.Column('version', sa.Integer(), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('scope'),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('change_counters')
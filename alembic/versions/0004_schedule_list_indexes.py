@@ -0,0 +1,30 @@
+"""schedule list indexes
+
+Composite indexes ending in id so that cursor pagination of the filtered
+schedule list (semester, teacher or subject) is an index range scan.
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2024-02-05 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_schedules_semester_id', 'schedules', ['semester', 'id'])
+    op.create_index('ix_schedules_teacher_id_id', 'schedules', ['teacher_id', 'id'])
+    op.create_index('ix_schedules_subject_id_id', 'schedules', ['subject_id', 'id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_schedules_subject_id_id', table_name='schedules')
+    op.drop_index('ix_schedules_teacher_id_id', table_name='schedules')
+    op.drop_index('ix_schedules_semester_id', table_name='schedules')
@@ -0,0 +1,26 @@
+"""schedule week range index
+
+Index on (week_start, week_end, day_of_week) used to pick the weekly
+templates that can have a class inside a date range.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2024-02-12 10:00:00.000000
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_schedules_week_range', 'schedules', ['week_start', 'week_end', 'day_of_week'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_schedules_week_range', table_name='schedules')
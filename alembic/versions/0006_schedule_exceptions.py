@@ -0,0 +1,52 @@
+"""schedule exceptions
+
+One-off changes (cancel, move, substitute teacher/room) to a single dated
+class of a weekly schedule, indexed by original and new date.
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2024-02-19 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0006'
+down_revision = '0005'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'schedule_exceptions',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('schedule_id', sa.Integer(), nullable=False),
+        sa.Column('date', sa.Date(), nullable=False),
+        sa.Column('kind', sa.String(length=20), nullable=False),
+        sa.Column('new_date', sa.Date(), nullable=True),
+        sa.Column('new_start_time', sa.Time(), nullable=True),
+        sa.Column('new_end_time', sa.Time(), nullable=True),
+        sa.Column('classroom_id', sa.Integer(), nullable=True),
+        sa.Column('teacher_id', sa.Integer(), nullable=True),
+        sa.Column('reason', sa.Text(), nullable=True),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=True),
+        sa.ForeignKeyConstraint(['schedule_id'], ['schedules.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['classroom_id'], ['classrooms.id']),
+        sa.ForeignKeyConstraint(['teacher_id'], ['teachers.id']),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint('schedule_id', 'date', name='uq_schedule_exceptions_schedule_date'),
+    )
+    op.create_index(op.f('ix_schedule_exceptions_id'), 'schedule_exceptions', ['id'], unique=False)
+    op.create_index('ix_schedule_exceptions_date', 'schedule_exceptions', ['date'])
+    op.create_index('ix_schedule_exceptions_new_date', 'schedule_exceptions', ['new_date'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_schedule_exceptions_new_date', table_name='schedule_exceptions')
+    op.drop_index('ix_schedule_exceptions_date', table_name='schedule_exceptions')
+    op.drop_index(op.f('ix_schedule_exceptions_id'), table_name='schedule_exceptions')
+    op.drop_table('schedule_exceptions')
@@ -0,0 +1,39 @@
+"""change log
+
+Cache invalidation events polled by every worker when the database has no
+LISTEN/NOTIFY (SQLite). On PostgreSQL events travel through pg_notify and
+this table stays empty.
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2024-02-26 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0007'
+down_revision = '0006'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'change_log',
+        sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column('table_name', sa.String(length=100), nullable=False),
+        sa.Column('row_id', sa.Integer(), nullable=True),
+        sa.Column('semester', sa.String(length=20), nullable=True),
+        sa.Column('origin', sa.String(length=32), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=True),
+        sa.PrimaryKeyConstraint('id'),
+    )
+    op.create_index(op.f('ix_change_log_created_at'), 'change_log', ['created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_change_log_created_at'), table_name='change_log')
+    op.drop_table('change_log')
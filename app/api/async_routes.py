@@ -0,0 +1,77 @@
+"""
+Modo asíncrono de los endpoints.
+
+Con `DATABASE_ASYNC` activo, cada endpoint síncrono que recibe `db` se publica
+como un endpoint `async` que obtiene una `AsyncSession` y ejecuta el cuerpo
+original con `AsyncSession.run_sync`. El código de los endpoints y servicios
+se escribe una sola vez contra `Session`, pero la E/S de base de datos pasa
+por el driver asíncrono (asyncpg o aiosqlite) en el bucle de eventos, sin
+ocupar hilos del threadpool.
+
+`run_sync` ejecuta el cuerpo completo en el hilo del bucle de eventos, así que
+solo conviene para endpoints cuyo trabajo es sobre todo E/S. Los que calculan
+mucho en Python (informes, calendarios, expansión de ocurrencias, clonado de
+semestres) se marcan con `cpu_bound` y siguen en el threadpool con la sesión
+síncrona, sin detener el bucle mientras calculan.
+
+Los endpoints sin `db`, los que ya son `async` y los marcados con `cpu_bound`
+se publican sin cambios.
+"""
+import functools
+import inspect
+from typing import Callable
+
+from fastapi import APIRouter, Depends
+from fastapi.routing import APIRoute
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import get_async_db
+
+_ROUTE_OPTIONS = (
+    "response_model", "status_code", "tags", "dependencies", "summary", "description",
+    "response_description", "responses", "deprecated", "methods", "operation_id",
+    "response_model_include", "response_model_exclude", "response_model_by_alias",
+    "response_model_exclude_unset", "response_model_exclude_defaults",
+    "response_model_exclude_none", "include_in_schema", "response_class", "name",
+    "openapi_extra", "generate_unique_id_function",
+)
+
+
+def cpu_bound(func: Callable) -> Callable:
+    """Marca un endpoint síncrono para que el modo asíncrono lo deje en el threadpool"""
+    func.cpu_bound = True
+    return func
+
+
+def asyncify(func: Callable) -> Callable:
+    """Versión `async` de un endpoint o dependencia síncronos con parámetro `db`"""
+    signature = inspect.signature(func)
+    if (inspect.iscoroutinefunction(func) or "db" not in signature.parameters
+            or getattr(func, "cpu_bound", False)):
+        return func
+
+    @functools.wraps(func)
+    async def wrapper(*args, db: AsyncSession, **kwargs):
+        return await db.run_sync(lambda session: func(*args, db=session, **kwargs))
+
+    wrapper.__signature__ = signature.replace(parameters=[
+        parameter.replace(annotation=AsyncSession, default=Depends(get_async_db))
+        if name == "db" else parameter
+        for name, parameter in signature.parameters.items()
+    ])
+    return wrapper
+
+
+def asyncify_router(router: APIRouter) -> APIRouter:
+    """Copia de `router` con sus endpoints de base de datos en modo asíncrono"""
+    result = APIRouter()
+    for route in router.routes:
+        if not isinstance(route, APIRoute):
+            result.routes.append(route)
+            continue
+        result.add_api_route(
+            route.path,
+            asyncify(route.endpoint),
+            **{option: getattr(route, option) for option in _ROUTE_OPTIONS},
+        )
+    return result
@@ -0,0 +1,131 @@
+"""
+Respuestas JSON rápidas para los listados.
+
+Los listados no construyen objetos ORM ni validan cada fila con Pydantic: se
+consultan con `select()` solo las columnas del esquema de respuesta y las
+tuplas se serializan directamente a bytes con orjson (con `json` si orjson no
+está instalado). El resultado es el mismo JSON que produciría el
+`response_model` del endpoint, que se mantiene para la documentación: como
+Pydantic, las fechas con zona horaria UTC terminan en `Z`.
+
+`default_response_class` elige la clase de respuesta por defecto de la
+aplicación según `JSON_RESPONSE`. `ndjson` y `gzip` componen respuestas en
+streaming de una línea JSON por elemento.
+"""
+import json
+import zlib
+from datetime import date, datetime, time, timedelta
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Type
+
+from fastapi import Response
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import BaseModel
+from sqlalchemy import Select, select
+from sqlalchemy.orm import Session
+
+from app.api import http_cache, pagination
+from app.config import settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - dependencia opcional
+    orjson = None
+
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+
+
+def _default(value: Any) -> str:
+    if isinstance(value, datetime) and value.utcoffset() == timedelta(0):
+        return value.replace(tzinfo=None).isoformat() + "Z"
+    if isinstance(value, (date, datetime, time)):
+        return value.isoformat()
+    raise TypeError(f"Tipo no serializable: {type(value).__name__}")
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def default_response_class() -> Type[Response]:
+    """ORJSONResponse con JSON_RESPONSE=orjson (si está instalado); JSONResponse si no"""
+    if settings.json_response == "orjson" and orjson is not None:
+        return ORJSONResponse
+    return JSONResponse
+
+
+def select_fields(model, schema: Type[BaseModel], **computed) -> Select:
+    """`select()` de las columnas de `model` con los campos de `schema`, en su orden
+
+    Los campos que no son columnas (propiedades del modelo) se pasan como
+    expresiones SQL en `computed`.
+    """
+    return select(*(
+        computed[name].label(name) if name in computed else getattr(model, name)
+        for name in schema.model_fields
+    ))
+
+
+def rows(db: Session, statement: Select) -> List[Dict[str, Any]]:
+    keys = list(statement.selected_columns.keys())
+    return [dict(zip(keys, row)) for row in db.execute(statement)]
+
+
+def response(content: Any, validators: Optional[Response] = None) -> Response:
+    """Respuesta con el contenido ya serializado y las cabeceras de `http_cache.conditional`"""
+    headers = http_cache.validator_headers(validators) if validators is not None else None
+    return Response(content=dumps(content), media_type="application/json", headers=headers)
+
+
+def list_response(
+    db: Session,
+    statement: Select,
+    id_column,
+    skip: int,
+    limit: int,
+    cursor: Optional[str],
+    include_total: bool,
+    validators: Optional[Response] = None,
+) -> Response:
+    """Listado por offset o, con `cursor`, página con el formato de `schemas.Page`"""
+    if cursor is not None:
+        page = pagination.paginate(db, statement, id_column, cursor, limit, include_total)
+        page["items"] = [row._asdict() for row in page["items"]]
+        return response(page, validators)
+    statement = statement.order_by(id_column).offset(skip).limit(limit)
+    return response(rows(db, statement), validators)
+
+
+def ndjson(batches: Iterable[List[Any]]) -> Iterator[bytes]:
+    """Un fragmento por lote, con una línea JSON por elemento"""
+    for batch in batches:
+        if batch:
+            yield b"".join(dumps(item) + b"\n" for item in batch)
+
+
+def gzip(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """Comprimir un stream en gzip vaciando el compresor en cada fragmento
+
+    Con Z_SYNC_FLUSH el cliente puede descomprimir cada fragmento en cuanto
+    llega, sin esperar al final del stream.
+    """
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for chunk in chunks:
+        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+    yield compressor.flush()
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Si la cabecera Accept-Encoding admite gzip (con q mayor que cero)"""
+    for coding in (accept_encoding or "").split(","):
+        name, _, params = coding.partition(";")
+        if name.strip().lower() not in ("gzip", "*"):
+            continue
+        quality = params.strip().removeprefix("q=")
+        try:
+            if not params.strip() or float(quality) > 0:
+                return True
+        except ValueError:
+            continue
+    return False
@@ -0,0 +1,84 @@
+"""
+ETags y GET condicionales.
+
+El ETag de una respuesta se deriva del contador de cambios de la tabla que la
+sirve (ver `app.services.versioning`) y de la URL pedida, así que se calcula
+con una consulta por clave primaria y sin cargar ni serializar nada. Si el
+cliente envía un `If-None-Match` que coincide (o, sin él, un
+`If-Modified-Since` no anterior al último cambio) se responde 304 antes de
+ejecutar el endpoint.
+"""
+import hashlib
+from datetime import datetime
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Callable, Optional, Sequence, Set, Union
+
+from fastapi import Depends, HTTPException, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.api.async_routes import asyncify
+from app.config import settings
+from app.database import get_db
+from app.services import versioning
+
+_uncached: Set[Callable] = set()
+
+
+def no_etag(endpoint: Callable) -> Callable:
+    """Excluir un endpoint GET cuyo resultado no depende de la tabla del router"""
+    _uncached.add(endpoint)
+    return endpoint
+
+
+def _matches(if_none_match: str, etag: str) -> bool:
+    # Comparación débil, como exige RFC 9110 para If-None-Match
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def _not_modified_since(if_modified_since: str, last_modified: Optional[datetime]) -> bool:
+    if last_modified is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    return since.tzinfo is not None and last_modified.replace(microsecond=0) <= since
+
+
+def validator_headers(response: Response) -> dict:
+    """Cabeceras puestas por `conditional`, para copiarlas a un Response propio del endpoint"""
+    return {
+        name: value for name, value in response.headers.items()
+        if name in ("etag", "last-modified", "cache-control")
+    }
+
+
+def conditional(tables: Union[str, Sequence[str]], cache_control: str):
+    """Dependencia de router: ETag por versión de `tables` y 304 si no cambió"""
+    tables = (tables,) if isinstance(tables, str) else tuple(tables)
+    scopes = [versioning.table_scope(table) for table in tables]
+
+    def check(request: Request, response: Response, db: Session = Depends(get_db)):
+        endpoint = request.scope.get("endpoint")
+        if request.method != "GET" or getattr(endpoint, "__wrapped__", endpoint) in _uncached:
+            return
+        current, last_modified = versioning.snapshot(db, scopes)
+        version = ".".join(str(current[scope]) for scope in scopes)
+        target = f"{request.url.path}?{request.url.query}".encode("utf-8")
+        etag = f'"{tables[0]}-{version}-{hashlib.sha1(target).hexdigest()[:16]}"'
+        headers = {"ETag": etag, "Cache-Control": cache_control}
+        if last_modified is not None:
+            headers["Last-Modified"] = format_datetime(last_modified, usegmt=True)
+        if_none_match = request.headers.get("if-none-match")
+        if_modified_since = request.headers.get("if-modified-since")
+        if (if_none_match and _matches(if_none_match, etag)) or (
+            not if_none_match and if_modified_since and _not_modified_since(if_modified_since, last_modified)
+        ):
+            raise HTTPException(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+        response.headers.update(headers)
+
+    return Depends(asyncify(check) if settings.database_async else check)
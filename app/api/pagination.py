@@ -0,0 +1,86 @@
+"""
+Paginación por cursor (keyset).
+
+Las páginas se recorren por id ascendente: cada cursor guarda el último id
+entregado y la página siguiente se obtiene con `id > :último`, que usa la
+clave primaria (o un índice compuesto que termine en id) y cuesta lo mismo
+en la primera página que en la millonésima. Las inserciones concurrentes no
+desplazan los resultados como ocurre con `offset`.
+"""
+import base64
+import binascii
+import json
+from typing import Optional, Union
+
+from fastapi import HTTPException, status
+from sqlalchemy import Select, func, select, text
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.orm import Query, Session
+
+CURSOR_VERSION = 1
+
+
+def encode_cursor(last_id: int) -> str:
+    raw = json.dumps([CURSOR_VERSION, last_id], separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).rstrip(b"=").decode("ascii")
+
+
+def decode_cursor(cursor: str) -> Optional[int]:
+    """Último id del cursor; None para la primera página (cursor vacío)"""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        version, last_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        if version != CURSOR_VERSION or not isinstance(last_id, int):
+            raise ValueError(cursor)
+        return last_id
+    except (ValueError, TypeError, binascii.Error, UnicodeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Cursor inválido"
+        )
+
+
+def count_estimate(db: Session, query: Union[Query, Select]) -> tuple:
+    """(total, es_estimación): en PostgreSQL se usa la estimación del planificador"""
+    statement = query.order_by(None)
+    if isinstance(statement, Query):
+        statement = statement.statement
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql":
+        # Parámetros con nombre para que text() los reenvíe a cualquier driver
+        compiled = statement.compile(dialect=postgresql.dialect(paramstyle="named"))
+        plan = db.execute(text(f"EXPLAIN (FORMAT JSON) {compiled}"), compiled.params).scalar()
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"]), True
+    total = db.execute(select(func.count()).select_from(statement.subquery())).scalar()
+    return total, False
+
+
+def paginate(
+    db: Session, query: Union[Query, Select], id_column, cursor: str, limit: int, include_total: bool = False
+) -> dict:
+    """Página de `query` a partir de `cursor` con el formato de `schemas.Page`
+
+    Con un `select()` de Core los elementos son filas (tuplas con nombre).
+    """
+    if limit < 1:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El límite debe ser mayor que cero"
+        )
+    last_id = decode_cursor(cursor)
+    total, estimated = count_estimate(db, query) if include_total else (None, False)
+    if last_id is not None:
+        query = query.filter(id_column > last_id)
+    query = query.order_by(id_column).limit(limit + 1)
+    rows = query.all() if isinstance(query, Query) else db.execute(query).all()
+    next_cursor = encode_cursor(rows[limit - 1].id) if len(rows) > limit else None
+    return {
+        "items": rows[:limit],
+        "next_cursor": next_cursor,
+        "total": total,
+        "total_is_estimate": estimated,
+    }
@@ -0,0 +1,35 @@
+"""
+Archivos de importación masiva.
+
+Starlette vuelca el archivo del formulario a un temporal (a disco a partir de
+1 MB) y las filas se leen de él en streaming: CSV con el módulo csv y XLSX con
+openpyxl en modo solo lectura.
+"""
+from typing import Any, Dict, Iterator
+
+from fastapi import HTTPException, Request, status
+
+from app.services import schedule_import
+
+
+async def file_rows(request: Request, keep_empty: bool = False) -> Iterator[Dict[str, Any]]:
+    """Filas del archivo enviado en el campo `file` de un formulario multipart
+
+    Con `keep_empty` las celdas vacías llegan como None en lugar de omitirse.
+    """
+    form = await request.form()
+    upload = form.get("file")
+    if upload is None or isinstance(upload, str):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Falta el archivo a importar"
+        )
+    filename = (upload.filename or "").lower()
+    if filename.endswith(".xlsx"):
+        return schedule_import.read_xlsx(upload.file, keep_empty)
+    if filename.endswith(".csv"):
+        return schedule_import.read_csv(upload.file, keep_empty)
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="Formato de archivo no soportado (use .csv o .xlsx)"
+    )
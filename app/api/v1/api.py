@@ -1,10 +1,59 @@
 from fastapi import APIRouter
-from app.api.v1.endpoints import subjects, teachers, class_types, classrooms, schedules
+from app.api import http_cache
+from app.api.async_routes import asyncify_router
+from app.api.v1.endpoints import (
+    subjects, teachers, class_types, classrooms, schedules, exports, availability, analytics,
+    occurrences, schedule_exceptions, calendars, semesters
+)
+from app.config import settings
+from app.services.versioning import REFERENCE_TABLES
 
 api_router = APIRouter()
 
-api_router.include_router(subjects.router, prefix="/subjects", tags=["subjects"])
-api_router.include_router(teachers.router, prefix="/teachers", tags=["teachers"])
-api_router.include_router(class_types.router, prefix="/class-types", tags=["class-types"])
-api_router.include_router(classrooms.router, prefix="/classrooms", tags=["classrooms"])
-api_router.include_router(schedules.router, prefix="/schedules", tags=["schedules"]) 
\ No newline at end of file
+
+def _routes(router: APIRouter) -> APIRouter:
+    return asyncify_router(router) if settings.database_async else router
+
+
+# Cache-Control por router; las respuestas GET llevan además un ETag por versión de la tabla
+reference_cache = settings.reference_cache_control
+schedule_cache = settings.schedule_cache_control
+
+api_router.include_router(
+    _routes(subjects.router), prefix="/subjects", tags=["subjects"],
+    dependencies=[http_cache.conditional("subjects", reference_cache)]
+)
+api_router.include_router(
+    _routes(teachers.router), prefix="/teachers", tags=["teachers"],
+    dependencies=[http_cache.conditional("teachers", reference_cache)]
+)
+api_router.include_router(
+    _routes(class_types.router), prefix="/class-types", tags=["class-types"],
+    dependencies=[http_cache.conditional("class_types", reference_cache)]
+)
+api_router.include_router(
+    _routes(classrooms.router), prefix="/classrooms", tags=["classrooms"],
+    dependencies=[http_cache.conditional("classrooms", reference_cache)]
+)
+api_router.include_router(
+    _routes(schedules.router), prefix="/schedules", tags=["schedules"],
+    dependencies=[http_cache.conditional("schedules", schedule_cache)]
+)
+api_router.include_router(_routes(semesters.router), prefix="/semesters", tags=["semesters"])
+api_router.include_router(
+    _routes(occurrences.router), prefix="/occurrences", tags=["occurrences"],
+    dependencies=[http_cache.conditional(("schedules", "schedule_exceptions"), schedule_cache)]
+)
+api_router.include_router(
+    _routes(schedule_exceptions.router), prefix="/schedule-exceptions", tags=["schedule-exceptions"],
+    dependencies=[http_cache.conditional(("schedule_exceptions", "schedules"), schedule_cache)]
+)
+api_router.include_router(
+    _routes(calendars.router), prefix="/calendars", tags=["calendars"],
+    dependencies=[http_cache.conditional(
+        ("schedules", "schedule_exceptions", *REFERENCE_TABLES), settings.calendar_cache_control
+    )]
+)
+api_router.include_router(exports.router, prefix="/exports", tags=["exports"])
+api_router.include_router(_routes(availability.router), prefix="/availability", tags=["availability"])
+api_router.include_router(_routes(analytics.router), prefix="/analytics", tags=["analytics"])
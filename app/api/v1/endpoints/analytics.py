@@ -0,0 +1,47 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List
+from app.api.async_routes import cpu_bound
+from app.database import get_db
+from app.schemas.analytics import RoomUtilization, DepartmentWorkload, SubjectClassTypeMix
+
+router = APIRouter()
+
+
+def _report(db: Session, semester: str, name: str, *args):
+    # NumPy se importa con el primer informe, no al arrancar el servicio
+    from app.services import analytics
+
+    return analytics.analytics_cache.report(db, semester, name, getattr(analytics, name), *args)
+
+
+@router.get("/room-utilization", response_model=List[RoomUtilization])
+@cpu_bound
+def get_room_utilization(
+    semester: str,
+    first_hour: int = Query(7, ge=0, le=23),
+    last_hour: int = Query(22, ge=1, le=24),
+    days: int = Query(6, ge=1, le=7, description="Días lectivos de la semana"),
+    db: Session = Depends(get_db)
+):
+    """Ocupación de las aulas por edificio y hora del día"""
+    if last_hour <= first_hour:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La hora final debe ser posterior a la inicial"
+        )
+    return _report(db, semester, "room_utilization", first_hour, last_hour, days)
+
+
+@router.get("/teacher-workload", response_model=List[DepartmentWorkload])
+@cpu_bound
+def get_teacher_workload(semester: str, db: Session = Depends(get_db)):
+    """Horas semanales de clase de los profesores por departamento"""
+    return _report(db, semester, "teacher_workload")
+
+
+@router.get("/class-type-mix", response_model=List[SubjectClassTypeMix])
+@cpu_bound
+def get_class_type_mix(semester: str, db: Session = Depends(get_db)):
+    """Reparto de sesiones y horas por tipo de clase en cada asignatura"""
+    return _report(db, semester, "class_type_mix")
@@ -0,0 +1,129 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import time
+from app.database import get_db
+from app.models.classroom import Classroom
+from app.models.teacher import Teacher
+from app.schemas.availability import FreeRoom, RankedRoom, FreeWindow
+from app.services.occupancy import (
+    SLOT_MINUTES, free_runs, interval_mask, occupancy_index, to_time, window_mask
+)
+
+router = APIRouter()
+
+
+def _check_interval(start_time: time, end_time: time):
+    if end_time <= start_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La hora de fin debe ser posterior a la hora de inicio"
+        )
+
+
+def _candidate_rooms(db: Session, min_capacity: Optional[int], building: Optional[str]) -> List[Classroom]:
+    query = db.query(Classroom).filter(Classroom.is_active == True)
+    if min_capacity is not None:
+        query = query.filter(Classroom.capacity >= min_capacity)
+    if building:
+        query = query.filter(Classroom.building == building)
+    return query.order_by(Classroom.id).all()
+
+
+def _free_rooms(db: Session, semester: str, day_of_week: int, start_time: time, end_time: time,
+                rooms: List[Classroom]) -> List[Classroom]:
+    free = set(occupancy_index.free_rooms(
+        db, semester, day_of_week, interval_mask(start_time, end_time), (room.id for room in rooms)
+    ))
+    return [room for room in rooms if room.id in free]
+
+
+@router.get("/rooms", response_model=List[FreeRoom])
+def find_free_rooms(
+    semester: str,
+    day_of_week: int = Query(..., ge=0, le=6),
+    start_time: time = Query(...),
+    end_time: time = Query(...),
+    min_capacity: Optional[int] = Query(None, ge=1),
+    building: Optional[str] = None,
+    db: Session = Depends(get_db)
+):
+    """Aulas libres en un día e intervalo del semestre"""
+    _check_interval(start_time, end_time)
+    rooms = _candidate_rooms(db, min_capacity, building)
+    return _free_rooms(db, semester, day_of_week, start_time, end_time, rooms)
+
+
+@router.get("/rooms/ranked", response_model=List[RankedRoom])
+def rank_free_rooms(
+    semester: str,
+    day_of_week: int = Query(..., ge=0, le=6),
+    start_time: time = Query(...),
+    end_time: time = Query(...),
+    students: Optional[int] = Query(None, ge=1, description="Estudiantes del grupo"),
+    building: Optional[str] = Query(None, description="Edificio preferido"),
+    floor: Optional[int] = Query(None, ge=0, description="Piso preferido"),
+    limit: int = Query(20, ge=1, le=500),
+    db: Session = Depends(get_db)
+):
+    """Aulas libres ordenadas por ajuste de capacidad, edificio y piso"""
+    _check_interval(start_time, end_time)
+    rooms = _free_rooms(db, semester, day_of_week, start_time, end_time,
+                        _candidate_rooms(db, students, None))
+    ranked = []
+    for room in rooms:
+        spare = room.capacity - students if students and room.capacity is not None else None
+        same_building = room.building == building if building else None
+        distance = abs(room.floor - floor) if floor is not None and room.floor is not None else None
+        ranked.append(RankedRoom(
+            **FreeRoom.model_validate(room).model_dump(),
+            spare_seats=spare, same_building=same_building, floor_distance=distance,
+        ))
+    # Primero el edificio preferido, luego el piso más cercano y el menor sobrante
+    ranked.sort(key=lambda r: (
+        r.same_building is False,
+        r.floor_distance if r.floor_distance is not None else 1_000,
+        r.spare_seats if r.spare_seats is not None else 1_000_000,
+        r.code,
+    ))
+    return ranked[:limit]
+
+
+@router.get("/teachers/common", response_model=List[FreeWindow])
+def find_common_free_time(
+    semester: str,
+    teacher_ids: List[int] = Query(..., min_length=1, description="Profesores que deben estar libres"),
+    days: List[int] = Query([0, 1, 2, 3, 4, 5], description="Días a consultar (0=Lunes)"),
+    day_start: time = Query(time(7, 0), description="Inicio de la jornada"),
+    day_end: time = Query(time(22, 0), description="Fin de la jornada"),
+    min_minutes: int = Query(SLOT_MINUTES, ge=SLOT_MINUTES, le=24 * 60, description="Duración mínima del hueco"),
+    db: Session = Depends(get_db)
+):
+    """Huecos en que todos los profesores indicados están libres a la vez"""
+    _check_interval(day_start, day_end)
+    if any(day < 0 or day > 6 for day in days):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Los días deben estar entre 0 (Lunes) y 6 (Domingo)"
+        )
+    teacher_ids = sorted(set(teacher_ids))
+    found = db.query(Teacher.id).filter(Teacher.id.in_(teacher_ids)).count()
+    if found != len(teacher_ids):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profesor no encontrado"
+        )
+    # Solo slots completos dentro de la jornada
+    window = window_mask(day_start, day_end)
+    min_slots = -(-min_minutes // SLOT_MINUTES)
+    windows = []
+    for day in sorted(set(days)):
+        busy = occupancy_index.teachers_busy(db, semester, day, teacher_ids)
+        for start, end in free_runs(busy, window, min_slots):
+            windows.append(FreeWindow(
+                day_of_week=day,
+                start_time=to_time(start),
+                end_time=to_time(end),
+                minutes=(end - start) * SLOT_MINUTES,
+            ))
+    return windows
@@ -0,0 +1,70 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.api import http_cache
+from app.api.async_routes import cpu_bound
+from app.database import get_db
+from app.services import icalendar
+from app.services.reference_cache import reference_cache
+
+router = APIRouter()
+
+
+def _feed(db: Session, response: Response, column: str, value: int, name: str, filename: str,
+          semester: Optional[str]) -> StreamingResponse:
+    schedules, excluded, exceptions = icalendar.load_feed(db, column, value, semester)
+    # Después de las filas: toda referencia que usen ya está en la caché
+    references = reference_cache.snapshot(db)
+    headers = http_cache.validator_headers(response)
+    headers["Content-Disposition"] = f'inline; filename="{filename}"'
+    return StreamingResponse(
+        icalendar.stream(name, schedules, excluded, exceptions, references),
+        media_type=icalendar.CALENDAR_MEDIA_TYPE,
+        headers=headers,
+    )
+
+
+@router.get("/teachers/{teacher_id}.ics", response_class=StreamingResponse)
+@cpu_bound
+def get_teacher_calendar(teacher_id: int, response: Response, semester: Optional[str] = None,
+                         db: Session = Depends(get_db)):
+    """Calendario iCalendar de un profesor"""
+    teacher = reference_cache.snapshot(db, ("teachers",))["teachers"].get(teacher_id)
+    if teacher is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profesor no encontrado"
+        )
+    return _feed(db, response, "teacher_id", teacher_id, f"Horario {teacher.full_name}",
+                 f"profesor-{teacher_id}.ics", semester)
+
+
+@router.get("/classrooms/{classroom_id}.ics", response_class=StreamingResponse)
+@cpu_bound
+def get_classroom_calendar(classroom_id: int, response: Response, semester: Optional[str] = None,
+                           db: Session = Depends(get_db)):
+    """Calendario iCalendar de un aula"""
+    classroom = reference_cache.snapshot(db, ("classrooms",))["classrooms"].get(classroom_id)
+    if classroom is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Aula no encontrada"
+        )
+    return _feed(db, response, "classroom_id", classroom_id, f"Aula {classroom.code}",
+                 f"aula-{classroom_id}.ics", semester)
+
+
+@router.get("/subjects/{subject_id}.ics", response_class=StreamingResponse)
+@cpu_bound
+def get_subject_calendar(subject_id: int, response: Response, semester: Optional[str] = None,
+                         db: Session = Depends(get_db)):
+    """Calendario iCalendar de una asignatura"""
+    subject = reference_cache.snapshot(db, ("subjects",))["subjects"].get(subject_id)
+    if subject is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asignatura no encontrada"
+        )
+    return _feed(db, response, "subject_id", subject_id, f"{subject.code} {subject.name}",
+                 f"asignatura-{subject_id}.ics", semester)
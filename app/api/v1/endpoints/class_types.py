@@ -1,9 +1,13 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
+from app.api import fast_json
 from app.database import get_db
 from app.models.class_type import ClassType
 from app.schemas.class_type import ClassTypeCreate, ClassTypeUpdate, ClassTypeResponse
+from app.schemas.pagination import Page
+from app.services import versioning
 
 router = APIRouter()
 
@@ -11,17 +15,16 @@ router = APIRouter()
 @router.post("/", response_model=ClassTypeResponse, status_code=status.HTTP_201_CREATED)
 def create_class_type(class_type: ClassTypeCreate, db: Session = Depends(get_db)):
     """Crear un nuevo tipo de clase"""
-    # Verificar si ya existe un tipo de clase con el mismo nombre
-    db_class_type = db.query(ClassType).filter(ClassType.name == class_type.name).first()
-    if db_class_type:
+    # Verificar en una sola consulta que el nombre y las siglas están libres
+    taken = db.query(ClassType.name, ClassType.acronym).filter(
+        or_(ClassType.name == class_type.name, ClassType.acronym == class_type.acronym)
+    ).all()
+    if any(row.name == class_type.name for row in taken):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ya existe un tipo de clase con este nombre"
         )
-    
-    # Verificar si ya existe un tipo de clase con las mismas siglas
-    db_class_type = db.query(ClassType).filter(ClassType.acronym == class_type.acronym).first()
-    if db_class_type:
+    if taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ya existe un tipo de clase con estas siglas"
@@ -29,16 +32,27 @@ def create_class_type(class_type: ClassTypeCreate, db: Session = Depends(get_db)
     
     db_class_type = ClassType(**class_type.model_dump())
     db.add(db_class_type)
+    versioning.record_change(db, "class_types")
     db.commit()
     db.refresh(db_class_type)
     return db_class_type
 
 
-@router.get("/", response_model=List[ClassTypeResponse])
-def get_class_types(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Obtener lista de tipos de clase"""
-    class_types = db.query(ClassType).offset(skip).limit(limit).all()
-    return class_types
+@router.get("/", response_model=Union[List[ClassTypeResponse], Page[ClassTypeResponse]])
+def get_class_types(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Obtener lista de tipos de clase
+
+    Con `cursor` (vacío para la primera página) devuelve una página con `next_cursor`.
+    """
+    statement = fast_json.select_fields(ClassType, ClassTypeResponse)
+    return fast_json.list_response(db, statement, ClassType.id, skip, limit, cursor, include_total, response)
 
 
 @router.get("/{class_type_id}", response_model=ClassTypeResponse)
@@ -85,6 +99,7 @@ def update_class_type(class_type_id: int, class_type: ClassTypeUpdate, db: Sessi
     for field, value in update_data.items():
         setattr(db_class_type, field, value)
     
+    versioning.record_change(db, "class_types", ids=[class_type_id])
     db.commit()
     db.refresh(db_class_type)
     return db_class_type
@@ -101,5 +116,6 @@ def delete_class_type(class_type_id: int, db: Session = Depends(get_db)):
         )
     
     db_class_type.is_active = False
+    versioning.record_change(db, "class_types", ids=[class_type_id])
     db.commit()
     return None 
\ No newline at end of file
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
+from app.api import fast_json, uploads
 from app.database import get_db
 from app.models.classroom import Classroom
 from app.schemas.classroom import ClassroomCreate, ClassroomUpdate, ClassroomResponse
+from app.schemas.pagination import Page
+from app.schemas.reference_import import ReferenceImportResponse
+from app.services import reference_import, versioning
 
 router = APIRouter()
 
@@ -21,16 +26,38 @@ def create_classroom(classroom: ClassroomCreate, db: Session = Depends(get_db)):
     
     db_classroom = Classroom(**classroom.model_dump())
     db.add(db_classroom)
+    versioning.record_change(db, "classrooms")
     db.commit()
     db.refresh(db_classroom)
     return db_classroom
 
 
-@router.get("/", response_model=List[ClassroomResponse])
-def get_classrooms(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Obtener lista de aulas"""
-    classrooms = db.query(Classroom).offset(skip).limit(limit).all()
-    return classrooms
+@router.post("/import", response_model=ReferenceImportResponse)
+async def import_classrooms(request: Request, db: Session = Depends(get_db)):
+    """Importar aulas desde un archivo CSV o XLSX
+
+    Inserta las filas nuevas y actualiza las existentes por `code`. Cada lote
+    se guarda por separado y las filas con errores se informan sin impedir el resto.
+    """
+    rows = await uploads.file_rows(request, keep_empty=True)
+    return await run_in_threadpool(reference_import.import_rows, db, "classrooms", rows)
+
+
+@router.get("/", response_model=Union[List[ClassroomResponse], Page[ClassroomResponse]])
+def get_classrooms(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Obtener lista de aulas
+
+    Con `cursor` (vacío para la primera página) devuelve una página con `next_cursor`.
+    """
+    statement = fast_json.select_fields(Classroom, ClassroomResponse)
+    return fast_json.list_response(db, statement, Classroom.id, skip, limit, cursor, include_total, response)
 
 
 @router.get("/{classroom_id}", response_model=ClassroomResponse)
@@ -68,6 +95,7 @@ def update_classroom(classroom_id: int, classroom: ClassroomUpdate, db: Session
     for field, value in update_data.items():
         setattr(db_classroom, field, value)
     
+    versioning.record_change(db, "classrooms", ids=[classroom_id])
     db.commit()
     db.refresh(db_classroom)
     return db_classroom
@@ -84,5 +112,6 @@ def delete_classroom(classroom_id: int, db: Session = Depends(get_db)):
         )
     
     db_classroom.is_active = False
+    versioning.record_change(db, "classrooms", ids=[classroom_id])
     db.commit()
     return None 
\ No newline at end of file
@@ -0,0 +1,47 @@
+from fastapi import APIRouter, HTTPException, status
+from app.schemas.export import ExportCreate, ExportJobResponse
+from app.services import export_jobs
+from app.services.export_cache import export_cache
+
+router = APIRouter()
+
+
+@router.post("/", response_model=ExportJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def create_export(export: ExportCreate):
+    """Encolar una exportación a Excel"""
+    if export.kind == "teacher" and export.teacher_id is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debe indicar el profesor a exportar"
+        )
+    return export_jobs.submit(export.kind, export.semester, export.teacher_id)
+
+
+@router.get("/cache/stats")
+def get_export_cache_stats():
+    """Aciertos y fallos de la caché de exportaciones de este proceso"""
+    return export_cache.stats()
+
+
+@router.get("/{job_id}/status", response_model=ExportJobResponse)
+def get_export_status(job_id: str):
+    """Consultar el estado de una exportación"""
+    job = export_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exportación no encontrada"
+        )
+    return job
+
+
+@router.get("/{job_id}")
+def get_export(job_id: str):
+    """Descargar una exportación terminada (202 con su estado mientras se genera)"""
+    job = export_jobs.get_job(job_id)
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Exportación no encontrada"
+        )
+    return export_jobs.job_response(job)
@@ -0,0 +1,62 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from datetime import date
+from itertools import islice
+from app.api import fast_json
+from app.api.async_routes import cpu_bound
+from app.database import get_db
+from app.schemas.occurrence import OccurrenceResponse
+from app.schemas.schedule_exception import OccurrenceConflict
+from app.services import occurrences
+
+router = APIRouter()
+
+MAX_RANGE_DAYS = 366
+
+
+def _check_range(from_date: date, to_date: date):
+    if to_date < from_date:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha final debe ser igual o posterior a la inicial"
+        )
+    if (to_date - from_date).days >= MAX_RANGE_DAYS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango no puede superar {MAX_RANGE_DAYS} días"
+        )
+
+
+@router.get("/", response_model=List[OccurrenceResponse])
+@cpu_bound
+def get_occurrences(
+    response: Response,
+    from_date: date = Query(..., alias="from", description="Primera fecha (incluida)"),
+    to_date: date = Query(..., alias="to", description="Última fecha (incluida)"),
+    teacher_id: Optional[int] = None,
+    classroom_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+    include_cancelled: bool = False,
+    limit: int = Query(1000, ge=1, le=10000),
+    db: Session = Depends(get_db)
+):
+    """Clases concretas entre dos fechas, en orden cronológico y con las excepciones aplicadas"""
+    _check_range(from_date, to_date)
+    items = islice(occurrences.occurrences(
+        db, from_date, to_date, include_cancelled,
+        teacher_id=teacher_id, classroom_id=classroom_id, subject_id=subject_id
+    ), limit)
+    return fast_json.response([item._asdict() for item in items], response)
+
+
+@router.get("/conflicts", response_model=List[OccurrenceConflict])
+@cpu_bound
+def get_occurrence_conflicts(
+    from_date: date = Query(..., alias="from", description="Primera fecha (incluida)"),
+    to_date: date = Query(..., alias="to", description="Última fecha (incluida)"),
+    db: Session = Depends(get_db)
+):
+    """Choques de aula o profesor entre las clases resueltas del rango"""
+    _check_range(from_date, to_date)
+    return occurrences.conflicts(occurrences.occurrences(db, from_date, to_date))
@@ -0,0 +1,221 @@
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional
+from datetime import date
+from app.api import fast_json
+from app.database import get_db
+from app.models.schedule import Schedule
+from app.models.schedule_exception import ScheduleException, CANCEL, MOVE, SUBSTITUTE
+from app.schemas.schedule_exception import (
+    ScheduleExceptionCreate, ScheduleExceptionUpdate, ScheduleExceptionResponse
+)
+from app.services import occurrences, versioning
+from app.services.reference_cache import reference_cache
+from app.api.v1.endpoints.schedules import CLASSROOM_CONFLICT, TEACHER_CONFLICT
+
+router = APIRouter()
+
+_FIELDS = (
+    "schedule_id", "date", "kind", "new_date", "new_start_time", "new_end_time",
+    "classroom_id", "teacher_id", "reason",
+)
+
+
+def _prepare(db: Session, data: dict) -> occurrences.Occurrence:
+    """Validar la excepción y devolver la clase que resulta de aplicarla"""
+    schedule = db.query(Schedule).filter(
+        Schedule.id == data["schedule_id"], Schedule.is_active == True
+    ).first()
+    if schedule is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Horario no encontrado"
+        )
+    original = data["date"]
+    if original.weekday() != schedule.day_of_week or not schedule.week_start <= original <= schedule.week_end:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha no corresponde a ninguna clase del horario"
+        )
+    
+    kind = data["kind"]
+    if kind != MOVE:
+        data.update(new_date=None, new_start_time=None, new_end_time=None)
+    if kind == CANCEL:
+        data.update(classroom_id=None, teacher_id=None)
+    if kind == MOVE and data["new_date"] is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debe indicar la nueva fecha del traslado"
+        )
+    if kind == SUBSTITUTE and data["classroom_id"] is None and data["teacher_id"] is None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Debe indicar el aula o el profesor sustituto"
+        )
+    start_time = data["new_start_time"] or schedule.start_time
+    end_time = data["new_end_time"] or schedule.end_time
+    if end_time <= start_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La hora de fin debe ser posterior a la hora de inicio"
+        )
+    references = reference_cache.snapshot(db, ("classrooms", "teachers"))
+    if data["classroom_id"] is not None and data["classroom_id"] not in references["classrooms"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Aula no encontrada"
+        )
+    if data["teacher_id"] is not None and data["teacher_id"] not in references["teachers"]:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profesor no encontrado"
+        )
+    return occurrences.Occurrence(
+        data["new_date"] or original, start_time, end_time, schedule.id, schedule.subject_id,
+        schedule.class_type_id, data["classroom_id"] or schedule.classroom_id,
+        data["teacher_id"] or schedule.teacher_id, schedule.semester,
+    )
+
+
+def _check_conflicts(db: Session, occurrence: occurrences.Occurrence, original: date,
+                     exception_id: Optional[int] = None):
+    """Rechazar la clase resultante si choca con otra de ese día ya resuelta"""
+    day = occurrence.date
+    classroom, teacher = [], []
+    for other in occurrences.occurrences(db, day, day):
+        if other.schedule_id == occurrence.schedule_id and (
+            other.exception_id == exception_id if other.exception_id is not None else other.date == original
+        ):
+            continue  # la propia clase, antes de este cambio
+        if other.start_time >= occurrence.end_time or other.end_time <= occurrence.start_time:
+            continue
+        if other.classroom_id == occurrence.classroom_id:
+            classroom.append(other.schedule_id)
+        if other.teacher_id == occurrence.teacher_id:
+            teacher.append(other.schedule_id)
+    messages = []
+    if classroom:
+        messages.append(f"{CLASSROOM_CONFLICT} (horarios: {', '.join(map(str, classroom))})")
+    if teacher:
+        messages.append(f"{TEACHER_CONFLICT} (horarios: {', '.join(map(str, teacher))})")
+    if messages:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="; ".join(messages)
+        )
+
+
+def _commit(db: Session, db_exception: ScheduleException):
+    # Las excepciones cambian las clases con fecha, no el horario semanal: no
+    # se invalida la versión del semestre (exportaciones, análisis)
+    versioning.record_change(db, "schedule_exceptions", ids=[db_exception.id])
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Ya existe una excepción para esa clase"
+        )
+    db.refresh(db_exception)
+
+
+@router.post("/", response_model=ScheduleExceptionResponse, status_code=status.HTTP_201_CREATED)
+def create_schedule_exception(exception: ScheduleExceptionCreate, db: Session = Depends(get_db)):
+    """Cancelar, trasladar o sustituir una clase concreta"""
+    data = exception.model_dump()
+    occurrence = _prepare(db, data)
+    if data["kind"] != CANCEL:
+        _check_conflicts(db, occurrence, data["date"])
+    
+    db_exception = ScheduleException(**data)
+    db.add(db_exception)
+    _commit(db, db_exception)
+    return db_exception
+
+
+@router.get("/", response_model=List[ScheduleExceptionResponse])
+def get_schedule_exceptions(
+    response: Response,
+    schedule_id: Optional[int] = None,
+    from_date: Optional[date] = Query(None, alias="from"),
+    to_date: Optional[date] = Query(None, alias="to"),
+    skip: int = 0,
+    limit: int = 100,
+    db: Session = Depends(get_db)
+):
+    """Obtener excepciones, opcionalmente de un horario o de un rango de fechas"""
+    statement = fast_json.select_fields(ScheduleException, ScheduleExceptionResponse)
+    
+    if schedule_id:
+        statement = statement.where(ScheduleException.schedule_id == schedule_id)
+    
+    if from_date:
+        statement = statement.where(ScheduleException.date >= from_date)
+    
+    if to_date:
+        statement = statement.where(ScheduleException.date <= to_date)
+    
+    statement = statement.order_by(ScheduleException.date, ScheduleException.id).offset(skip).limit(limit)
+    return fast_json.response(fast_json.rows(db, statement), response)
+
+
+@router.get("/{exception_id}", response_model=ScheduleExceptionResponse)
+def get_schedule_exception(exception_id: int, db: Session = Depends(get_db)):
+    """Obtener una excepción por ID"""
+    exception = db.query(ScheduleException).filter(ScheduleException.id == exception_id).first()
+    if exception is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Excepción no encontrada"
+        )
+    return exception
+
+
+@router.put("/{exception_id}", response_model=ScheduleExceptionResponse)
+def update_schedule_exception(exception_id: int, exception: ScheduleExceptionUpdate,
+                              db: Session = Depends(get_db)):
+    """Actualizar una excepción"""
+    db_exception = db.query(ScheduleException).filter(ScheduleException.id == exception_id).first()
+    if db_exception is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Excepción no encontrada"
+        )
+    
+    data = {field: getattr(db_exception, field) for field in _FIELDS}
+    data.update(exception.model_dump(exclude_unset=True))
+    occurrence = _prepare(db, data)
+    if data["kind"] != CANCEL:
+        _check_conflicts(db, occurrence, data["date"], exception_id=exception_id)
+    
+    for field, value in data.items():
+        setattr(db_exception, field, value)
+    _commit(db, db_exception)
+    return db_exception
+
+
+@router.delete("/{exception_id}", status_code=status.HTTP_204_NO_CONTENT)
+def delete_schedule_exception(exception_id: int, db: Session = Depends(get_db)):
+    """Eliminar una excepción (la clase vuelve a su horario semanal)"""
+    db_exception = db.query(ScheduleException).filter(ScheduleException.id == exception_id).first()
+    if db_exception is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Excepción no encontrada"
+        )
+    
+    # La clase original vuelve a su fecha y hora: no debe chocar con lo resuelto ese día
+    schedule = db_exception.schedule
+    if schedule.is_active:
+        _check_conflicts(db, occurrences.Occurrence(
+            db_exception.date, schedule.start_time, schedule.end_time, schedule.id, schedule.subject_id,
+            schedule.class_type_id, schedule.classroom_id, schedule.teacher_id, schedule.semester,
+        ), db_exception.date, exception_id=exception_id)
+    
+    db.delete(db_exception)
+    versioning.record_change(db, "schedule_exceptions", ids=[exception_id])
+    db.commit()
+    return None
@@ -1,129 +1,233 @@
-from fastapi import APIRouter, Depends, HTTPException, status, Response
+from fastapi import APIRouter, Depends, HTTPException, Query, status, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, StreamingResponse
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
-from typing import List, Optional
-from datetime import datetime, timedelta
-import io
-from openpyxl import Workbook
-from openpyxl.styles import Font, Alignment, PatternFill
+from sqlalchemy.exc import IntegrityError
+from typing import List, Optional, Union
+from types import SimpleNamespace
+from app.api import fast_json, http_cache, uploads
+from app.config import settings
 from app.database import get_db
 from app.models.schedule import Schedule
-from app.models.subject import Subject
-from app.models.teacher import Teacher
-from app.models.class_type import ClassType
-from app.models.classroom import Classroom
-from app.schemas.schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse
+from app.schemas.schedule import END_BEFORE_START, ScheduleCreate, ScheduleUpdate, ScheduleResponse, ScheduleBulkResponse
+from app.schemas.pagination import Page
+from app.schemas.timetable import TimetableGenerateRequest, TimetableJobResponse
+from app.services import (
+    timetable_jobs, schedule_import, schedule_stream, overlap_guard, export_jobs, occurrences, versioning
+)
+from app.services.interval_index import schedule_index
+from app.services.occupancy import occupancy_index
+from app.services.reference_cache import reference_cache
+
+CLASSROOM_CONFLICT = "Conflicto de horario: el aula ya está ocupada en este horario"
+TEACHER_CONFLICT = "Conflicto de horario: el profesor ya tiene clase en este horario"
 
 router = APIRouter()
 
 
-@router.post("/", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED)
-def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
-    """Crear un nuevo horario"""
-    # Verificar que la asignatura existe
-    subject = db.query(Subject).filter(Subject.id == schedule.subject_id).first()
-    if not subject:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Asignatura no encontrada"
+def _check_conflicts(db: Session, schedule, exclude_id: Optional[int] = None, weekly: bool = True):
+    """Rechazar el horario si choca con otro del aula o del profesor
+
+    Se comparan los horarios semanales (salvo con `weekly=False`, cuando ya los
+    impide la base de datos) y las clases trasladadas o sustituidas que caen
+    en el periodo del horario. Informa todos los horarios en conflicto en una
+    sola respuesta.
+    """
+    classroom, teacher = [], []
+    if weekly:
+        conflicts = schedule_index.conflicts(
+            db,
+            schedule.semester,
+            schedule.day_of_week,
+            schedule.start_time,
+            schedule.end_time,
+            schedule.classroom_id,
+            schedule.teacher_id,
+            exclude_id=exclude_id,
         )
-    
-    # Verificar que el tipo de clase existe
-    class_type = db.query(ClassType).filter(ClassType.id == schedule.class_type_id).first()
-    if not class_type:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Tipo de clase no encontrado"
+        classroom.extend(conflicts.classroom)
+        teacher.extend(conflicts.teacher)
+    moved = occurrences.exception_conflicts(db, schedule, exclude_id=exclude_id)
+    if moved:
+        classroom.extend(other for other in moved.classroom if other not in classroom)
+        teacher.extend(other for other in moved.teacher if other not in teacher)
+    if not classroom and not teacher:
+        return
+    messages = []
+    if classroom:
+        messages.append(f"{CLASSROOM_CONFLICT} (horarios: {', '.join(map(str, classroom))})")
+    if teacher:
+        messages.append(f"{TEACHER_CONFLICT} (horarios: {', '.join(map(str, teacher))})")
+    raise HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST,
+        detail="; ".join(messages)
+    )
+
+
+def _commit_schedule(db: Session, db_schedule: Schedule):
+    """Confirmar la escritura traduciendo las violaciones de solapamiento a 400"""
+    # El rollback expira el objeto: conservar los valores que se intentaron guardar
+    attempted = SimpleNamespace(**{
+        field: getattr(db_schedule, field)
+        for field in (
+            "id", "semester", "day_of_week", "start_time", "end_time", "classroom_id", "teacher_id",
+            "week_start", "week_end",
         )
-    
-    # Verificar que el aula existe
-    classroom = db.query(Classroom).filter(Classroom.id == schedule.classroom_id).first()
-    if not classroom:
+    })
+    # Un cambio de semestre afecta también al semestre de origen
+    semesters = [attempted.semester, *inspect(db_schedule).attrs.semester.history.deleted]
+    try:
+        versioning.record_change(db, "schedules", semesters, ids=[attempted.id])
+        db.commit()
+    except IntegrityError as exc:
+        db.rollback()
+        constraint = overlap_guard.violated_constraint(exc)
+        if constraint is None:
+            raise
+        # Recargar el semestre para informar todos los horarios en conflicto
+        schedule_index.invalidate(attempted.semester)
+        occupancy_index.invalidate(attempted.semester)
+        _check_conflicts(db, attempted, exclude_id=attempted.id)
         raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Aula no encontrada"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=CLASSROOM_CONFLICT if constraint == overlap_guard.CLASSROOM_CONSTRAINT else TEACHER_CONFLICT
         )
-    
-    # Verificar que el profesor existe
-    teacher = db.query(Teacher).filter(Teacher.id == schedule.teacher_id).first()
-    if not teacher:
+    db.refresh(db_schedule)
+    schedule_index.sync(db_schedule)
+    occupancy_index.sync(db_schedule)
+
+
+@router.post("/", response_model=ScheduleResponse, status_code=status.HTTP_201_CREATED)
+def create_schedule(schedule: ScheduleCreate, db: Session = Depends(get_db)):
+    """Crear un nuevo horario"""
+    # Verificar que la asignatura, el tipo de clase, el aula y el profesor existen
+    missing = reference_cache.missing(db, schedule)
+    if missing:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail="Profesor no encontrado"
+            detail=missing[0]
         )
     
-    # Verificar conflictos de horario para el aula
-    conflicting_schedule = db.query(Schedule).filter(
-        and_(
-            Schedule.classroom_id == schedule.classroom_id,
-            Schedule.day_of_week == schedule.day_of_week,
-            Schedule.semester == schedule.semester,
-            Schedule.is_active == True,
-            or_(
-                and_(Schedule.start_time <= schedule.start_time, Schedule.end_time > schedule.start_time),
-                and_(Schedule.start_time < schedule.end_time, Schedule.end_time >= schedule.end_time),
-                and_(Schedule.start_time >= schedule.start_time, Schedule.end_time <= schedule.end_time)
+    with overlap_guard.serialize_writes(db, [schedule]) as enforced_by_db:
+        # Verificar conflictos de horario para el aula y el profesor
+        _check_conflicts(db, schedule, weekly=not enforced_by_db)
+        
+        db_schedule = Schedule(**schedule.model_dump())
+        db.add(db_schedule)
+        _commit_schedule(db, db_schedule)
+    return db_schedule
+
+
+@router.post(
+    "/bulk",
+    response_model=ScheduleBulkResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={400: {"model": ScheduleBulkResponse}},
+)
+async def bulk_import_schedules(request: Request, skip_invalid: bool = False, db: Session = Depends(get_db)):
+    """Importar horarios en lote desde JSON, CSV o XLSX
+
+    Acepta un arreglo JSON o un archivo en el campo `file` de un formulario.
+    Si alguna fila tiene errores no se guarda nada, salvo con `skip_invalid`.
+    """
+    content_type = request.headers.get("content-type", "")
+    if content_type.startswith("multipart/form-data"):
+        rows = await uploads.file_rows(request)
+    else:
+        try:
+            rows = await request.json()
+        except ValueError:
+            rows = None
+        if not isinstance(rows, list):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Se esperaba un arreglo JSON de horarios"
             )
-        )
-    ).first()
     
-    if conflicting_schedule:
+    try:
+        result = await run_in_threadpool(schedule_import.import_schedules, db, rows, skip_invalid)
+    except IntegrityError as exc:
+        constraint = overlap_guard.violated_constraint(exc)
+        if constraint is None:
+            raise
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Conflicto de horario: el aula ya está ocupada en este horario"
+            detail=CLASSROOM_CONFLICT if constraint == overlap_guard.CLASSROOM_CONSTRAINT else TEACHER_CONFLICT
         )
-    
-    # Verificar conflictos de horario para el profesor
-    conflicting_schedule = db.query(Schedule).filter(
-        and_(
-            Schedule.teacher_id == schedule.teacher_id,
-            Schedule.day_of_week == schedule.day_of_week,
-            Schedule.semester == schedule.semester,
-            Schedule.is_active == True,
-            or_(
-                and_(Schedule.start_time <= schedule.start_time, Schedule.end_time > schedule.start_time),
-                and_(Schedule.start_time < schedule.end_time, Schedule.end_time >= schedule.end_time),
-                and_(Schedule.start_time >= schedule.start_time, Schedule.end_time <= schedule.end_time)
-            )
-        )
-    ).first()
-    
-    if conflicting_schedule:
+    if result["failed"] and not skip_invalid:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=result)
+    return result
+
+
+@router.post("/generate", response_model=TimetableJobResponse, status_code=status.HTTP_202_ACCEPTED)
+def generate_schedules(request: TimetableGenerateRequest, db: Session = Depends(get_db)):
+    """Generar automáticamente el horario de un semestre"""
+    return timetable_jobs.start_generation(db, request)
+
+
+@router.get("/generate/{job_id}", response_model=TimetableJobResponse)
+@http_cache.no_etag
+def get_generation_status(job_id: str):
+    """Consultar el progreso de una generación automática"""
+    job = timetable_jobs.get_job(job_id)
+    if job is None:
         raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Conflicto de horario: el profesor ya tiene clase en este horario"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Generación no encontrada"
         )
-    
-    db_schedule = Schedule(**schedule.model_dump())
-    db.add(db_schedule)
-    db.commit()
-    db.refresh(db_schedule)
-    return db_schedule
+    return job
 
 
-@router.get("/", response_model=List[ScheduleResponse])
+@router.get("/", response_model=Union[List[ScheduleResponse], Page[ScheduleResponse]])
 def get_schedules(
+    response: Response,
     skip: int = 0, 
     limit: int = 100, 
     semester: Optional[str] = None,
     teacher_id: Optional[int] = None,
     subject_id: Optional[int] = None,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
     db: Session = Depends(get_db)
 ):
-    """Obtener lista de horarios con filtros opcionales"""
-    query = db.query(Schedule)
+    """Obtener lista de horarios con filtros opcionales
+
+    Con `cursor` (vacío para la primera página) devuelve una página con `next_cursor`.
+    """
+    statement = fast_json.select_fields(Schedule, ScheduleResponse)
     
     if semester:
-        query = query.filter(Schedule.semester == semester)
+        statement = statement.where(Schedule.semester == semester)
     
     if teacher_id:
-        query = query.filter(Schedule.teacher_id == teacher_id)
+        statement = statement.where(Schedule.teacher_id == teacher_id)
     
     if subject_id:
-        query = query.filter(Schedule.subject_id == subject_id)
+        statement = statement.where(Schedule.subject_id == subject_id)
     
-    schedules = query.offset(skip).limit(limit).all()
-    return schedules
+    return fast_json.list_response(db, statement, Schedule.id, skip, limit, cursor, include_total, response)
+
+
+@router.get(
+    "/stream",
+    response_class=StreamingResponse,
+    responses={200: {"content": {fast_json.NDJSON_MEDIA_TYPE: {}}, "description": "Un horario por línea"}},
+)
+@http_cache.no_etag
+def stream_schedules(request: Request, semester: str = Query(..., min_length=1, max_length=20)):
+    """Exportar los horarios activos de un semestre en NDJSON
+
+    Una línea JSON por horario, en orden de id, con su asignatura, tipo de
+    clase, aula y profesor. Se envía a medida que se lee; con
+    `Accept-Encoding: gzip` se comprime.
+    """
+    chunks = fast_json.ndjson(schedule_stream.batches(semester))
+    headers = {"Vary": "Accept-Encoding"}
+    if fast_json.accepts_gzip(request.headers.get("accept-encoding")):
+        chunks = fast_json.gzip(chunks)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(chunks, media_type=fast_json.NDJSON_MEDIA_TYPE, headers=headers)
 
 
 @router.get("/{schedule_id}", response_model=ScheduleResponse)
@@ -148,15 +252,27 @@ def update_schedule(schedule_id: int, schedule: ScheduleUpdate, db: Session = De
             detail="Horario no encontrado"
         )
     
-    # Aquí se podrían agregar las mismas validaciones que en create_schedule
-    # para verificar conflictos de horario
-    
     update_data = schedule.model_dump(exclude_unset=True)
+    
+    # Validar las horas resultantes si cambian (los horarios antiguos con las
+    # horas invertidas se pueden modificar en lo demás)
+    start_time = update_data.get("start_time", db_schedule.start_time)
+    end_time = update_data.get("end_time", db_schedule.end_time)
+    if ("start_time" in update_data or "end_time" in update_data) and end_time <= start_time:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=END_BEFORE_START
+        )
+    
     for field, value in update_data.items():
         setattr(db_schedule, field, value)
     
-    db.commit()
-    db.refresh(db_schedule)
+    with overlap_guard.serialize_writes(db, [db_schedule]) as enforced_by_db:
+        # Verificar conflictos de horario con los valores resultantes
+        if db_schedule.is_active:
+            _check_conflicts(db, db_schedule, exclude_id=schedule_id, weekly=not enforced_by_db)
+        
+        _commit_schedule(db, db_schedule)
     return db_schedule
 
 
@@ -171,170 +287,29 @@ def delete_schedule(schedule_id: int, db: Session = Depends(get_db)):
         )
     
     db_schedule.is_active = False
+    versioning.record_change(db, "schedules", [db_schedule.semester], ids=[schedule_id])
     db.commit()
+    schedule_index.sync(db_schedule)
+    occupancy_index.sync(db_schedule)
     return None
 
 
 @router.get("/export/weekly/{semester}")
-def export_weekly_schedule(semester: str, db: Session = Depends(get_db)):
-    """Exportar horario semanal a Excel"""
-    schedules = db.query(Schedule).filter(
-        and_(Schedule.semester == semester, Schedule.is_active == True)
-    ).all()
-    
-    if not schedules:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No se encontraron horarios para este semestre"
-        )
-    
-    # Crear workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = f"Horario Semanal {semester}"
-    
-    # Configurar encabezados
-    headers = ["Hora", "Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-    
-    # Horarios típicos (7:00 AM a 10:00 PM)
-    time_slots = []
-    start_time = datetime.strptime("07:00", "%H:%M")
-    end_time = datetime.strptime("22:00", "%H:%M")
-    
-    current_time = start_time
-    while current_time <= end_time:
-        time_slots.append(current_time.strftime("%H:%M"))
-        current_time += timedelta(hours=1)
-    
-    # Llenar horarios
-    for row, time_slot in enumerate(time_slots, 2):
-        ws.cell(row=row, column=1, value=time_slot)
-        
-        for day in range(6):  # 0-5 (Lunes a Sábado)
-            # Buscar clases en este horario
-            classes = [s for s in schedules if s.day_of_week == day]
-            
-            # Buscar clases que coincidan con este horario
-            matching_classes = []
-            for cls in classes:
-                cls_start = cls.start_time.strftime("%H:%M")
-                if cls_start == time_slot:
-                    subject = db.query(Subject).filter(Subject.id == cls.subject_id).first()
-                    teacher = db.query(Teacher).filter(Teacher.id == cls.teacher_id).first()
-                    class_type = db.query(ClassType).filter(ClassType.id == cls.class_type_id).first()
-                    classroom = db.query(Classroom).filter(Classroom.id == cls.classroom_id).first()
-                    
-                    class_info = f"{subject.acronym} - {class_type.acronym}\n{teacher.full_name}\n{classroom.code}"
-                    matching_classes.append(class_info)
-            
-            if matching_classes:
-                cell_value = "\n".join(matching_classes)
-                cell = ws.cell(row=row, column=day + 2, value=cell_value)
-                cell.alignment = Alignment(wrap_text=True, vertical='top')
-    
-    # Ajustar ancho de columnas
-    for col in range(1, 8):
-        ws.column_dimensions[chr(64 + col)].width = 20
-    
-    # Guardar en buffer
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    return Response(
-        content=buffer.getvalue(),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=horario_semanal_{semester}.xlsx"}
-    )
+@http_cache.no_etag
+async def export_weekly_schedule(semester: str):
+    """Exportar horario semanal a Excel
+
+    El libro se genera en el pool de exportaciones y la petición lo espera sin
+    ocupar un hilo; si tarda más de `EXPORT_WAIT_TIMEOUT` responde 202 con el
+    estado del trabajo y su dirección en `Location`.
+    """
+    job = await run_in_threadpool(export_jobs.submit, "weekly", semester)
+    return export_jobs.job_response(await export_jobs.wait(job, settings.export_wait_timeout))
 
 
 @router.get("/export/teacher/{teacher_id}/{semester}")
-def export_teacher_schedule(teacher_id: int, semester: str, db: Session = Depends(get_db)):
+@http_cache.no_etag
+async def export_teacher_schedule(teacher_id: int, semester: str):
     """Exportar horario de un profesor específico a Excel"""
-    # Verificar que el profesor existe
-    teacher = db.query(Teacher).filter(Teacher.id == teacher_id).first()
-    if not teacher:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="Profesor no encontrado"
-        )
-    
-    schedules = db.query(Schedule).filter(
-        and_(
-            Schedule.teacher_id == teacher_id,
-            Schedule.semester == semester,
-            Schedule.is_active == True
-        )
-    ).all()
-    
-    if not schedules:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail="No se encontraron horarios para este profesor en este semestre"
-        )
-    
-    # Crear workbook
-    wb = Workbook()
-    ws = wb.active
-    ws.title = f"Horario {teacher.full_name}"
-    
-    # Configurar encabezados
-    headers = ["Hora", "Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
-    for col, header in enumerate(headers, 1):
-        cell = ws.cell(row=1, column=col, value=header)
-        cell.font = Font(bold=True)
-        cell.fill = PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid")
-    
-    # Horarios típicos
-    time_slots = []
-    start_time = datetime.strptime("07:00", "%H:%M")
-    end_time = datetime.strptime("22:00", "%H:%M")
-    
-    current_time = start_time
-    while current_time <= end_time:
-        time_slots.append(current_time.strftime("%H:%M"))
-        current_time += timedelta(hours=1)
-    
-    # Llenar horarios
-    for row, time_slot in enumerate(time_slots, 2):
-        ws.cell(row=row, column=1, value=time_slot)
-        
-        for day in range(6):
-            # Buscar clases en este horario
-            classes = [s for s in schedules if s.day_of_week == day]
-            
-            # Buscar clases que coincidan con este horario
-            matching_classes = []
-            for cls in classes:
-                cls_start = cls.start_time.strftime("%H:%M")
-                if cls_start == time_slot:
-                    subject = db.query(Subject).filter(Subject.id == cls.subject_id).first()
-                    class_type = db.query(ClassType).filter(ClassType.id == cls.class_type_id).first()
-                    classroom = db.query(Classroom).filter(Classroom.id == cls.classroom_id).first()
-                    
-                    class_info = f"{subject.acronym} - {class_type.acronym}\n{classroom.code}"
-                    matching_classes.append(class_info)
-            
-            if matching_classes:
-                cell_value = "\n".join(matching_classes)
-                cell = ws.cell(row=row, column=day + 2, value=cell_value)
-                cell.alignment = Alignment(wrap_text=True, vertical='top')
-    
-    # Ajustar ancho de columnas
-    for col in range(1, 8):
-        ws.column_dimensions[chr(64 + col)].width = 20
-    
-    # Guardar en buffer
-    buffer = io.BytesIO()
-    wb.save(buffer)
-    buffer.seek(0)
-    
-    return Response(
-        content=buffer.getvalue(),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": f"attachment; filename=horario_{teacher.full_name.replace(' ', '_')}_{semester}.xlsx"}
-    ) 
\ No newline at end of file
+    job = await run_in_threadpool(export_jobs.submit, "teacher", semester, teacher_id)
+    return export_jobs.job_response(await export_jobs.wait(job, settings.export_wait_timeout))
@@ -0,0 +1,43 @@
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from fastapi.responses import JSONResponse
+from sqlalchemy.orm import Session
+from sqlalchemy.exc import IntegrityError
+from app.api.async_routes import cpu_bound
+from app.database import get_db
+from app.schemas.semester import SemesterCloneRequest, SemesterCloneResponse
+from app.services import overlap_guard, semester_clone
+from app.api.v1.endpoints.schedules import CLASSROOM_CONFLICT, TEACHER_CONFLICT
+
+router = APIRouter()
+
+
+@router.post(
+    "/{source}/clone",
+    response_model=SemesterCloneResponse,
+    status_code=status.HTTP_201_CREATED,
+    responses={400: {"model": SemesterCloneResponse}},
+)
+@cpu_bound
+def clone_semester(source: str, request: SemesterCloneRequest, response: Response,
+                   db: Session = Depends(get_db)):
+    """Copiar los horarios activos de un semestre a otro
+
+    Las fechas se desplazan al nuevo inicio y se recortan al nuevo fin; los
+    profesores y aulas de `teacher_map` y `classroom_map` se sustituyen. Con
+    `dry_run` solo se informa. Si alguna copia se solapa no se guarda nada.
+    """
+    try:
+        result = semester_clone.clone(db, source, request)
+    except IntegrityError as exc:
+        constraint = overlap_guard.violated_constraint(exc)
+        if constraint is None:
+            raise
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=CLASSROOM_CONFLICT if constraint == overlap_guard.CLASSROOM_CONSTRAINT else TEACHER_CONFLICT
+        )
+    if result["conflicts"] and not request.dry_run:
+        return JSONResponse(status_code=status.HTTP_400_BAD_REQUEST, content=result)
+    if request.dry_run:
+        response.status_code = status.HTTP_200_OK
+    return result
@@ -1,9 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
+from app.api import fast_json, uploads
 from app.database import get_db
 from app.models.subject import Subject
 from app.schemas.subject import SubjectCreate, SubjectUpdate, SubjectResponse
+from app.schemas.pagination import Page
+from app.schemas.reference_import import ReferenceImportResponse
+from app.services import reference_import, versioning
 
 router = APIRouter()
 
@@ -21,16 +26,38 @@ def create_subject(subject: SubjectCreate, db: Session = Depends(get_db)):
     
     db_subject = Subject(**subject.model_dump())
     db.add(db_subject)
+    versioning.record_change(db, "subjects")
     db.commit()
     db.refresh(db_subject)
     return db_subject
 
 
-@router.get("/", response_model=List[SubjectResponse])
-def get_subjects(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Obtener lista de asignaturas"""
-    subjects = db.query(Subject).offset(skip).limit(limit).all()
-    return subjects
+@router.post("/import", response_model=ReferenceImportResponse)
+async def import_subjects(request: Request, db: Session = Depends(get_db)):
+    """Importar asignaturas desde un archivo CSV o XLSX
+
+    Inserta las filas nuevas y actualiza las existentes por `code`. Cada lote
+    se guarda por separado y las filas con errores se informan sin impedir el resto.
+    """
+    rows = await uploads.file_rows(request, keep_empty=True)
+    return await run_in_threadpool(reference_import.import_rows, db, "subjects", rows)
+
+
+@router.get("/", response_model=Union[List[SubjectResponse], Page[SubjectResponse]])
+def get_subjects(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Obtener lista de asignaturas
+
+    Con `cursor` (vacío para la primera página) devuelve una página con `next_cursor`.
+    """
+    statement = fast_json.select_fields(Subject, SubjectResponse)
+    return fast_json.list_response(db, statement, Subject.id, skip, limit, cursor, include_total, response)
 
 
 @router.get("/{subject_id}", response_model=SubjectResponse)
@@ -68,6 +95,7 @@ def update_subject(subject_id: int, subject: SubjectUpdate, db: Session = Depend
     for field, value in update_data.items():
         setattr(db_subject, field, value)
     
+    versioning.record_change(db, "subjects", ids=[subject_id])
     db.commit()
     db.refresh(db_subject)
     return db_subject
@@ -84,5 +112,6 @@ def delete_subject(subject_id: int, db: Session = Depends(get_db)):
         )
     
     db_subject.is_active = False
+    versioning.record_change(db, "subjects", ids=[subject_id])
     db.commit()
     return None 
\ No newline at end of file
@@ -1,9 +1,15 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import or_
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Optional, Union
+from app.api import fast_json, uploads
 from app.database import get_db
 from app.models.teacher import Teacher
 from app.schemas.teacher import TeacherCreate, TeacherUpdate, TeacherResponse
+from app.schemas.pagination import Page
+from app.schemas.reference_import import ReferenceImportResponse
+from app.services import reference_import, versioning
 
 router = APIRouter()
 
@@ -11,17 +17,16 @@ router = APIRouter()
 @router.post("/", response_model=TeacherResponse, status_code=status.HTTP_201_CREATED)
 def create_teacher(teacher: TeacherCreate, db: Session = Depends(get_db)):
     """Crear un nuevo profesor"""
-    # Verificar si ya existe un profesor con el mismo employee_id
-    db_teacher = db.query(Teacher).filter(Teacher.employee_id == teacher.employee_id).first()
-    if db_teacher:
+    # Verificar en una sola consulta que el employee_id y el email están libres
+    taken = db.query(Teacher.employee_id, Teacher.email).filter(
+        or_(Teacher.employee_id == teacher.employee_id, Teacher.email == teacher.email)
+    ).all()
+    if any(row.employee_id == teacher.employee_id for row in taken):
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ya existe un profesor con este ID de empleado"
         )
-    
-    # Verificar si ya existe un profesor con el mismo email
-    db_teacher = db.query(Teacher).filter(Teacher.email == teacher.email).first()
-    if db_teacher:
+    if taken:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Ya existe un profesor con este email"
@@ -29,16 +34,40 @@ def create_teacher(teacher: TeacherCreate, db: Session = Depends(get_db)):
     
     db_teacher = Teacher(**teacher.model_dump())
     db.add(db_teacher)
+    versioning.record_change(db, "teachers")
     db.commit()
     db.refresh(db_teacher)
     return db_teacher
 
 
-@router.get("/", response_model=List[TeacherResponse])
-def get_teachers(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    """Obtener lista de profesores"""
-    teachers = db.query(Teacher).offset(skip).limit(limit).all()
-    return teachers
+@router.post("/import", response_model=ReferenceImportResponse)
+async def import_teachers(request: Request, db: Session = Depends(get_db)):
+    """Importar profesores desde un archivo CSV o XLSX
+
+    Inserta las filas nuevas y actualiza las existentes por `employee_id`. Cada lote
+    se guarda por separado y las filas con errores se informan sin impedir el resto.
+    """
+    rows = await uploads.file_rows(request, keep_empty=True)
+    return await run_in_threadpool(reference_import.import_rows, db, "teachers", rows)
+
+
+@router.get("/", response_model=Union[List[TeacherResponse], Page[TeacherResponse]])
+def get_teachers(
+    response: Response,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    include_total: bool = False,
+    db: Session = Depends(get_db)
+):
+    """Obtener lista de profesores
+
+    Con `cursor` (vacío para la primera página) devuelve una página con `next_cursor`.
+    """
+    statement = fast_json.select_fields(
+        Teacher, TeacherResponse, full_name=Teacher.first_name + " " + Teacher.last_name
+    )
+    return fast_json.list_response(db, statement, Teacher.id, skip, limit, cursor, include_total, response)
 
 
 @router.get("/{teacher_id}", response_model=TeacherResponse)
@@ -85,6 +114,7 @@ def update_teacher(teacher_id: int, teacher: TeacherUpdate, db: Session = Depend
     for field, value in update_data.items():
         setattr(db_teacher, field, value)
     
+    versioning.record_change(db, "teachers", ids=[teacher_id])
     db.commit()
     db.refresh(db_teacher)
     return db_teacher
@@ -101,5 +131,6 @@ def delete_teacher(teacher_id: int, db: Session = Depends(get_db)):
         )
     
     db_teacher.is_active = False
+    versioning.record_change(db, "teachers", ids=[teacher_id])
     db.commit()
     return None 
\ No newline at end of file
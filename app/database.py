@@ -1,10 +1,82 @@
-from sqlalchemy import create_engine
+import threading
+import time
+
+from sqlalchemy import create_engine, exc
+from sqlalchemy.engine import make_url
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
 from app.config import settings
 
+
+class PoolStats:
+    """Tiempo de espera para obtener una conexión del pool"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            self.checkouts += 1
+            self.timeouts += timed_out
+            self.wait_seconds += seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(1000 * self.wait_seconds / self.checkouts, 3) if self.checkouts else 0.0,
+                "max_wait_ms": round(1000 * self.max_wait_seconds, 3),
+            }
+
+
+def _timed_pool(base, stats: PoolStats):
+    class TimedPool(base):
+        def connect(self):
+            start = time.perf_counter()
+            try:
+                connection = super().connect()
+            except exc.TimeoutError:
+                stats.record(time.perf_counter() - start, timed_out=True)
+                raise
+            stats.record(time.perf_counter() - start)
+            return connection
+
+    TimedPool.__name__ = f"Timed{base.__name__}"
+    return TimedPool
+
+
+def engine_options(url: str, stats: PoolStats, asynchronous: bool = False) -> dict:
+    """Opciones de pool y de conexión según `Settings` (SQLite usa las de SQLAlchemy)"""
+    backend = make_url(url).get_backend_name()
+    if backend == "sqlite":
+        return {}
+    options = {
+        "poolclass": _timed_pool(AsyncAdaptedQueuePool if asynchronous else QueuePool, stats),
+        "pool_size": settings.db_pool_size,
+        "max_overflow": settings.db_max_overflow,
+        "pool_timeout": settings.db_pool_timeout,
+        "pool_recycle": settings.db_pool_recycle,
+        "pool_pre_ping": settings.db_pool_pre_ping,
+    }
+    if backend == "postgresql" and settings.db_statement_timeout_ms:
+        timeout = str(settings.db_statement_timeout_ms)
+        options["connect_args"] = (
+            {"server_settings": {"statement_timeout": timeout}} if asynchronous
+            else {"options": f"-c statement_timeout={timeout}"}
+        )
+    return options
+
+
 # Create database engine
-engine = create_engine(settings.database_url)
+pool_stats = PoolStats()
+engine = create_engine(settings.database_url, **engine_options(settings.database_url, pool_stats))
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -19,4 +91,38 @@ def get_db():
     try:
         yield db
     finally:
-        db.close() 
\ No newline at end of file
+        db.close()
+
+
+_ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url: str) -> str:
+    """URL equivalente con el driver asíncrono (asyncpg o aiosqlite)"""
+    scheme, sep, rest = url.partition("://")
+    return f"{_ASYNC_DRIVERS.get(scheme, scheme)}{sep}{rest}"
+
+
+# Async engine, only in async mode: the sync engine stays for background jobs,
+# scripts and migrations
+async_engine = None
+AsyncSessionLocal = None
+async_pool_stats = PoolStats()
+if settings.database_async:
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    _async_url = settings.async_database_url or async_database_url(settings.database_url)
+    async_engine = create_async_engine(
+        _async_url, **engine_options(_async_url, async_pool_stats, asynchronous=True)
+    )
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False)
+
+
+# Dependency to get async database session
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,49 @@
+"""
+Sonda de disponibilidad: ida y vuelta a la base de datos y estado del pool.
+"""
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
+
+from app.database import PoolStats
+
+
+def pool_status(engine: Engine, stats: PoolStats) -> dict:
+    pool = engine.pool
+    status = {"class": type(pool).__name__, "wait": stats.snapshot()}
+    if isinstance(pool, QueuePool):
+        limit = pool.size() + max(pool._max_overflow, 0)
+        status.update({
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "saturated": pool._max_overflow > -1 and pool.checkedout() >= limit,
+        })
+    return status
+
+
+def probe(engine: Engine, stats: PoolStats) -> dict:
+    """Ejecutar SELECT 1 y medir la latencia (síncrono)"""
+    start = time.perf_counter()
+    try:
+        with engine.connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except Exception as exc:
+        return {"ok": False, "error": str(exc), "pool": pool_status(engine, stats)}
+    latency = time.perf_counter() - start
+    return {"ok": True, "latency_ms": round(latency * 1000, 3), "pool": pool_status(engine, stats)}
+
+
+async def probe_async(engine, stats: PoolStats) -> dict:
+    """Ejecutar SELECT 1 con el motor asíncrono y medir la latencia"""
+    start = time.perf_counter()
+    try:
+        async with engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+    except Exception as exc:
+        return {"ok": False, "error": str(exc), "pool": pool_status(engine.sync_engine, stats)}
+    latency = time.perf_counter() - start
+    return {"ok": True, "latency_ms": round(latency * 1000, 3), "pool": pool_status(engine.sync_engine, stats)}
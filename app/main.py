@@ -1,16 +1,15 @@
+from app import startup  # primero: referencia para medir el tiempo de arranque
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from app.config import settings
 from app.api.v1.api import api_router
-from app.database import engine
-from app.models import *  # Import all models
-
-# Create database tables
-def create_tables():
-    """Create all database tables"""
-    from app.database import Base
-    Base.metadata.create_all(bind=engine)
+from app.api.fast_json import default_response_class
+from app import health, metrics
+from app.database import engine, async_engine, pool_stats, async_pool_stats
+from app.services import invalidation
 
 # Create FastAPI app
 app = FastAPI(
@@ -18,7 +17,8 @@ app = FastAPI(
     description="Sistema de Gestión de Horarios Académicos CUJAE",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=default_response_class(),
 )
 
 # Add CORS middleware
@@ -36,14 +36,33 @@ app.add_middleware(
     allowed_hosts=["*"]  # Configure this properly for production
 )
 
+# Add request/DB metrics middleware (outermost, so it times the whole stack)
+if settings.metrics_enabled:
+    metrics.instrument_engine(engine)
+    if async_engine is not None:
+        metrics.instrument_engine(async_engine.sync_engine)
+    app.add_middleware(metrics.MetricsMiddleware, debug_headers=settings.debug)
+
 # Include API router
 app.include_router(api_router, prefix="/api/v1")
 
 # Startup event
 @app.on_event("startup")
 async def startup_event():
-    """Create database tables on startup"""
-    create_tables()
+    """Prepare the schema (SCHEMA_MANAGEMENT) and pre-warm what STARTUP_PREWARM lists"""
+    startup.run(engine)
+    if async_engine is not None:
+        await startup.run_async(async_engine)
+    metrics.startup_seconds.update(startup.phases)
+    invalidation.start(engine)
+
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Stop the cache invalidation listener and close the async connection pool"""
+    invalidation.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
 
 # Health check endpoint
 @app.get("/health")
@@ -51,6 +70,25 @@ async def health_check():
     """Health check endpoint"""
     return {"status": "healthy", "message": "CUJAE Calendar Management System is running"}
 
+# Readiness endpoint
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: database round trip and connection pool usage"""
+    checks = {"database": await run_in_threadpool(health.probe, engine, pool_stats)}
+    if async_engine is not None:
+        checks["database_async"] = await health.probe_async(async_engine, async_pool_stats)
+    ready = all(check["ok"] for check in checks.values())
+    return JSONResponse(
+        status_code=200 if ready else 503,
+        content={"status": "ready" if ready else "unavailable", **checks},
+    )
+
+# Metrics endpoint
+@app.get("/metrics", include_in_schema=False)
+async def metrics_endpoint():
+    """Prometheus metrics of this worker"""
+    return Response(content=metrics.render(), media_type=metrics.PROMETHEUS_CONTENT_TYPE)
+
 # Root endpoint
 @app.get("/")
 async def root():
@@ -0,0 +1,182 @@
+"""
+Métricas por petición en formato de texto de Prometheus.
+
+Un middleware ASGI mide la latencia y el tamaño de cada respuesta por ruta, y
+los eventos `before/after_cursor_execute` del motor cuentan las sentencias SQL
+y el tiempo de base de datos de la petición en curso (a través de una
+variable de contexto, que también llega a los endpoints del threadpool). Las
+consultas de los trabajos en segundo plano no se atribuyen a ninguna petición.
+
+Las métricas son por proceso: con varios workers, Prometheus debe consultar
+cada uno o agregarlas.
+"""
+import threading
+import time
+from bisect import bisect_left
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.routing import Match
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4"  # Starlette añade el charset
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 500)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+
+@dataclass
+class RequestStats:
+    queries: int = 0
+    db_seconds: float = 0.0
+
+
+_current: ContextVar[Optional[RequestStats]] = ContextVar("request_stats", default=None)
+
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._series: Dict[tuple, list] = {}  # labels -> [conteos por cubeta..., suma, total]
+
+    def observe(self, labels: tuple, value: float):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labels)
+            if series is None:
+                series = self._series[labels] = [0] * len(self.buckets) + [0.0, 0]
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self, label_names: Tuple[str, ...]) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.help_text}"
+        yield f"# TYPE {self.name} histogram"
+        with self._lock:
+            series = {labels: list(values) for labels, values in self._series.items()}
+        for labels, values in sorted(series.items()):
+            base = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(label_names, labels))
+            cumulative = 0
+            for bound, count in zip(self.buckets, values):
+                cumulative += count
+                yield f'{self.name}_bucket{{{base},le="{bound:g}"}} {cumulative}'
+            yield f'{self.name}_bucket{{{base},le="+Inf"}} {values[-1]}'
+            yield f"{self.name}_sum{{{base}}} {values[-2]:.6f}"
+            yield f"{self.name}_count{{{base}}} {values[-1]}"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+REQUEST_LABELS = ("method", "route", "status")
+ROUTE_LABELS = ("method", "route")
+
+request_duration = Histogram(
+    "http_request_duration_seconds", "Latencia de las peticiones HTTP", LATENCY_BUCKETS
+)
+response_size = Histogram(
+    "http_response_size_bytes", "Tamaño del cuerpo de las respuestas HTTP", SIZE_BUCKETS
+)
+request_queries = Histogram(
+    "db_queries_per_request", "Sentencias SQL ejecutadas por petición", QUERY_BUCKETS
+)
+request_db_time = Histogram(
+    "db_time_per_request_seconds", "Tiempo total de base de datos por petición", LATENCY_BUCKETS
+)
+
+
+# Duración de cada fase del arranque de este worker (ver app.startup)
+startup_seconds: Dict[str, float] = {}
+
+
+def render() -> str:
+    lines = []
+    lines.extend(request_duration.render(REQUEST_LABELS))
+    lines.extend(response_size.render(REQUEST_LABELS))
+    lines.extend(request_queries.render(ROUTE_LABELS))
+    lines.extend(request_db_time.render(ROUTE_LABELS))
+    if startup_seconds:
+        lines.append("# HELP app_startup_seconds Duración de las fases del arranque")
+        lines.append("# TYPE app_startup_seconds gauge")
+        for phase, seconds in startup_seconds.items():
+            lines.append(f'app_startup_seconds{{phase="{_escape(phase)}"}} {seconds:.6f}')
+    return "\n".join(lines) + "\n"
+
+
+def instrument_engine(engine: Engine):
+    """Contar sentencias y tiempo de base de datos de la petición en curso"""
+
+    # El inicio se guarda en el contexto de la sentencia: las que fallan no
+    # llegan a after_cursor_execute y no deben dejar restos en la conexión
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        context._query_start = time.perf_counter()
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        start = context._query_start
+        stats = _current.get()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += time.perf_counter() - start
+
+
+def _route_template(app, scope) -> str:
+    """Plantilla de la ruta (p. ej. /api/v1/teachers/{teacher_id}) para acotar las etiquetas"""
+    for route in app.router.routes:
+        match, _ = route.matches(scope)
+        if match == Match.FULL:
+            return getattr(route, "path", scope["path"])
+    return "unmatched"
+
+
+class MetricsMiddleware:
+    def __init__(self, app, debug_headers: bool = False):
+        self.app = app
+        self.debug_headers = debug_headers
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        stats = RequestStats()
+        token = _current.set(stats)
+        start = time.perf_counter()
+        status_code = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status_code, size
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if self.debug_headers:
+                    elapsed = (time.perf_counter() - start) * 1000
+                    message["headers"] = list(message.get("headers", [])) + [
+                        (b"x-db-queries", str(stats.queries).encode()),
+                        (b"server-timing", (
+                            f'db;dur={stats.db_seconds * 1000:.3f};desc="{stats.queries} queries", '
+                            f"app;dur={elapsed:.3f}"
+                        ).encode()),
+                    ]
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _current.reset(token)
+            route = _route_template(scope["app"], scope)
+            method = scope["method"]
+            request_duration.observe((method, route, str(status_code)), time.perf_counter() - start)
+            response_size.observe((method, route, str(status_code)), size)
+            request_queries.observe((method, route), stats.queries)
+            request_db_time.observe((method, route), stats.db_seconds)
@@ -4,6 +4,9 @@ from .class_type import ClassType
 from .classroom import Classroom
 from .schedule import Schedule
 from .subject_teacher import SubjectTeacher
+from .change_counter import ChangeCounter
+from .schedule_exception import ScheduleException
+from .change_log import ChangeLog
 
 __all__ = [
     "Subject",
@@ -11,5 +14,8 @@ __all__ = [
     "ClassType",
     "Classroom",
     "Schedule",
-    "SubjectTeacher"
+    "SubjectTeacher",
+    "ChangeCounter",
+    "ScheduleException",
+    "ChangeLog"
 ] 
\ No newline at end of file
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ChangeCounter(Base):
+    __tablename__ = "change_counters"
+    
+    # e.g. "table:teachers", "semester:2024-1"
+    scope = Column(String(100), primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now())
+    
+    def __repr__(self):
+        return f"<ChangeCounter(scope='{self.scope}', version={self.version})>"
@@ -0,0 +1,18 @@
+from sqlalchemy import Column, Integer, String, DateTime
+from sqlalchemy.sql import func
+from app.database import Base
+
+
+class ChangeLog(Base):
+    """Eventos de invalidación de cachés leídos por sondeo (bases de datos sin LISTEN/NOTIFY)"""
+    __tablename__ = "change_log"
+    
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    table_name = Column(String(100), nullable=False)
+    row_id = Column(Integer, nullable=True)
+    semester = Column(String(20), nullable=True)
+    origin = Column(String(32), nullable=False)  # proceso que hizo la escritura
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
+    
+    def __repr__(self):
+        return f"<ChangeLog(id={self.id}, table_name='{self.table_name}', row_id={self.row_id}, semester={self.semester})>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, ForeignKey, String, Date, Time, Text, Boolean, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, String, Date, Time, Text, Boolean, DateTime, Index
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
 from app.database import Base
@@ -6,6 +6,14 @@ from app.database import Base
 
 class Schedule(Base):
     __tablename__ = "schedules"
+    __table_args__ = (
+        # Paginación por cursor (id > :último) dentro de cada filtro de la lista
+        Index("ix_schedules_semester_id", "semester", "id"),
+        Index("ix_schedules_teacher_id_id", "teacher_id", "id"),
+        Index("ix_schedules_subject_id_id", "subject_id", "id"),
+        # Plantillas con clases dentro de un rango de fechas (occurrences)
+        Index("ix_schedules_week_range", "week_start", "week_end", "day_of_week"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     subject_id = Column(Integer, ForeignKey("subjects.id"), nullable=False)
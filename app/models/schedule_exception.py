@@ -0,0 +1,44 @@
+from sqlalchemy import Column, Integer, ForeignKey, String, Date, Time, Text, DateTime, Index, UniqueConstraint
+from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
+from app.database import Base
+
+CANCEL = "cancel"
+MOVE = "move"
+SUBSTITUTE = "substitute"
+EXCEPTION_KINDS = (CANCEL, MOVE, SUBSTITUTE)
+
+
+class ScheduleException(Base):
+    """Cambio puntual de una clase del horario semanal en una fecha concreta"""
+    __tablename__ = "schedule_exceptions"
+    __table_args__ = (
+        UniqueConstraint("schedule_id", "date", name="uq_schedule_exceptions_schedule_date"),
+        # Resolución por rango de fechas: clases afectadas y clases trasladadas a él
+        Index("ix_schedule_exceptions_date", "date"),
+        Index("ix_schedule_exceptions_new_date", "new_date"),
+    )
+    
+    id = Column(Integer, primary_key=True, index=True)
+    schedule_id = Column(Integer, ForeignKey("schedules.id", ondelete="CASCADE"), nullable=False)
+    date = Column(Date, nullable=False)  # Fecha original de la clase
+    kind = Column(String(20), nullable=False)  # cancel, move, substitute
+    
+    # Traslado (move): nueva fecha y horas; sustitución: aula y/o profesor
+    new_date = Column(Date, nullable=True)
+    new_start_time = Column(Time, nullable=True)
+    new_end_time = Column(Time, nullable=True)
+    classroom_id = Column(Integer, ForeignKey("classrooms.id"), nullable=True)
+    teacher_id = Column(Integer, ForeignKey("teachers.id"), nullable=True)
+    
+    reason = Column(Text, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+    updated_at = Column(DateTime(timezone=True), onupdate=func.now())
+    
+    # Relationships
+    schedule = relationship("Schedule")
+    classroom = relationship("Classroom")
+    teacher = relationship("Teacher")
+    
+    def __repr__(self):
+        return f"<ScheduleException(id={self.id}, schedule_id={self.schedule_id}, date={self.date}, kind={self.kind})>"
@@ -2,14 +2,28 @@ from .subject import SubjectCreate, SubjectUpdate, SubjectResponse
 from .teacher import TeacherCreate, TeacherUpdate, TeacherResponse
 from .class_type import ClassTypeCreate, ClassTypeUpdate, ClassTypeResponse
 from .classroom import ClassroomCreate, ClassroomUpdate, ClassroomResponse
-from .schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse
+from .schedule import ScheduleCreate, ScheduleUpdate, ScheduleResponse, ScheduleBulkResponse
 from .subject_teacher import SubjectTeacherCreate, SubjectTeacherResponse
+from .timetable import SessionDemand, TimetableGenerateRequest, TimetableJobResponse
+from .pagination import Page
+from .availability import FreeRoom, RankedRoom, FreeWindow
+from .occurrence import OccurrenceResponse
+from .schedule_exception import (
+    ScheduleExceptionCreate, ScheduleExceptionUpdate, ScheduleExceptionResponse, OccurrenceConflict
+)
+from .analytics import RoomUtilization, DepartmentWorkload, ClassTypeShare, SubjectClassTypeMix
 
 __all__ = [
     "SubjectCreate", "SubjectUpdate", "SubjectResponse",
     "TeacherCreate", "TeacherUpdate", "TeacherResponse", 
     "ClassTypeCreate", "ClassTypeUpdate", "ClassTypeResponse",
     "ClassroomCreate", "ClassroomUpdate", "ClassroomResponse",
-    "ScheduleCreate", "ScheduleUpdate", "ScheduleResponse",
-    "SubjectTeacherCreate", "SubjectTeacherResponse"
+    "ScheduleCreate", "ScheduleUpdate", "ScheduleResponse", "ScheduleBulkResponse",
+    "SubjectTeacherCreate", "SubjectTeacherResponse",
+    "SessionDemand", "TimetableGenerateRequest", "TimetableJobResponse",
+    "Page",
+    "FreeRoom", "RankedRoom", "FreeWindow",
+    "OccurrenceResponse",
+    "ScheduleExceptionCreate", "ScheduleExceptionUpdate", "ScheduleExceptionResponse", "OccurrenceConflict",
+    "RoomUtilization", "DepartmentWorkload", "ClassTypeShare", "SubjectClassTypeMix"
 ] 
\ No newline at end of file
@@ -0,0 +1,36 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+
+
+class RoomUtilization(BaseModel):
+    building: str
+    rooms: int = Field(..., description="Aulas activas del edificio")
+    hour: int = Field(..., description="Hora del día (inicio de la franja de una hora)")
+    occupied_minutes: int = Field(..., description="Minutos-aula ocupados en la semana")
+    utilization: float = Field(..., description="Fracción de los minutos-aula disponibles que están ocupados")
+
+
+class DepartmentWorkload(BaseModel):
+    department: str
+    teachers: int
+    teaching_teachers: int = Field(..., description="Profesores con al menos una clase en el semestre")
+    total_hours: float = Field(..., description="Horas semanales de clase del departamento")
+    mean_hours: float = Field(..., description="Media por profesor con clases")
+    max_hours: float
+    busiest_teacher: Optional[str] = None
+
+
+class ClassTypeShare(BaseModel):
+    class_type: str
+    sessions: int
+    hours: float
+    share: float = Field(..., description="Fracción de las horas de la asignatura")
+
+
+class SubjectClassTypeMix(BaseModel):
+    subject_id: int
+    code: str
+    name: str
+    sessions: int
+    hours: float
+    mix: List[ClassTypeShare]
@@ -0,0 +1,28 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import time
+
+
+class FreeRoom(BaseModel):
+    id: int
+    code: str
+    name: str
+    building: Optional[str] = None
+    floor: Optional[int] = None
+    capacity: Optional[int] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class RankedRoom(FreeRoom):
+    spare_seats: Optional[int] = Field(None, description="Capacidad sobrante respecto a los estudiantes")
+    same_building: Optional[bool] = Field(None, description="Está en el edificio preferido")
+    floor_distance: Optional[int] = Field(None, description="Pisos de distancia al piso preferido")
+
+
+class FreeWindow(BaseModel):
+    day_of_week: int
+    start_time: time
+    end_time: time
+    minutes: int
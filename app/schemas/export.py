@@ -0,0 +1,23 @@
+from pydantic import BaseModel, Field
+from typing import Literal, Optional
+
+
+class ExportCreate(BaseModel):
+    kind: Literal["weekly", "teacher"] = Field(..., description="Tipo de exportación")
+    semester: str = Field(..., min_length=1, max_length=20, description="Semestre (ej: 2024-1)")
+    teacher_id: Optional[int] = Field(None, description="ID del profesor (exportación por profesor)")
+
+
+class ExportJobResponse(BaseModel):
+    id: str
+    kind: str
+    semester: str
+    teacher_id: Optional[int] = None
+    status: str
+    filename: Optional[str] = None
+    message: Optional[str] = None
+    created_at: str
+    finished_at: Optional[str] = None
+    
+    class Config:
+        from_attributes = True
@@ -0,0 +1,20 @@
+from pydantic import BaseModel, Field
+from typing import Optional
+from datetime import date as Date, time
+
+
+class OccurrenceResponse(BaseModel):
+    date: Date = Field(..., description="Fecha de la clase")
+    start_time: time
+    end_time: time
+    schedule_id: int = Field(..., description="Horario semanal del que procede")
+    subject_id: int
+    class_type_id: int
+    classroom_id: int
+    teacher_id: int
+    semester: str
+    status: str = Field(..., description="scheduled, moved, substituted o cancelled")
+    exception_id: Optional[int] = Field(None, description="Excepción aplicada, si la hay")
+    
+    class Config:
+        from_attributes = True
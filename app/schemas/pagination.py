@@ -0,0 +1,11 @@
+from pydantic import BaseModel, Field
+from typing import Generic, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    items: List[T]
+    next_cursor: Optional[str] = Field(None, description="Cursor de la página siguiente (nulo en la última)")
+    total: Optional[int] = Field(None, description="Total de registros (si se pidió include_total)")
+    total_is_estimate: bool = Field(False, description="Indica si el total es una estimación")
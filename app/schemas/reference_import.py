@@ -0,0 +1,15 @@
+from pydantic import BaseModel, Field
+from typing import List
+
+
+class ReferenceImportRowError(BaseModel):
+    row: int = Field(..., description="Número de fila (desde 1)")
+    errors: List[str]
+
+
+class ReferenceImportResponse(BaseModel):
+    total: int
+    created: int = Field(..., description="Filas insertadas")
+    updated: int = Field(..., description="Filas que ya existían por su clave natural")
+    failed: int
+    errors: List[ReferenceImportRowError] = []
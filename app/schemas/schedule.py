@@ -1,6 +1,9 @@
-from pydantic import BaseModel, Field
-from typing import Optional
-from datetime import date, time
+from pydantic import BaseModel, Field, model_validator
+from pydantic_core import PydanticCustomError
+from typing import Optional, List
+from datetime import date, time, datetime
+
+END_BEFORE_START = "La hora de fin debe ser posterior a la hora de inicio"
 
 
 class ScheduleBase(BaseModel):
@@ -18,7 +21,11 @@ class ScheduleBase(BaseModel):
 
 
 class ScheduleCreate(ScheduleBase):
-    pass
+    @model_validator(mode="after")
+    def check_times(self):
+        if self.end_time <= self.start_time:
+            raise PydanticCustomError("time_order", END_BEFORE_START)
+        return self
 
 
 class ScheduleUpdate(BaseModel):
@@ -35,12 +42,30 @@ class ScheduleUpdate(BaseModel):
     notes: Optional[str] = None
     is_active: Optional[bool] = None
 
+    @model_validator(mode="after")
+    def check_times(self):
+        if self.start_time is not None and self.end_time is not None and self.end_time <= self.start_time:
+            raise PydanticCustomError("time_order", END_BEFORE_START)
+        return self
+
 
 class ScheduleResponse(ScheduleBase):
     id: int
     is_active: bool
-    created_at: Optional[str] = None
-    updated_at: Optional[str] = None
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
     
     class Config:
-        from_attributes = True 
\ No newline at end of file
+        from_attributes = True
+
+
+class ScheduleBulkRowError(BaseModel):
+    row: int = Field(..., description="Número de fila (desde 1)")
+    errors: List[str]
+
+
+class ScheduleBulkResponse(BaseModel):
+    total: int
+    created: int
+    failed: int
+    errors: List[ScheduleBulkRowError] = []
@@ -0,0 +1,48 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List, Literal
+from datetime import date as Date, time, datetime
+
+ExceptionKind = Literal["cancel", "move", "substitute"]
+
+
+class ScheduleExceptionBase(BaseModel):
+    schedule_id: int = Field(..., description="ID del horario semanal")
+    date: Date = Field(..., description="Fecha original de la clase")
+    kind: ExceptionKind = Field(..., description="cancel, move o substitute")
+    new_date: Optional[Date] = Field(None, description="Nueva fecha (move)")
+    new_start_time: Optional[time] = Field(None, description="Nueva hora de inicio (move)")
+    new_end_time: Optional[time] = Field(None, description="Nueva hora de fin (move)")
+    classroom_id: Optional[int] = Field(None, description="Aula sustituta")
+    teacher_id: Optional[int] = Field(None, description="Profesor sustituto")
+    reason: Optional[str] = Field(None, description="Motivo del cambio")
+
+
+class ScheduleExceptionCreate(ScheduleExceptionBase):
+    pass
+
+
+class ScheduleExceptionUpdate(BaseModel):
+    kind: Optional[ExceptionKind] = None
+    new_date: Optional[Date] = None
+    new_start_time: Optional[time] = None
+    new_end_time: Optional[time] = None
+    classroom_id: Optional[int] = None
+    teacher_id: Optional[int] = None
+    reason: Optional[str] = None
+
+
+class ScheduleExceptionResponse(ScheduleExceptionBase):
+    id: int
+    created_at: Optional[datetime] = None
+    updated_at: Optional[datetime] = None
+    
+    class Config:
+        from_attributes = True
+
+
+class OccurrenceConflict(BaseModel):
+    date: Date
+    resource: Literal["classroom", "teacher"]
+    resource_id: int
+    schedule_ids: List[int]
+    exception_ids: List[int] = []
@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Dict, List, Literal, Optional
+from datetime import date
+
+
+class SemesterCloneRequest(BaseModel):
+    semester: str = Field(..., min_length=1, max_length=20, description="Semestre destino (ej: 2025-1)")
+    week_start: date = Field(..., description="Fecha de inicio del semestre destino")
+    week_end: date = Field(..., description="Fecha de fin del semestre destino")
+    teacher_map: Dict[int, int] = Field({}, description="Profesores a sustituir (id origen: id destino)")
+    classroom_map: Dict[int, int] = Field({}, description="Aulas a sustituir (id origen: id destino)")
+    dry_run: bool = Field(False, description="Solo informar lo que se copiaría y los conflictos")
+
+
+class SemesterCloneConflict(BaseModel):
+    schedule_id: int = Field(..., description="Horario de origen")
+    resource: Literal["classroom", "teacher"]
+    conflicting_schedule_id: int = Field(..., description="Horario con el que se solapa")
+    conflicting_is_clone: bool = Field(
+        ..., description="Si el otro horario también es una copia (si no, ya estaba en el destino)"
+    )
+    conflicting_exception_id: Optional[int] = Field(
+        None, description="Excepción si el choque es con una clase trasladada o sustituida"
+    )
+
+
+class SemesterCloneResponse(BaseModel):
+    source: str
+    semester: str
+    dry_run: bool
+    total: int = Field(..., description="Horarios que se copian (o se copiarían)")
+    skipped: int = Field(..., description="Horarios que quedan fuera de las nuevas fechas")
+    cloned: int = Field(..., description="Horarios creados (0 en la simulación o con conflictos)")
+    conflicts: List[SemesterCloneConflict] = []
@@ -0,0 +1,51 @@
+from pydantic import BaseModel, Field
+from typing import Optional, List
+from datetime import date, time, datetime
+
+
+class SessionDemand(BaseModel):
+    subject_id: int = Field(..., description="ID de la asignatura")
+    class_type_id: int = Field(..., description="ID del tipo de clase")
+    sessions_per_week: int = Field(1, ge=1, le=10, description="Sesiones por semana")
+    duration_minutes: int = Field(90, ge=15, le=480, description="Duración de cada sesión en minutos")
+    students: Optional[int] = Field(None, ge=1, le=1000, description="Cantidad de estudiantes")
+    teacher_id: Optional[int] = Field(None, description="Profesor fijo (opcional)")
+
+
+class TimetableGenerateRequest(BaseModel):
+    semester: str = Field(..., min_length=1, max_length=20, description="Semestre (ej: 2024-1)")
+    week_start: date = Field(..., description="Fecha de inicio del semestre")
+    week_end: date = Field(..., description="Fecha de fin del semestre")
+    demands: List[SessionDemand] = Field(..., min_length=1, description="Sesiones a planificar")
+    days: List[int] = Field([0, 1, 2, 3, 4, 5], min_length=1, description="Días permitidos (0=Lunes)")
+    day_start: time = Field(time(7, 0), description="Hora de inicio de la jornada")
+    day_end: time = Field(time(22, 0), description="Hora de fin de la jornada")
+    start_step_minutes: int = Field(30, ge=15, le=240, description="Separación entre horas de inicio")
+    time_budget_seconds: Optional[float] = Field(None, gt=0, le=600, description="Tiempo máximo de búsqueda")
+    seeds: int = Field(4, ge=1, le=64, description="Cantidad de semillas a explorar")
+    dry_run: bool = Field(False, description="Calcular sin guardar los horarios")
+
+
+class UnplacedSession(BaseModel):
+    subject_id: int
+    class_type_id: int
+    count: int
+
+
+class TimetableJobResponse(BaseModel):
+    id: str
+    semester: str
+    status: str
+    progress: float
+    seeds_total: int
+    seeds_done: int
+    best_unplaced: Optional[int] = None
+    best_penalty: Optional[float] = None
+    created: int
+    unplaced: List[UnplacedSession] = []
+    message: Optional[str] = None
+    created_at: datetime
+    finished_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
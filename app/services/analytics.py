@@ -0,0 +1,236 @@
+"""
+Informes agregados de un semestre calculados con NumPy.
+
+Los horarios activos del semestre se cargan una vez en arrays columnares
+(día, inicio y fin en minutos, e índices de aula, profesor, asignatura y tipo
+de clase), junto con los atributos de las tablas de referencia que usan los
+informes. Cada informe se calcula con operaciones vectorizadas (`bincount`,
+`add.at`, broadcasting) y se guarda en caché por la versión de datos del
+semestre, de modo que cualquier escritura que lo afecte lo invalida.
+"""
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.class_type import ClassType
+from app.models.classroom import Classroom
+from app.models.schedule import Schedule
+from app.models.subject import Subject
+from app.models.teacher import Teacher
+from app.services import invalidation, locking, versioning
+
+NO_BUILDING = "Sin edificio"
+NO_DEPARTMENT = "Sin departamento"
+
+
+@dataclass
+class SemesterFrame:
+    day: np.ndarray
+    start: np.ndarray  # minutos desde las 00:00
+    end: np.ndarray
+    classroom: np.ndarray  # índices en las tablas de abajo
+    teacher: np.ndarray
+    subject: np.ndarray
+    class_type: np.ndarray
+    classrooms: List[Tuple[int, str, int]]  # (id, edificio, capacidad)
+    teachers: List[Tuple[int, str, str]]  # (id, nombre, departamento)
+    subjects: List[Tuple[int, str, str]]  # (id, código, nombre)
+    class_types: List[Tuple[int, str]]  # (id, sigla)
+    reports: Dict[tuple, object] = field(default_factory=dict)
+
+    @property
+    def minutes(self) -> np.ndarray:
+        return self.end - self.start
+
+
+def _minutes(column) -> np.ndarray:
+    return np.fromiter((t.hour * 60 + t.minute for t in column), dtype=np.int32, count=len(column))
+
+
+def _index(ids: np.ndarray, known: List[tuple]) -> np.ndarray:
+    """Posición de cada id en `known` (ordenada por id); -1 si no está"""
+    keys = np.fromiter((row[0] for row in known), dtype=np.int64, count=len(known))
+    if not len(keys):
+        return np.full(len(ids), -1, dtype=np.int64)
+    position = np.minimum(np.searchsorted(keys, ids), len(keys) - 1)
+    return np.where(keys[position] == ids, position, -1)
+
+
+def load_frame(db: Session, semester: str) -> SemesterFrame:
+    rows = db.query(
+        Schedule.day_of_week, Schedule.start_time, Schedule.end_time, Schedule.classroom_id,
+        Schedule.teacher_id, Schedule.subject_id, Schedule.class_type_id
+    ).filter(and_(Schedule.semester == semester, Schedule.is_active == True)).all()
+    columns = list(zip(*rows)) if rows else [()] * 7
+
+    classrooms = [
+        (r.id, r.building or NO_BUILDING, r.capacity or 0)
+        for r in db.query(Classroom.id, Classroom.building, Classroom.capacity)
+        .filter(Classroom.is_active == True).order_by(Classroom.id)
+    ]
+    teachers = [
+        (r.id, f"{r.first_name} {r.last_name}", r.department or NO_DEPARTMENT)
+        for r in db.query(Teacher.id, Teacher.first_name, Teacher.last_name, Teacher.department)
+        .order_by(Teacher.id)
+    ]
+    subjects = [tuple(r) for r in db.query(Subject.id, Subject.code, Subject.name).order_by(Subject.id)]
+    class_types = [tuple(r) for r in db.query(ClassType.id, ClassType.acronym).order_by(ClassType.id)]
+
+    ids = [np.asarray(column, dtype=np.int64) for column in columns[3:]]
+    return SemesterFrame(
+        day=np.asarray(columns[0], dtype=np.int8),
+        start=_minutes(columns[1]),
+        end=_minutes(columns[2]),
+        classroom=_index(ids[0], classrooms),  # -1: aula dada de baja
+        teacher=_index(ids[1], teachers),
+        subject=_index(ids[2], subjects),
+        class_type=_index(ids[3], class_types),
+        classrooms=classrooms,
+        teachers=teachers,
+        subjects=subjects,
+        class_types=class_types,
+    )
+
+
+def room_utilization(frame: SemesterFrame, first_hour: int, last_hour: int, days: int) -> List[dict]:
+    """Ocupación de las aulas por edificio y hora del día"""
+    buildings, building_of_room = np.unique(
+        np.asarray([c[1] for c in frame.classrooms], dtype=object), return_inverse=True
+    )
+    rooms_per_building = np.bincount(building_of_room, minlength=len(buildings))
+    hours = np.arange(first_hour, last_hour)
+    # Minutos de cada horario dentro de cada hora: matriz (horarios x horas)
+    overlap = np.clip(
+        np.minimum(frame.end[:, None], (hours + 1) * 60) - np.maximum(frame.start[:, None], hours * 60),
+        0, None,
+    )
+    in_room = frame.classroom >= 0
+    occupied = np.zeros((len(buildings), len(hours)))
+    np.add.at(occupied, building_of_room[frame.classroom[in_room]], overlap[in_room])
+    capacity = rooms_per_building[:, None] * days * 60
+    utilization = np.divide(occupied, capacity, out=np.zeros_like(occupied), where=capacity > 0)
+    return [
+        {
+            "building": str(building),
+            "rooms": int(rooms_per_building[b]),
+            "hour": int(hour),
+            "occupied_minutes": int(occupied[b, h]),
+            "utilization": round(float(utilization[b, h]), 4),
+        }
+        for b, building in enumerate(buildings)
+        for h, hour in enumerate(hours)
+    ]
+
+
+def teacher_workload(frame: SemesterFrame) -> List[dict]:
+    """Horas semanales de clase por profesor, agregadas por departamento"""
+    hours = np.bincount(frame.teacher, weights=frame.minutes, minlength=len(frame.teachers)) / 60
+    departments, department_of_teacher = np.unique(
+        np.asarray([t[2] for t in frame.teachers], dtype=object), return_inverse=True
+    )
+    teaching = hours > 0
+    total = np.bincount(department_of_teacher, weights=hours, minlength=len(departments))
+    active = np.bincount(department_of_teacher, weights=teaching, minlength=len(departments))
+    maximum = np.zeros(len(departments))
+    np.maximum.at(maximum, department_of_teacher, hours)
+    result = []
+    for d, department in enumerate(departments):
+        members = np.flatnonzero(department_of_teacher == d)
+        busiest = members[np.argmax(hours[members])] if len(members) else None
+        result.append({
+            "department": str(department),
+            "teachers": int(len(members)),
+            "teaching_teachers": int(active[d]),
+            "total_hours": round(float(total[d]), 2),
+            "mean_hours": round(float(total[d] / active[d]), 2) if active[d] else 0.0,
+            "max_hours": round(float(maximum[d]), 2),
+            "busiest_teacher": frame.teachers[busiest][1] if busiest is not None and hours[busiest] > 0 else None,
+        })
+    return result
+
+
+def class_type_mix(frame: SemesterFrame) -> List[dict]:
+    """Sesiones y horas por tipo de clase para cada asignatura con horarios"""
+    shape = (len(frame.subjects), len(frame.class_types))
+    sessions = np.zeros(shape, dtype=np.int64)
+    minutes = np.zeros(shape, dtype=np.int64)
+    np.add.at(sessions, (frame.subject, frame.class_type), 1)
+    np.add.at(minutes, (frame.subject, frame.class_type), frame.minutes)
+    totals = minutes.sum(axis=1)
+    result = []
+    for s in np.flatnonzero(sessions.sum(axis=1)):
+        subject_id, code, name = frame.subjects[s]
+        result.append({
+            "subject_id": subject_id,
+            "code": code,
+            "name": name,
+            "sessions": int(sessions[s].sum()),
+            "hours": round(float(totals[s]) / 60, 2),
+            "mix": [
+                {
+                    "class_type": frame.class_types[c][1],
+                    "sessions": int(sessions[s, c]),
+                    "hours": round(float(minutes[s, c]) / 60, 2),
+                    "share": round(float(minutes[s, c] / totals[s]), 4) if totals[s] else 0.0,
+                }
+                for c in np.flatnonzero(sessions[s])
+            ],
+        })
+    return result
+
+
+class AnalyticsCache:
+    """Arrays e informes por semestre, válidos mientras no cambie su versión de datos"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._frames: "OrderedDict[str, Tuple[str, SemesterFrame]]" = OrderedDict()
+
+    def frame(self, db: Session, semester: str) -> SemesterFrame:
+        version = versioning.semester_data_version(db, semester)
+        with locking.holding(self._lock):
+            cached = self._frames.get(semester)
+            if cached is not None and cached[0] == version:
+                self._frames.move_to_end(semester)
+                return cached[1]
+        frame = load_frame(db, semester)
+        with locking.holding(self._lock):
+            self._frames[semester] = (version, frame)
+            self._frames.move_to_end(semester)
+            while len(self._frames) > settings.analytics_cached_semesters:
+                self._frames.popitem(last=False)
+        return frame
+
+    def invalidate(self, semester: Optional[str] = None):
+        """Liberar los arrays de un semestre (o de todos)"""
+        with locking.holding(self._lock):
+            if semester is None:
+                self._frames.clear()
+            else:
+                self._frames.pop(semester, None)
+
+    def report(self, db: Session, semester: str, name: str, compute: Callable, *args):
+        frame = self.frame(db, semester)
+        key = (name, *args)
+        result = frame.reports.get(key)
+        if result is None:
+            result = frame.reports[key] = compute(frame, *args)
+        return result
+
+
+analytics_cache = AnalyticsCache()
+
+
+@invalidation.register
+def _on_change(event: invalidation.Event):
+    # Las entradas ya se validan por versión: esto solo libera memoria antes
+    if event.affects("schedules"):
+        analytics_cache.invalidate(event.semester)
+    elif event.affects(*versioning.REFERENCE_TABLES):
+        analytics_cache.invalidate()
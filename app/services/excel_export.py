@@ -0,0 +1,158 @@
+"""
+Exportación de horarios a Excel.
+
+Los horarios se cargan en una sola consulta solo con las columnas de la
+grilla; acrónimos, nombres y códigos salen de la caché de tablas de
+referencia (`app.services.reference_cache`). Se agrupan una vez por
+(día, hora de inicio) y el libro se escribe en modo write-only,
+fila a fila, directamente sobre el archivo de destino. openpyxl se importa
+en la primera exportación y no al arrancar el servicio.
+"""
+import unicodedata
+from functools import lru_cache
+from datetime import datetime, timedelta
+from typing import BinaryIO, Callable, Dict, List, Optional, Tuple
+from urllib.parse import quote
+
+from sqlalchemy import and_
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+
+from app.models.schedule import Schedule
+from app.services.reference_cache import References, TeacherRecord
+
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+HEADERS = ["Hora", "Lunes", "Martes", "Miércoles", "Jueves", "Viernes", "Sábado"]
+
+
+@lru_cache(maxsize=None)
+def _styles():
+    """Fuente y relleno de la cabecera y alineación de las clases"""
+    from openpyxl.styles import Alignment, Font, PatternFill
+
+    return (
+        Font(bold=True),
+        PatternFill(start_color="CCCCCC", end_color="CCCCCC", fill_type="solid"),
+        Alignment(wrap_text=True, vertical='top'),
+    )
+
+
+def preload():
+    """Importar openpyxl por adelantado (precalentamiento al arrancar)"""
+    from openpyxl import Workbook  # noqa: F401
+
+    _styles()
+
+
+def _time_slots() -> List[str]:
+    """Horarios típicos (7:00 AM a 10:00 PM)"""
+    slots = []
+    current = datetime.strptime("07:00", "%H:%M")
+    end = datetime.strptime("22:00", "%H:%M")
+    while current <= end:
+        slots.append(current.strftime("%H:%M"))
+        current += timedelta(hours=1)
+    return slots
+
+
+def load_schedules(db: Session, semester: str, teacher_id: Optional[int] = None) -> List[Row]:
+    """Horarios activos del semestre, solo con las columnas que usa la grilla"""
+    query = db.query(
+        Schedule.day_of_week, Schedule.start_time, Schedule.subject_id,
+        Schedule.class_type_id, Schedule.classroom_id, Schedule.teacher_id,
+    ).filter(and_(Schedule.semester == semester, Schedule.is_active == True))
+    if teacher_id is not None:
+        query = query.filter(Schedule.teacher_id == teacher_id)
+    return query.order_by(Schedule.day_of_week, Schedule.start_time, Schedule.id).all()
+
+
+def weekly_label(schedule: Row, references: References) -> str:
+    return (
+        f"{references['subjects'][schedule.subject_id].acronym} - "
+        f"{references['class_types'][schedule.class_type_id].acronym}\n"
+        f"{references['teachers'][schedule.teacher_id].full_name}\n"
+        f"{references['classrooms'][schedule.classroom_id].code}"
+    )
+
+
+def teacher_label(schedule: Row, references: References) -> str:
+    return (
+        f"{references['subjects'][schedule.subject_id].acronym} - "
+        f"{references['class_types'][schedule.class_type_id].acronym}\n"
+        f"{references['classrooms'][schedule.classroom_id].code}"
+    )
+
+
+def write_workbook(
+    stream: BinaryIO,
+    title: str,
+    schedules: List[Row],
+    label: Callable[[Row], str],
+):
+    """Escribir la grilla semanal (horas x días) en `stream`"""
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+
+    header_font, header_fill, class_alignment = _styles()
+    cells: Dict[Tuple[int, str], List[str]] = {}
+    for schedule in schedules:
+        key = (schedule.day_of_week, schedule.start_time.strftime("%H:%M"))
+        cells.setdefault(key, []).append(label(schedule))
+
+    wb = Workbook(write_only=True)
+    ws = wb.create_sheet(title)
+    for col in range(1, 8):
+        ws.column_dimensions[chr(64 + col)].width = 20
+
+    header = []
+    for value in HEADERS:
+        cell = WriteOnlyCell(ws, value=value)
+        cell.font = header_font
+        cell.fill = header_fill
+        header.append(cell)
+    ws.append(header)
+
+    for time_slot in _time_slots():
+        row = [time_slot]
+        for day in range(6):  # 0-5 (Lunes a Sábado)
+            classes = cells.get((day, time_slot))
+            if classes:
+                cell = WriteOnlyCell(ws, value="\n".join(classes))
+                cell.alignment = class_alignment
+                row.append(cell)
+            else:
+                row.append(None)
+        ws.append(row)
+
+    wb.save(stream)
+
+
+def write_weekly_workbook(stream: BinaryIO, semester: str, schedules: List[Row], references: References):
+    write_workbook(
+        stream, f"Horario Semanal {semester}", schedules,
+        lambda schedule: weekly_label(schedule, references)
+    )
+
+
+def write_teacher_workbook(
+    stream: BinaryIO, teacher: TeacherRecord, schedules: List[Row], references: References
+):
+    write_workbook(
+        stream, f"Horario {teacher.full_name}", schedules,
+        lambda schedule: teacher_label(schedule, references)
+    )
+
+
+def weekly_filename(semester: str) -> str:
+    return f"horario_semanal_{semester}.xlsx"
+
+
+def teacher_filename(teacher: TeacherRecord, semester: str) -> str:
+    return f"horario_{teacher.full_name.replace(' ', '_')}_{semester}.xlsx"
+
+
+def content_disposition(filename: str) -> str:
+    """Cabecera de descarga válida también para nombres con acentos (RFC 6266)"""
+    fallback = unicodedata.normalize("NFKD", filename).encode("ascii", "ignore").decode()
+    return f"attachment; filename={fallback}; filename*=UTF-8''{quote(filename)}"
+
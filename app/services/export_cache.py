@@ -0,0 +1,175 @@
+"""
+Caché de exportaciones a Excel por versión de los datos.
+
+La clave de cada libro incluye la versión del semestre y de las tablas de
+referencia (ver `versioning`), así que cualquier escritura que afecte al
+resultado cambia la clave y las entradas antiguas dejan de usarse sin
+necesidad de invalidarlas explícitamente. Hay dos niveles: un LRU en memoria
+acotado en bytes, propio de cada proceso, y un directorio en disco que
+comparten todos los workers y sobrevive a los reinicios.
+"""
+import hashlib
+import json
+import os
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import versioning
+
+
+@dataclass(frozen=True)
+class CacheKey:
+    kind: str
+    semester: str
+    teacher_id: Optional[int]
+    version: str
+
+    @property
+    def base(self) -> str:
+        """Identifica la exportación sin la versión"""
+        raw = f"{self.kind}:{self.semester}:{self.teacher_id or ''}"
+        return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+    @property
+    def name(self) -> str:
+        return f"{self.base}-{self.version}"
+
+
+@dataclass
+class CacheEntry:
+    filename: str
+    path: str
+    content: Optional[bytes] = None  # presente si está en memoria
+
+
+def export_key(db: Session, kind: str, semester: str, teacher_id: Optional[int] = None) -> CacheKey:
+    return CacheKey(
+        kind=kind,
+        semester=semester,
+        teacher_id=teacher_id if kind == "teacher" else None,
+        version=versioning.semester_data_version(db, semester),
+    )
+
+
+class ExportCache:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[CacheKey, Tuple[str, bytes]]" = OrderedDict()
+        self._memory_bytes = 0
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+
+    def _directory(self) -> str:
+        os.makedirs(settings.export_cache_dir, exist_ok=True)
+        return settings.export_cache_dir
+
+    def artifact_path(self, key: CacheKey) -> str:
+        return os.path.join(self._directory(), f"{key.name}.xlsx")
+
+    def _metadata_path(self, key: CacheKey) -> str:
+        return os.path.join(self._directory(), f"{key.name}.json")
+
+    def _remember(self, key: CacheKey, filename: str, content: bytes):
+        """Guardar en el LRU en memoria; llamar con el cerrojo tomado"""
+        limit = settings.export_cache_memory_bytes
+        if len(content) > limit:
+            return
+        previous = self._memory.pop(key, None)
+        if previous is not None:
+            self._memory_bytes -= len(previous[1])
+        self._memory[key] = (filename, content)
+        self._memory_bytes += len(content)
+        while self._memory_bytes > limit:
+            _, (_, evicted) = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+            self.evictions += 1
+
+    def get(self, key: CacheKey, record: bool = True) -> Optional[CacheEntry]:
+        """Buscar en memoria y luego en disco; `record` indica si cuenta en las estadísticas"""
+        with self._lock:
+            cached = self._memory.get(key)
+            if cached is not None:
+                self._memory.move_to_end(key)
+                self.memory_hits += record
+                return CacheEntry(filename=cached[0], path=self.artifact_path(key), content=cached[1])
+        try:
+            with open(self._metadata_path(key), encoding="utf-8") as f:
+                filename = json.load(f)["filename"]
+            with open(self.artifact_path(key), "rb") as f:
+                content = f.read()
+        except (FileNotFoundError, ValueError, KeyError):
+            with self._lock:
+                self.misses += record
+            return None
+        with self._lock:
+            self.disk_hits += record
+            self._remember(key, filename, content)
+        return CacheEntry(filename=filename, path=self.artifact_path(key), content=content)
+
+    def peek(self, key: CacheKey) -> Optional[bytes]:
+        """Contenido en memoria, sin contar como consulta ni reordenar el LRU"""
+        with self._lock:
+            cached = self._memory.get(key)
+            return cached[1] if cached is not None else None
+
+    def put(self, key: CacheKey, filename: str, source: str) -> CacheEntry:
+        """Incorporar un libro ya escrito en `source` y descartar sus versiones anteriores"""
+        path = self.artifact_path(key)
+        os.replace(source, path)
+        metadata = self._metadata_path(key)
+        tmp = f"{metadata}.{uuid.uuid4().hex}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"filename": filename}, f)
+        os.replace(tmp, metadata)
+
+        with open(path, "rb") as f:
+            content = f.read()
+        with self._lock:
+            self.stores += 1
+            for stale in [k for k in self._memory if k.base == key.base and k != key]:
+                self._memory_bytes -= len(self._memory.pop(stale)[1])
+            self._remember(key, filename, content)
+        self._drop_stale_files(key)
+        return CacheEntry(filename=filename, path=path, content=content)
+
+    def _drop_stale_files(self, key: CacheKey):
+        directory = self._directory()
+        for name in os.listdir(directory):
+            if not name.startswith(f"{key.base}-") or name.startswith(f"{key.name}."):
+                continue
+            try:
+                os.remove(os.path.join(directory, name))
+            except FileNotFoundError:
+                continue
+
+    def clear(self):
+        with self._lock:
+            self._memory.clear()
+            self._memory_bytes = 0
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            return {
+                "memory_hits": self.memory_hits,
+                "disk_hits": self.disk_hits,
+                "misses": self.misses,
+                "hit_ratio": round((self.memory_hits + self.disk_hits) / lookups, 4) if lookups else 0.0,
+                "stores": self.stores,
+                "evictions": self.evictions,
+                "memory_entries": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "memory_limit_bytes": settings.export_cache_memory_bytes,
+            }
+
+
+export_cache = ExportCache()
@@ -0,0 +1,271 @@
+"""
+Cola de trabajos de exportación a Excel.
+
+Cada trabajo se guarda como un archivo JSON en el directorio de artefactos
+junto al .xlsx generado, de modo que cualquier worker que comparta el
+directorio puede informar su estado y servir el resultado. Los libros se
+construyen en un pool de hilos propio, fuera de los hilos de las peticiones,
+y se guardan en la caché de exportaciones: si los datos no han cambiado desde
+la última exportación equivalente, el trabajo se completa al crearlo.
+"""
+import asyncio
+import json
+import os
+import re
+import threading
+import time
+import uuid
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from typing import Dict, Optional
+
+from fastapi import HTTPException, status
+from fastapi.responses import FileResponse, JSONResponse, Response
+
+from app.config import settings
+from app.database import SessionLocal
+from app.schemas.export import ExportJobResponse
+from app.services import excel_export
+from app.services.export_cache import CacheKey, export_cache, export_key
+from app.services.reference_cache import reference_cache
+
+_JOB_ID = re.compile(r"^[0-9a-f]{32}$")
+
+
+@dataclass
+class ExportJob:
+    id: str
+    kind: str
+    semester: str
+    teacher_id: Optional[int] = None
+    status: str = "pending"  # pending, running, completed, failed
+    filename: Optional[str] = None
+    error_status: Optional[int] = None
+    message: Optional[str] = None
+    created_at: str = ""
+    finished_at: Optional[str] = None
+    data_version: Optional[str] = None  # versión de los datos exportados
+    artifact: Optional[str] = None  # ruta del libro en la caché
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("completed", "failed")
+
+    @property
+    def cache_key(self) -> Optional[CacheKey]:
+        if self.data_version is None:
+            return None
+        return CacheKey(self.kind, self.semester, self.teacher_id, self.data_version)
+
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_futures: Dict[str, Future] = {}
+# Trabajo pendiente o en curso de este proceso por exportación y versión de datos
+_pending: Dict[CacheKey, str] = {}
+
+
+def _directory() -> str:
+    os.makedirs(settings.export_artifact_dir, exist_ok=True)
+    return settings.export_artifact_dir
+
+
+def _metadata_path(job_id: str) -> str:
+    return os.path.join(_directory(), f"{job_id}.json")
+
+
+def artifact_path(job_id: str) -> str:
+    return os.path.join(_directory(), f"{job_id}.xlsx")
+
+
+def _now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+def _save(job: ExportJob):
+    path = _metadata_path(job.id)
+    tmp = f"{path}.{uuid.uuid4().hex}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(asdict(job), f)
+    os.replace(tmp, path)
+
+
+def get_job(job_id: str) -> Optional[ExportJob]:
+    if not _JOB_ID.match(job_id):
+        return None
+    try:
+        with open(_metadata_path(job_id), encoding="utf-8") as f:
+            return ExportJob(**json.load(f))
+    except FileNotFoundError:
+        return None
+
+
+def _fail(job: ExportJob, error_status: int, message: str):
+    job.status = "failed"
+    job.error_status = error_status
+    job.message = message
+
+
+def _complete(job: ExportJob, key: CacheKey, filename: str, path: str):
+    job.status = "completed"
+    job.data_version = key.version
+    job.filename = filename
+    job.artifact = path
+
+
+def _build(job: ExportJob):
+    job.status = "running"
+    _save(job)
+    db = SessionLocal()
+    try:
+        # La versión se lee antes que los datos: un libro nunca queda
+        # guardado bajo una versión más nueva que la de su contenido
+        key = export_key(db, job.kind, job.semester, job.teacher_id)
+        cached = export_cache.get(key, record=False)
+        if cached is not None:
+            _complete(job, key, cached.filename, cached.path)
+            return
+
+        teacher = None
+        if job.kind == "teacher":
+            teacher = reference_cache.snapshot(db, ("teachers",))["teachers"].get(job.teacher_id)
+            if not teacher:
+                _fail(job, 404, "Profesor no encontrado")
+                return
+        schedules = excel_export.load_schedules(db, job.semester, teacher_id=job.teacher_id)
+        if not schedules:
+            _fail(job, 404, (
+                "No se encontraron horarios para este profesor en este semestre"
+                if teacher else "No se encontraron horarios para este semestre"
+            ))
+            return
+
+        # Después de los horarios: toda fila referenciada ya está en la caché
+        references = reference_cache.snapshot(db)
+        tmp = f"{artifact_path(job.id)}.tmp"
+        with open(tmp, "wb") as f:
+            if teacher:
+                excel_export.write_teacher_workbook(f, teacher, schedules, references)
+            else:
+                excel_export.write_weekly_workbook(f, job.semester, schedules, references)
+        filename = (
+            excel_export.teacher_filename(teacher, job.semester)
+            if teacher else excel_export.weekly_filename(job.semester)
+        )
+        entry = export_cache.put(key, filename, tmp)
+        _complete(job, key, entry.filename, entry.path)
+    except Exception as exc:
+        _fail(job, 500, f"Error al generar la exportación: {exc}")
+    finally:
+        db.close()
+        job.finished_at = _now()
+        _save(job)
+
+
+def purge_expired():
+    """Eliminar trabajos y artefactos más antiguos que la retención configurada"""
+    limit = time.time() - settings.export_retention_seconds
+    directory = _directory()
+    for name in os.listdir(directory):
+        path = os.path.join(directory, name)
+        try:
+            if os.path.isfile(path) and os.path.getmtime(path) < limit:
+                os.remove(path)
+        except FileNotFoundError:
+            continue
+
+
+def submit(kind: str, semester: str, teacher_id: Optional[int] = None) -> ExportJob:
+    """Encolar una exportación y devolver su trabajo
+
+    Si este proceso ya genera la misma exportación con la misma versión de
+    datos se devuelve ese trabajo en lugar de crear otro.
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.export_workers, thread_name_prefix="export"
+            )
+    purge_expired()
+    job = ExportJob(
+        id=uuid.uuid4().hex,
+        kind=kind,
+        semester=semester,
+        teacher_id=teacher_id if kind == "teacher" else None,
+        created_at=_now(),
+    )
+
+    db = SessionLocal()
+    try:
+        key = export_key(db, kind, semester, job.teacher_id)
+    finally:
+        db.close()
+    cached = export_cache.get(key)
+    if cached is not None:
+        _complete(job, key, cached.filename, cached.path)
+        job.finished_at = job.created_at
+        _save(job)
+        return job
+
+    with _executor_lock:
+        # La misma exportación de los mismos datos ya se está generando
+        running = _pending.get(key)
+        if running is not None:
+            existing = get_job(running)
+            if existing is not None and not existing.finished:
+                return existing
+        _pending[key] = job.id
+        _save(job)
+        future = _executor.submit(_build, job)
+        _futures[job.id] = future
+    future.add_done_callback(lambda _: _finished(key, job.id))
+    return job
+
+
+def _finished(key: CacheKey, job_id: str):
+    with _executor_lock:
+        _futures.pop(job_id, None)
+        if _pending.get(key) == job_id:
+            del _pending[key]
+
+
+async def wait(job: ExportJob, timeout: float) -> ExportJob:
+    """Esperar a que termine un trabajo de este proceso sin ocupar un hilo
+
+    Si se agota `timeout` se devuelve el estado actual; el trabajo sigue en
+    el pool aunque se cancele la espera.
+    """
+    future = _futures.get(job.id)
+    if future is not None:
+        try:
+            await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(future)), timeout)
+        except asyncio.TimeoutError:
+            pass
+    return get_job(job.id) or job
+
+
+def job_response(job: ExportJob):
+    """Respuesta HTTP para un trabajo: el archivo, su estado (202) o su error"""
+    if not job.finished:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=ExportJobResponse.model_validate(job).model_dump(mode="json"),
+            headers={"Location": f"/api/v1/exports/{job.id}"},
+        )
+    if job.status == "failed":
+        raise HTTPException(status_code=job.error_status or 500, detail=job.message)
+    headers = {"Content-Disposition": excel_export.content_disposition(job.filename)}
+    key = job.cache_key
+    content = export_cache.peek(key) if key is not None else None
+    if content is not None:
+        return Response(content=content, media_type=excel_export.XLSX_MEDIA_TYPE, headers=headers)
+    path = job.artifact or artifact_path(job.id)
+    if not os.path.exists(path):
+        # La entrada de caché fue sustituida por una versión más nueva
+        raise HTTPException(
+            status_code=status.HTTP_410_GONE,
+            detail="La exportación ya no está disponible; solicite una nueva"
+        )
+    return FileResponse(path, media_type=excel_export.XLSX_MEDIA_TYPE, headers=headers)
@@ -0,0 +1,183 @@
+"""
+Feeds iCalendar (RFC 5545) de los horarios.
+
+Cada horario semanal es un VEVENT con RRULE semanal desde su primera clase
+hasta `week_end`. Las fechas con excepción se excluyen de la serie con
+EXDATE y, si la clase se traslada o se sustituye, la clase resultante se
+publica como un VEVENT suelto en el feed que le corresponda. Las filas se
+leen en una consulta sin relaciones (nombres y códigos salen de la caché de
+tablas de referencia) y el texto se genera y se envía evento a evento.
+"""
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, Iterator, List, Optional
+
+from sqlalchemy import and_, or_
+from sqlalchemy.orm import Session, joinedload
+
+from app.config import settings
+from app.models.schedule import Schedule
+from app.models.schedule_exception import ScheduleException, CANCEL
+from app.services.reference_cache import References
+
+CALENDAR_MEDIA_TYPE = "text/calendar"  # Starlette añade el charset
+_WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+
+def escape(text: str) -> str:
+    return (
+        text.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def fold(line: str) -> str:
+    """Partir la línea en trozos de 75 octetos como máximo (sección 3.1)"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts, start, limit = [], 0, 75
+    while start < len(encoded):
+        end = min(start + limit, len(encoded))
+        while end < len(encoded) and (encoded[end] & 0xC0) == 0x80:
+            end -= 1  # no cortar un carácter multibyte
+        parts.append(encoded[start:end].decode("utf-8"))
+        start, limit = end, 74  # las continuaciones empiezan con un espacio
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def _local(day: date, at: time) -> str:
+    # Hora local flotante; la zona del campus va en X-WR-TIMEZONE
+    return datetime.combine(day, at).strftime("%Y%m%dT%H%M%S")
+
+
+def _utc(value: Optional[datetime]) -> str:
+    value = value or datetime.now(timezone.utc)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def first_class(schedule: Schedule) -> Optional[date]:
+    offset = (schedule.day_of_week - schedule.week_start.weekday()) % 7
+    first = schedule.week_start + timedelta(days=offset)
+    return first if first <= schedule.week_end else None
+
+
+def _event(uid: str, stamp: Optional[datetime], day: date, start: time, end: time,
+           schedule: Schedule, references: References, classroom_id: int, teacher_id: int,
+           extra: Iterable[str] = ()) -> str:
+    subject = references["subjects"][schedule.subject_id]
+    class_type = references["class_types"][schedule.class_type_id]
+    classroom = references["classrooms"][classroom_id]
+    teacher = references["teachers"][teacher_id]
+    location = classroom.code if not classroom.building else f"{classroom.code} ({classroom.building})"
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:{uid}",
+        f"DTSTAMP:{_utc(stamp)}",
+        f"LAST-MODIFIED:{_utc(stamp)}",
+        f"DTSTART:{_local(day, start)}",
+        f"DTEND:{_local(day, end)}",
+        *extra,
+        f"SUMMARY:{escape(f'{subject.acronym} - {class_type.acronym}')}",
+        f"LOCATION:{escape(location)}",
+        f"DESCRIPTION:{escape(f'{subject.name} ({class_type.name})')}\\n"
+        f"{escape(teacher.full_name)}",
+        "END:VEVENT",
+    ]
+    return "".join(fold(line) for line in lines)
+
+
+def series_event(schedule: Schedule, excluded: List[date], references: References) -> Optional[str]:
+    first = first_class(schedule)
+    if first is None:
+        return None
+    extra = [
+        f"RRULE:FREQ=WEEKLY;BYDAY={_WEEKDAYS[schedule.day_of_week]};"
+        f"UNTIL={_local(schedule.week_end, time(23, 59, 59))}"
+    ]
+    extra += [f"EXDATE:{_local(day, schedule.start_time)}" for day in sorted(excluded)]
+    return _event(
+        f"schedule-{schedule.id}@{settings.calendar_uid_domain}",
+        schedule.updated_at or schedule.created_at,
+        first, schedule.start_time, schedule.end_time,
+        schedule, references, schedule.classroom_id, schedule.teacher_id, extra,
+    )
+
+
+def exception_event(exception: ScheduleException, references: References) -> str:
+    schedule = exception.schedule
+    return _event(
+        f"exception-{exception.id}@{settings.calendar_uid_domain}",
+        exception.updated_at or exception.created_at,
+        exception.new_date or exception.date,
+        exception.new_start_time or schedule.start_time,
+        exception.new_end_time or schedule.end_time,
+        schedule,
+        references,
+        exception.classroom_id or schedule.classroom_id,
+        exception.teacher_id or schedule.teacher_id,
+        [f"RELATED-TO:schedule-{schedule.id}@{settings.calendar_uid_domain}"],
+    )
+
+
+def load_feed(db: Session, column, value: int, semester: Optional[str] = None):
+    """Horarios de la serie y excepciones con resultado para el aula/profesor/asignatura"""
+    query = db.query(Schedule).filter(and_(getattr(Schedule, column) == value, Schedule.is_active == True))
+    if semester:
+        query = query.filter(Schedule.semester == semester)
+    schedules = query.order_by(Schedule.id).all()
+
+    # Excepciones de esas series (EXDATE) y clases sustituidas o trasladadas
+    # que acaban en este feed aunque la serie sea de otro
+    owner = getattr(Schedule, column) == value
+    if hasattr(ScheduleException, column):
+        owner = or_(owner, getattr(ScheduleException, column) == value)
+    query = db.query(ScheduleException).join(
+        Schedule, Schedule.id == ScheduleException.schedule_id
+    ).options(joinedload(ScheduleException.schedule)).filter(and_(
+        Schedule.is_active == True,
+        owner,
+    ))
+    if semester:
+        query = query.filter(Schedule.semester == semester)
+    exceptions = query.order_by(ScheduleException.id).all()
+    excluded = {}
+    for exception in exceptions:
+        if getattr(exception.schedule, column) == value:
+            excluded.setdefault(exception.schedule_id, []).append(exception.date)
+    shown = [
+        exception for exception in exceptions
+        if exception.kind != CANCEL and _resolves_to(exception, column, value)
+    ]
+    return schedules, excluded, shown
+
+
+def _resolves_to(exception: ScheduleException, column: str, value: int) -> bool:
+    if column == "classroom_id":
+        return (exception.classroom_id or exception.schedule.classroom_id) == value
+    if column == "teacher_id":
+        return (exception.teacher_id or exception.schedule.teacher_id) == value
+    return exception.schedule.subject_id == value
+
+
+def stream(name: str, schedules: List[Schedule], excluded: dict,
+           exceptions: List[ScheduleException], references: References) -> Iterator[bytes]:
+    """Texto del calendario, evento a evento"""
+    header = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:-//{settings.app_name}//ES",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{escape(name)}",
+        f"X-WR-TIMEZONE:{settings.calendar_timezone}",
+    ]
+    yield "".join(fold(line) for line in header).encode("utf-8")
+    for schedule in schedules:
+        event = series_event(schedule, excluded.get(schedule.id, []), references)
+        if event:
+            yield event.encode("utf-8")
+    for exception in exceptions:
+        yield exception_event(exception, references).encode("utf-8")
+    yield b"END:VCALENDAR\r\n"
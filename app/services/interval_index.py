@@ -0,0 +1,191 @@
+"""
+Índice de intervalos en memoria para detectar conflictos de horario.
+
+Por cada (semestre, día, aula) y (semestre, día, profesor) se mantiene una
+lista de intervalos ordenada por hora de inicio. Como cada lista conoce la
+duración de su intervalo más largo, una consulta de solapamiento se resuelve
+con dos búsquedas binarias y solo examina los candidatos que pueden solaparse.
+
+Los semestres se cargan de la base de datos la primera vez que se consultan y
+luego se mantienen sincronizados con `sync` tras cada escritura.
+"""
+import threading
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass, field
+from datetime import time
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.models.schedule import Schedule
+from app.services import invalidation, locking
+
+_INF = float("inf")
+
+
+def to_seconds(value: time) -> int:
+    return value.hour * 3600 + value.minute * 60 + value.second
+
+
+class IntervalList:
+    """Intervalos [inicio, fin) ordenados por inicio"""
+
+    __slots__ = ("keys", "ends", "max_length")
+
+    def __init__(self):
+        self.keys: List[Tuple[int, int]] = []  # (inicio, id)
+        self.ends: List[int] = []
+        self.max_length = 0
+
+    def __len__(self):
+        return len(self.keys)
+
+    def add(self, start: int, end: int, item_id: int):
+        index = bisect_right(self.keys, (start, item_id))
+        self.keys.insert(index, (start, item_id))
+        self.ends.insert(index, end)
+        self.max_length = max(self.max_length, end - start)
+
+    def remove(self, start: int, item_id: int):
+        index = bisect_left(self.keys, (start, item_id))
+        if index < len(self.keys) and self.keys[index] == (start, item_id):
+            del self.keys[index]
+            del self.ends[index]
+
+    def overlapping(self, start: int, end: int, exclude: Optional[int] = None) -> List[int]:
+        """Ids de los intervalos que se solapan con [start, end)"""
+        # Un intervalo que empieza antes de start - max_length no puede llegar a start
+        low = bisect_right(self.keys, (start - self.max_length, _INF))
+        high = bisect_left(self.keys, (end, -_INF))
+        return [
+            self.keys[i][1]
+            for i in range(low, high)
+            if self.ends[i] > start and self.keys[i][1] != exclude
+        ]
+
+
+@dataclass
+class ScheduleConflicts:
+    classroom: List[int] = field(default_factory=list)
+    teacher: List[int] = field(default_factory=list)
+
+    def __bool__(self):
+        return bool(self.classroom or self.teacher)
+
+
+_Entry = Tuple[int, int, int, int, int]  # (día, aula, profesor, inicio, fin)
+
+
+class _SemesterIndex:
+    def __init__(self):
+        self.classrooms: Dict[Tuple[int, int], IntervalList] = {}
+        self.teachers: Dict[Tuple[int, int], IntervalList] = {}
+        self.entries: Dict[int, _Entry] = {}
+
+    def add(self, schedule_id: int, entry: _Entry):
+        day, classroom_id, teacher_id, start, end = entry
+        self.classrooms.setdefault((day, classroom_id), IntervalList()).add(start, end, schedule_id)
+        self.teachers.setdefault((day, teacher_id), IntervalList()).add(start, end, schedule_id)
+        self.entries[schedule_id] = entry
+
+    def remove(self, schedule_id: int):
+        entry = self.entries.pop(schedule_id, None)
+        if entry is None:
+            return
+        day, classroom_id, teacher_id, start, _ = entry
+        self.classrooms[(day, classroom_id)].remove(start, schedule_id)
+        self.teachers[(day, teacher_id)].remove(start, schedule_id)
+
+
+class ScheduleIndex:
+    """Índice de conflictos de horario por semestre"""
+
+    def __init__(self):
+        # No reentrante: en modo asíncrono todas las corrutinas comparten hilo
+        self.lock = threading.Lock()
+        self._semesters: Dict[str, _SemesterIndex] = {}
+        self._semester_of: Dict[int, str] = {}
+
+    def _load(self, db: Session, semester: str) -> _SemesterIndex:
+        index = self._semesters.get(semester)
+        if index is not None:
+            return index
+        index = _SemesterIndex()
+        rows = db.query(
+            Schedule.id, Schedule.day_of_week, Schedule.classroom_id, Schedule.teacher_id,
+            Schedule.start_time, Schedule.end_time
+        ).filter(and_(Schedule.semester == semester, Schedule.is_active == True))
+        for row in rows:
+            index.add(row.id, (
+                row.day_of_week, row.classroom_id, row.teacher_id,
+                to_seconds(row.start_time), to_seconds(row.end_time)
+            ))
+            self._semester_of[row.id] = semester
+        self._semesters[semester] = index
+        return index
+
+    def warm(self, db: Session, semester: str):
+        """Cargar el semestre por adelantado (precalentamiento al arrancar)"""
+        with locking.holding(self.lock):
+            self._load(db, semester)
+
+    def conflicts(
+        self,
+        db: Session,
+        semester: str,
+        day_of_week: int,
+        start_time: time,
+        end_time: time,
+        classroom_id: int,
+        teacher_id: int,
+        exclude_id: Optional[int] = None,
+    ) -> ScheduleConflicts:
+        """Horarios activos que chocan con el aula o el profesor en ese intervalo"""
+        start, end = to_seconds(start_time), to_seconds(end_time)
+        with locking.holding(self.lock):
+            index = self._load(db, semester)
+            result = ScheduleConflicts()
+            intervals = index.classrooms.get((day_of_week, classroom_id))
+            if intervals:
+                result.classroom = intervals.overlapping(start, end, exclude_id)
+            intervals = index.teachers.get((day_of_week, teacher_id))
+            if intervals:
+                result.teacher = intervals.overlapping(start, end, exclude_id)
+            return result
+
+    def sync(self, schedule: Schedule):
+        """Reflejar en el índice el estado confirmado de un horario"""
+        with locking.holding(self.lock):
+            previous = self._semester_of.pop(schedule.id, None)
+            if previous is not None and previous in self._semesters:
+                self._semesters[previous].remove(schedule.id)
+            index = self._semesters.get(schedule.semester)
+            if index is None or not schedule.is_active:
+                return
+            index.add(schedule.id, (
+                schedule.day_of_week, schedule.classroom_id, schedule.teacher_id,
+                to_seconds(schedule.start_time), to_seconds(schedule.end_time)
+            ))
+            self._semester_of[schedule.id] = schedule.semester
+
+    def invalidate(self, semester: Optional[str] = None):
+        """Descartar un semestre (o todos) para que se recargue en la próxima consulta"""
+        with locking.holding(self.lock):
+            semesters = [semester] if semester is not None else list(self._semesters)
+            for name in semesters:
+                index = self._semesters.pop(name, None)
+                if index is None:
+                    continue
+                for schedule_id in index.entries:
+                    self._semester_of.pop(schedule_id, None)
+
+
+schedule_index = ScheduleIndex()
+
+
+@invalidation.register
+def _on_change(event: invalidation.Event):
+    # Los cambios propios ya se aplicaron con `sync`
+    if not event.local and event.affects("schedules"):
+        schedule_index.invalidate(event.semester)
@@ -0,0 +1,211 @@
+"""
+Bus de invalidación de cachés entre workers.
+
+`versioning.record_change` publica un evento (tabla, id, semestre) por cada
+escritura dentro de su misma transacción: en PostgreSQL con `pg_notify`, que
+solo se entrega si la transacción se confirma, y en las demás bases de datos
+como una fila de `change_log`. Cada worker escucha el canal (LISTEN) o sondea
+la tabla en un hilo y entrega los eventos de los demás procesos a los
+manejadores que registran las cachés en memoria.
+
+Los eventos propios se entregan al confirmar la sesión, marcados como
+locales: el worker que escribe ya actualizó sus índices con `sync`. Si la
+escucha se interrumpe, al reconectar se entrega un evento `ALL` porque pudo
+perderse alguno.
+"""
+import json
+import logging
+import select
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Iterable, List, Optional
+
+from sqlalchemy import delete, event, func, insert
+from sqlalchemy import select as sql_select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models.change_log import ChangeLog
+
+CHANNEL = "cache_invalidation"
+ALL = "*"  # cualquier tabla: descartar todo lo cacheado
+ORIGIN = uuid.uuid4().hex  # identifica a este proceso
+
+_PENDING = "invalidation_events"
+_PRUNE_EVERY = 60.0  # segundos entre limpiezas de change_log
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Event:
+    table: str
+    row_id: Optional[int] = None
+    semester: Optional[str] = None
+    origin: str = ORIGIN
+
+    @property
+    def local(self) -> bool:
+        return self.origin == ORIGIN
+
+    def affects(self, *tables: str) -> bool:
+        return self.table == ALL or self.table in tables
+
+
+_handlers: List[Callable[[Event], None]] = []
+
+
+def register(handler: Callable[[Event], None]) -> Callable[[Event], None]:
+    """Registrar una función que descarta las entradas afectadas por un evento"""
+    _handlers.append(handler)
+    return handler
+
+
+def dispatch(events: Iterable[Event]):
+    for item in events:
+        for handler in list(_handlers):
+            try:
+                handler(item)
+            except Exception:
+                logger.exception("Error al invalidar la caché con %s", item)
+
+
+def mode(engine: Engine) -> str:
+    """`notify`, `poll` u `off` según CACHE_INVALIDATION y la base de datos"""
+    configured = settings.cache_invalidation
+    if configured == "auto":
+        return "notify" if engine.dialect.name == "postgresql" else "poll"
+    if configured not in ("notify", "poll", "off"):
+        raise ValueError("CACHE_INVALIDATION debe ser auto, notify, poll u off")
+    return configured
+
+
+def _encode(item: Event) -> str:
+    return json.dumps({"t": item.table, "i": item.row_id, "s": item.semester, "o": item.origin})
+
+
+def _decode(payload: str) -> Event:
+    data = json.loads(payload)
+    return Event(data["t"], data.get("i"), data.get("s"), data.get("o", ""))
+
+
+def publish(db: Session, events: List[Event]):
+    """Publicar los eventos en la transacción en curso de `db`"""
+    if not events:
+        return
+    current = mode(db.get_bind())
+    if current == "notify":
+        for item in events:
+            db.execute(sql_select(func.pg_notify(CHANNEL, _encode(item))))
+    elif current == "poll":
+        db.execute(insert(ChangeLog), [
+            {"table_name": item.table, "row_id": item.row_id, "semester": item.semester, "origin": item.origin}
+            for item in events
+        ])
+    db.info.setdefault(_PENDING, []).extend(events)
+
+
+@event.listens_for(Session, "after_commit")
+def _after_commit(session: Session):
+    events = session.info.pop(_PENDING, None)
+    if events:
+        dispatch(events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _after_rollback(session: Session):
+    session.info.pop(_PENDING, None)
+
+
+class Listener(threading.Thread):
+    """Hilo que recibe los eventos de los demás workers"""
+
+    def __init__(self, engine: Engine, listen_mode: str):
+        super().__init__(name="cache-invalidation", daemon=True)
+        self.engine = engine
+        self.mode = listen_mode
+        self.stopping = threading.Event()
+
+    def run(self):
+        failed = False
+        while not self.stopping.is_set():
+            try:
+                if failed:
+                    # Pudieron perderse eventos mientras no se escuchaba
+                    dispatch([Event(ALL, origin="")])
+                    failed = False
+                if self.mode == "notify":
+                    self._listen()
+                else:
+                    self._poll()
+            except Exception:
+                logger.warning("Bus de invalidación interrumpido; se reintenta", exc_info=True)
+                failed = True
+                self.stopping.wait(settings.cache_invalidation_poll_interval)
+
+    def _listen(self):
+        connection = self.engine.raw_connection()
+        try:
+            dbapi = connection.driver_connection
+            dbapi.autocommit = True
+            with dbapi.cursor() as cursor:
+                cursor.execute(f"LISTEN {CHANNEL}")
+            while not self.stopping.is_set():
+                if select.select([dbapi], [], [], settings.cache_invalidation_poll_interval) == ([], [], []):
+                    continue
+                dbapi.poll()
+                events = [_decode(notify.payload) for notify in dbapi.notifies]
+                dbapi.notifies.clear()
+                dispatch(item for item in events if not item.local)
+        finally:
+            # La conexión quedó en LISTEN y autocommit: no devolverla al pool
+            connection.invalidate()
+
+    def _poll(self):
+        with self.engine.connect() as connection:
+            last = connection.execute(sql_select(func.max(ChangeLog.id))).scalar() or 0
+        pruned = time.monotonic()
+        while not self.stopping.wait(settings.cache_invalidation_poll_interval):
+            with self.engine.connect() as connection:
+                rows = connection.execute(
+                    sql_select(
+                        ChangeLog.id, ChangeLog.table_name, ChangeLog.row_id, ChangeLog.semester, ChangeLog.origin
+                    ).where(ChangeLog.id > last).order_by(ChangeLog.id)
+                ).all()
+                if time.monotonic() - pruned > _PRUNE_EVERY:
+                    cutoff = datetime.now(timezone.utc) - timedelta(seconds=settings.cache_invalidation_retention)
+                    connection.execute(delete(ChangeLog).where(ChangeLog.created_at < cutoff))
+                    connection.commit()
+                    pruned = time.monotonic()
+            if rows:
+                last = rows[-1].id
+                dispatch(
+                    Event(row.table_name, row.row_id, row.semester, row.origin)
+                    for row in rows if row.origin != ORIGIN
+                )
+
+
+_listener: Optional[Listener] = None
+
+
+def start(engine: Engine):
+    """Empezar a recibir los eventos de los demás workers (al arrancar)"""
+    global _listener
+    current = mode(engine)
+    if current == "off" or _listener is not None:
+        return
+    _listener = Listener(engine, current)
+    _listener.start()
+
+
+def stop():
+    global _listener
+    if _listener is None:
+        return
+    _listener.stopping.set()
+    _listener.join(timeout=settings.cache_invalidation_poll_interval + 1)
+    _listener = None
@@ -0,0 +1,47 @@
+"""
+Cerrojos de hilos utilizables también desde el bucle de eventos.
+
+En modo asíncrono el código síncrono de los endpoints se ejecuta dentro de
+`AsyncSession.run_sync`, en el hilo del bucle de eventos. Ahí un `acquire`
+bloqueante detendría el bucle y, con él, a la corrutina que tiene el cerrojo.
+En ese caso se reintenta cediendo el control al bucle entre intentos. Fuera
+de `run_sync` (un hilo con su propio bucle, una corrutina que no pasa por la
+sesión) no se puede ceder el control y se espera de forma bloqueante.
+"""
+import asyncio
+import threading
+from contextlib import contextmanager
+
+from sqlalchemy.exc import MissingGreenlet
+from sqlalchemy.util import await_only
+
+_POLL_SECONDS = 0.001
+
+
+def _in_event_loop() -> bool:
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return False
+    return True
+
+
+def acquire(lock: threading.Lock):
+    if not _in_event_loop():
+        lock.acquire()
+        return
+    while not lock.acquire(blocking=False):
+        try:
+            await_only(asyncio.sleep(_POLL_SECONDS))
+        except MissingGreenlet:
+            lock.acquire()
+            return
+
+
+@contextmanager
+def holding(lock: threading.Lock):
+    acquire(lock)
+    try:
+        yield
+    finally:
+        lock.release()
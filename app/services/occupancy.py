@@ -0,0 +1,188 @@
+"""
+Mapas de ocupación por semestre para buscar huecos libres.
+
+Cada (aula, día) y (profesor, día) tiene un entero cuyo bit i indica que el
+slot de 15 minutos i del día está ocupado (96 slots). Saber si un aula está
+libre en un intervalo es un AND con la máscara del intervalo, y los huecos
+comunes de varios profesores salen de un OR de sus máscaras.
+
+Como `interval_index`, los semestres se cargan en la primera consulta y se
+mantienen al día con `sync` e `invalidate` tras cada escritura.
+"""
+import threading
+from datetime import time
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+
+from app.models.schedule import Schedule
+from app.services import invalidation, locking
+from app.services.timetable import SLOT_MINUTES, slot_bits
+
+SLOTS_PER_DAY = 24 * 60 // SLOT_MINUTES
+FULL_DAY = (1 << SLOTS_PER_DAY) - 1
+
+
+def to_slot(value: time, round_up: bool = False) -> int:
+    seconds = value.hour * 3600 + value.minute * 60 + value.second
+    slot, remainder = divmod(seconds, SLOT_MINUTES * 60)
+    return slot + (1 if round_up and remainder else 0)
+
+
+def to_time(slot: int) -> time:
+    minutes = slot * SLOT_MINUTES
+    if minutes >= 24 * 60:
+        return time(23, 59, 59)
+    return time(minutes // 60, minutes % 60)
+
+
+def interval_mask(start_time: time, end_time: time) -> int:
+    """Máscara de los slots que toca [start_time, end_time)
+
+    Un intervalo vacío o invertido (horarios antiguos sin validar) no ocupa nada.
+    """
+    start = to_slot(start_time)
+    return slot_bits(start, max(0, to_slot(end_time, round_up=True) - start))
+
+
+def window_mask(start_time: time, end_time: time) -> int:
+    """Máscara de los slots completos dentro de [start_time, end_time)"""
+    start = to_slot(start_time, round_up=True)
+    return slot_bits(start, max(0, to_slot(end_time) - start))
+
+
+def free_runs(busy: int, window: int, min_slots: int = 1) -> List[Tuple[int, int]]:
+    """Tramos (inicio, fin) de slots libres dentro de `window` de al menos `min_slots`"""
+    free = window & ~busy
+    runs = []
+    slot = 0
+    while free >> slot:
+        # Saltar hasta el siguiente bit libre y medir su tramo
+        offset = ((free >> slot) & -(free >> slot)).bit_length() - 1
+        start = slot + offset
+        run = ~(free >> start)
+        length = (run & -run).bit_length() - 1
+        if length >= min_slots:
+            runs.append((start, start + length))
+        slot = start + length
+    return runs
+
+
+_Entry = Tuple[int, int, int, int]  # (día, aula, profesor, máscara)
+
+
+class _SemesterOccupancy:
+    def __init__(self):
+        self.rooms: Dict[Tuple[int, int], int] = {}
+        self.teachers: Dict[Tuple[int, int], int] = {}
+        self.entries: Dict[int, _Entry] = {}
+        self._by_room: Dict[Tuple[int, int], Set[int]] = {}
+        self._by_teacher: Dict[Tuple[int, int], Set[int]] = {}
+
+    def add(self, schedule_id: int, entry: _Entry):
+        day, room, teacher, mask = entry
+        self.entries[schedule_id] = entry
+        self._by_room.setdefault((room, day), set()).add(schedule_id)
+        self._by_teacher.setdefault((teacher, day), set()).add(schedule_id)
+        self.rooms[(room, day)] = self.rooms.get((room, day), 0) | mask
+        self.teachers[(teacher, day)] = self.teachers.get((teacher, day), 0) | mask
+
+    def remove(self, schedule_id: int):
+        entry = self.entries.pop(schedule_id, None)
+        if entry is None:
+            return
+        day, room, teacher, _ = entry
+        # Otra clase puede compartir slots con la eliminada: recomponer la máscara
+        for masks, owners, key in (
+            (self.rooms, self._by_room, (room, day)),
+            (self.teachers, self._by_teacher, (teacher, day)),
+        ):
+            owners[key].discard(schedule_id)
+            mask = 0
+            for other in owners[key]:
+                mask |= self.entries[other][3]
+            masks[key] = mask
+
+
+class OccupancyIndex:
+    """Ocupación de aulas y profesores por semestre, día y slot de 15 minutos"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self._semesters: Dict[str, _SemesterOccupancy] = {}
+        self._semester_of: Dict[int, str] = {}
+
+    def _load(self, db: Session, semester: str) -> _SemesterOccupancy:
+        occupancy = self._semesters.get(semester)
+        if occupancy is not None:
+            return occupancy
+        occupancy = _SemesterOccupancy()
+        rows = db.query(
+            Schedule.id, Schedule.day_of_week, Schedule.classroom_id, Schedule.teacher_id,
+            Schedule.start_time, Schedule.end_time
+        ).filter(and_(Schedule.semester == semester, Schedule.is_active == True))
+        for row in rows:
+            occupancy.add(row.id, (
+                row.day_of_week, row.classroom_id, row.teacher_id,
+                interval_mask(row.start_time, row.end_time)
+            ))
+            self._semester_of[row.id] = semester
+        self._semesters[semester] = occupancy
+        return occupancy
+
+    def warm(self, db: Session, semester: str):
+        """Cargar el semestre por adelantado (precalentamiento al arrancar)"""
+        with locking.holding(self.lock):
+            self._load(db, semester)
+
+    def free_rooms(self, db: Session, semester: str, day: int, mask: int, room_ids: Iterable[int]) -> List[int]:
+        """Aulas de `room_ids` sin ningún slot de `mask` ocupado"""
+        with locking.holding(self.lock):
+            rooms = self._load(db, semester).rooms
+            return [room for room in room_ids if not rooms.get((room, day), 0) & mask]
+
+    def teachers_busy(self, db: Session, semester: str, day: int, teacher_ids: Iterable[int]) -> int:
+        """Slots del día en que alguno de los profesores tiene clase"""
+        with locking.holding(self.lock):
+            teachers = self._load(db, semester).teachers
+            busy = 0
+            for teacher in teacher_ids:
+                busy |= teachers.get((teacher, day), 0)
+            return busy
+
+    def sync(self, schedule: Schedule):
+        """Reflejar el estado confirmado de un horario"""
+        with locking.holding(self.lock):
+            previous = self._semester_of.pop(schedule.id, None)
+            if previous is not None and previous in self._semesters:
+                self._semesters[previous].remove(schedule.id)
+            occupancy = self._semesters.get(schedule.semester)
+            if occupancy is None or not schedule.is_active:
+                return
+            occupancy.add(schedule.id, (
+                schedule.day_of_week, schedule.classroom_id, schedule.teacher_id,
+                interval_mask(schedule.start_time, schedule.end_time)
+            ))
+            self._semester_of[schedule.id] = schedule.semester
+
+    def invalidate(self, semester: Optional[str] = None):
+        """Descartar un semestre (o todos) para que se recargue en la próxima consulta"""
+        with locking.holding(self.lock):
+            semesters = [semester] if semester is not None else list(self._semesters)
+            for name in semesters:
+                occupancy = self._semesters.pop(name, None)
+                if occupancy is None:
+                    continue
+                for schedule_id in occupancy.entries:
+                    self._semester_of.pop(schedule_id, None)
+
+
+occupancy_index = OccupancyIndex()
+
+
+@invalidation.register
+def _on_change(event: invalidation.Event):
+    # Los cambios propios ya se aplicaron con `sync`
+    if not event.local and event.affects("schedules"):
+        occupancy_index.invalidate(event.semester)
@@ -0,0 +1,364 @@
+"""
+Expansión de los horarios semanales en clases con fecha.
+
+Un `Schedule` es una plantilla semanal válida entre `week_start` y
+`week_end`. Para un rango de fechas solo se leen las plantillas cuyo periodo
+lo solapa y cuyo día de la semana cae dentro de él (índice
+`ix_schedules_week_range`), y las clases concretas se generan de forma
+perezosa, día a día y en orden cronológico: consultar una semana no
+materializa el semestre entero.
+
+Las excepciones (`ScheduleException`) se aplican encima: una sola consulta
+por fecha original o nueva fecha trae las del rango, cada una suprime la
+clase original y, salvo las cancelaciones, aporta la clase resultante.
+`exception_conflicts` compara un horario semanal con las clases trasladadas
+o sustituidas que caen en su periodo, para que las escrituras semanales no
+choquen con ellas. Esas clases se guardan en memoria por semestre y día de
+la semana (`exception_index`): se descartan al escribir una excepción o un
+horario que tenga alguna, de modo que comprobar un horario no consulta la
+base de datos.
+"""
+import heapq
+import threading
+from datetime import date, time, timedelta
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Set
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from app.models.schedule import Schedule
+from app.models.schedule_exception import ScheduleException, CANCEL, MOVE, SUBSTITUTE
+from app.services import invalidation, locking
+from app.services.interval_index import ScheduleConflicts
+
+SCHEDULED = "scheduled"
+CANCELLED = "cancelled"
+MOVED = "moved"
+SUBSTITUTED = "substituted"
+
+_BATCH_SIZE = 500
+
+
+class Occurrence(NamedTuple):
+    date: date
+    start_time: time
+    end_time: time
+    schedule_id: int
+    subject_id: int
+    class_type_id: int
+    classroom_id: int
+    teacher_id: int
+    semester: str
+    status: str = SCHEDULED
+    exception_id: Optional[int] = None
+
+
+class _Template(NamedTuple):
+    id: int
+    day_of_week: int
+    start_time: time
+    end_time: time
+    week_start: date
+    week_end: date
+    subject_id: int
+    class_type_id: int
+    classroom_id: int
+    teacher_id: int
+    semester: str
+
+
+def _template_columns() -> tuple:
+    return (
+        Schedule.id, Schedule.day_of_week, Schedule.start_time, Schedule.end_time,
+        Schedule.week_start, Schedule.week_end, Schedule.subject_id, Schedule.class_type_id,
+        Schedule.classroom_id, Schedule.teacher_id, Schedule.semester
+    )
+
+
+def days(start: date, end: date) -> Iterator[date]:
+    current = start
+    while current <= end:
+        yield current
+        current += timedelta(days=1)
+
+
+def weekdays(start: date, end: date) -> List[int]:
+    """Días de la semana que aparecen en [start, end]"""
+    return sorted({day.weekday() for day in islice(days(start, end), 7)})
+
+
+def templates(
+    db: Session,
+    start: date,
+    end: date,
+    teacher_id: Optional[int] = None,
+    classroom_id: Optional[int] = None,
+    subject_id: Optional[int] = None,
+) -> Iterator[_Template]:
+    """Plantillas activas que pueden tener alguna clase en [start, end]"""
+    query = db.query(*_template_columns()).filter(and_(
+        Schedule.week_start <= end,
+        Schedule.week_end >= start,
+        Schedule.day_of_week.in_(weekdays(start, end)),
+        Schedule.is_active == True,
+    ))
+    if teacher_id is not None:
+        query = query.filter(Schedule.teacher_id == teacher_id)
+    if classroom_id is not None:
+        query = query.filter(Schedule.classroom_id == classroom_id)
+    if subject_id is not None:
+        query = query.filter(Schedule.subject_id == subject_id)
+    for row in query.yield_per(_BATCH_SIZE):
+        yield _Template(*row)
+
+
+def by_weekday(rows: Iterable[_Template]) -> Dict[int, List[_Template]]:
+    """Plantillas agrupadas por día de la semana y ordenadas por hora"""
+    buckets: Dict[int, List[_Template]] = {}
+    for row in rows:
+        buckets.setdefault(row.day_of_week, []).append(row)
+    for bucket in buckets.values():
+        bucket.sort(key=lambda row: (row.start_time, row.id))
+    return buckets
+
+
+def _matches(occurrence: Occurrence, filters: Dict[str, Optional[int]]) -> bool:
+    return all(value is None or getattr(occurrence, field) == value for field, value in filters.items())
+
+
+def _resolve(exception: ScheduleException, template: _Template, day: date, status: str) -> Occurrence:
+    return Occurrence(
+        day,
+        exception.new_start_time or template.start_time,
+        exception.new_end_time or template.end_time,
+        template.id, template.subject_id, template.class_type_id,
+        exception.classroom_id or template.classroom_id,
+        exception.teacher_id or template.teacher_id,
+        template.semester, status, exception.id,
+    )
+
+
+class Resolution(NamedTuple):
+    suppressed: frozenset  # (schedule_id, fecha original) con excepción
+    extra: Dict[date, List[Occurrence]]  # clases resultantes por fecha, ordenadas por hora
+
+
+def exceptions(
+    db: Session, start: date, end: date, include_cancelled: bool = False, **filters
+) -> Resolution:
+    """Excepciones que afectan a [start, end], ya convertidas en clases"""
+    rows = db.query(ScheduleException, *_template_columns()).join(
+        Schedule, Schedule.id == ScheduleException.schedule_id
+    ).filter(and_(
+        or_(
+            ScheduleException.date.between(start, end),
+            ScheduleException.new_date.between(start, end),
+        ),
+        Schedule.is_active == True,
+    ))
+    suppressed = set()
+    extra: Dict[date, List[Occurrence]] = {}
+    for exception, *columns in rows:
+        template = _Template(*columns)
+        if start <= exception.date <= end:
+            suppressed.add((template.id, exception.date))
+        if exception.kind == CANCEL:
+            if not include_cancelled or not start <= exception.date <= end:
+                continue
+            day, status = exception.date, CANCELLED
+        elif exception.kind == MOVE:
+            if not start <= exception.new_date <= end:
+                continue
+            day, status = exception.new_date, MOVED
+        else:
+            if not start <= exception.date <= end:
+                continue
+            day, status = exception.date, SUBSTITUTED
+        occurrence = _resolve(exception, template, day, status)
+        if _matches(occurrence, filters):
+            extra.setdefault(day, []).append(occurrence)
+    for bucket in extra.values():
+        bucket.sort(key=lambda occurrence: (occurrence.start_time, occurrence.schedule_id))
+    return Resolution(frozenset(suppressed), extra)
+
+
+def resolved_exceptions(
+    db: Session,
+    semester: str,
+    start: date,
+    end: date,
+    classroom_ids: Optional[Iterable[int]] = None,
+    teacher_ids: Optional[Iterable[int]] = None,
+) -> List[Occurrence]:
+    """Clases trasladadas o sustituidas del semestre que quedan en [start, end]
+
+    Una sola consulta por los índices de fecha; con `classroom_ids` o
+    `teacher_ids` solo las que acaban en esas aulas o con esos profesores.
+    """
+    query = db.query(ScheduleException, *_template_columns()).join(
+        Schedule, Schedule.id == ScheduleException.schedule_id
+    ).filter(and_(
+        Schedule.semester == semester,
+        Schedule.is_active == True,
+        or_(
+            and_(ScheduleException.kind == MOVE, ScheduleException.new_date.between(start, end)),
+            and_(ScheduleException.kind == SUBSTITUTE, ScheduleException.date.between(start, end)),
+        ),
+    ))
+    resources = []
+    if classroom_ids is not None:
+        classroom = func.coalesce(ScheduleException.classroom_id, Schedule.classroom_id)
+        resources.append(classroom.in_(set(classroom_ids)))
+    if teacher_ids is not None:
+        teacher = func.coalesce(ScheduleException.teacher_id, Schedule.teacher_id)
+        resources.append(teacher.in_(set(teacher_ids)))
+    if resources:
+        query = query.filter(or_(*resources))
+    resolved = []
+    for exception, *columns in query:
+        if exception.kind == MOVE:
+            resolved.append(_resolve(exception, _Template(*columns), exception.new_date, MOVED))
+        else:
+            resolved.append(_resolve(exception, _Template(*columns), exception.date, SUBSTITUTED))
+    return resolved
+
+
+def overlapping(resolved: Iterable[Occurrence], schedule, exclude_id: Optional[int] = None) -> ScheduleConflicts:
+    """Horarios de las clases de `resolved` que chocan con el horario semanal `schedule`"""
+    found = ScheduleConflicts()
+    for occurrence in resolved:
+        if occurrence.schedule_id == exclude_id:
+            continue
+        if occurrence.date.weekday() != schedule.day_of_week:
+            continue
+        if not schedule.week_start <= occurrence.date <= schedule.week_end:
+            continue
+        if occurrence.start_time >= schedule.end_time or occurrence.end_time <= schedule.start_time:
+            continue
+        if occurrence.classroom_id == schedule.classroom_id and occurrence.schedule_id not in found.classroom:
+            found.classroom.append(occurrence.schedule_id)
+        if occurrence.teacher_id == schedule.teacher_id and occurrence.schedule_id not in found.teacher:
+            found.teacher.append(occurrence.schedule_id)
+    return found
+
+
+class _SemesterExceptions(NamedTuple):
+    by_weekday: Dict[int, List[Occurrence]]
+    schedule_ids: Set[int]  # plantillas con alguna clase resuelta
+
+
+class ExceptionIndex:
+    """Clases trasladadas o sustituidas de cada semestre, por día de la semana"""
+
+    def __init__(self):
+        # No reentrante: en modo asíncrono todas las corrutinas comparten hilo
+        self.lock = threading.Lock()
+        self._semesters: Dict[str, _SemesterExceptions] = {}
+
+    def _load(self, db: Session, semester: str) -> _SemesterExceptions:
+        cached = self._semesters.get(semester)
+        if cached is not None:
+            return cached
+        by_weekday: Dict[int, List[Occurrence]] = {}
+        for occurrence in resolved_exceptions(db, semester, date.min, date.max):
+            by_weekday.setdefault(occurrence.date.weekday(), []).append(occurrence)
+        cached = _SemesterExceptions(
+            by_weekday, {o.schedule_id for bucket in by_weekday.values() for o in bucket}
+        )
+        self._semesters[semester] = cached
+        return cached
+
+    def on_weekday(self, db: Session, semester: str, day_of_week: int) -> List[Occurrence]:
+        # Un semestre cargado no cambia: se sustituye entero al invalidarlo
+        cached = self._semesters.get(semester)
+        if cached is None:
+            with locking.holding(self.lock):
+                cached = self._load(db, semester)
+        return cached.by_weekday.get(day_of_week, [])
+
+    def invalidate(self, semester: Optional[str] = None, schedule_id: Optional[int] = None):
+        """Descartar un semestre (o todos); con `schedule_id`, solo los que lo usan"""
+        with locking.holding(self.lock):
+            semesters = [semester] if semester is not None else list(self._semesters)
+            for name in semesters:
+                cached = self._semesters.get(name)
+                if cached is not None and (schedule_id is None or schedule_id in cached.schedule_ids):
+                    del self._semesters[name]
+
+
+exception_index = ExceptionIndex()
+
+
+@invalidation.register
+def _on_change(event: invalidation.Event):
+    # Sin `sync`: también los cambios propios descartan lo cacheado
+    if event.affects("schedule_exceptions"):
+        exception_index.invalidate()
+    elif event.affects("schedules"):
+        # Un horario sin clases resueltas no cambia nada; si cambia de semestre
+        # llega un evento por cada uno
+        exception_index.invalidate(event.semester, event.row_id)
+
+
+def exception_conflicts(db: Session, schedule, exclude_id: Optional[int] = None) -> ScheduleConflicts:
+    """Clases trasladadas o sustituidas con las que chocaría el horario semanal `schedule`"""
+    resolved = exception_index.on_weekday(db, schedule.semester, schedule.day_of_week)
+    return overlapping(resolved, schedule, exclude_id) if resolved else ScheduleConflicts()
+
+
+def expand(
+    buckets: Dict[int, List[_Template]], start: date, end: date, resolution: Optional[Resolution] = None
+) -> Iterator[Occurrence]:
+    """Clases concretas en orden cronológico, generadas según se consumen"""
+    suppressed = resolution.suppressed if resolution else frozenset()
+    extra = resolution.extra if resolution else {}
+    for day in days(start, end):
+        generated = (
+            Occurrence(
+                day, row.start_time, row.end_time, row.id, row.subject_id,
+                row.class_type_id, row.classroom_id, row.teacher_id, row.semester
+            )
+            for row in buckets.get(day.weekday(), ())
+            if row.week_start <= day <= row.week_end and (row.id, day) not in suppressed
+        )
+        if day in extra:
+            yield from heapq.merge(
+                generated, extra[day], key=lambda occurrence: (occurrence.start_time, occurrence.schedule_id)
+            )
+        else:
+            yield from generated
+
+
+def occurrences(
+    db: Session, start: date, end: date, include_cancelled: bool = False, **filters
+) -> Iterator[Occurrence]:
+    """Clases de [start, end] con las excepciones aplicadas"""
+    resolution = exceptions(db, start, end, include_cancelled, **filters)
+    return expand(by_weekday(templates(db, start, end, **filters)), start, end, resolution)
+
+
+def conflicts(items: Iterable[Occurrence]) -> List[dict]:
+    """Pares de clases que comparten aula o profesor y se solapan el mismo día"""
+    groups: Dict[tuple, List[Occurrence]] = {}
+    for occurrence in items:
+        if occurrence.status == CANCELLED:
+            continue
+        groups.setdefault(("classroom", occurrence.classroom_id, occurrence.date), []).append(occurrence)
+        groups.setdefault(("teacher", occurrence.teacher_id, occurrence.date), []).append(occurrence)
+    found = []
+    for (resource, resource_id, day), group in groups.items():
+        group.sort(key=lambda occurrence: occurrence.start_time)
+        for i, first in enumerate(group):
+            for second in group[i + 1:]:
+                if second.start_time >= first.end_time:
+                    break
+                found.append({
+                    "date": day,
+                    "resource": resource,
+                    "resource_id": resource_id,
+                    "schedule_ids": [first.schedule_id, second.schedule_id],
+                    "exception_ids": [e for e in (first.exception_id, second.exception_id) if e is not None],
+                })
+    found.sort(key=lambda conflict: (conflict["date"], conflict["resource"], conflict["resource_id"]))
+    return found
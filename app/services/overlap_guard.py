@@ -0,0 +1,103 @@
+"""
+Garantía de no solapamiento al escribir horarios.
+
+En PostgreSQL con la migración 0002 aplicada, las restricciones de exclusión
+GiST rechazan los solapamientos dentro de la propia transacción, de forma
+segura con varios workers. En cualquier otro caso (SQLite, o una base creada
+sin migraciones) se usa la verificación de la aplicación con el índice de
+intervalos, serializando las escrituras por recurso dentro del proceso.
+"""
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.services import locking
+
+CLASSROOM_CONSTRAINT = "ex_schedules_classroom_overlap"
+TEACHER_CONSTRAINT = "ex_schedules_teacher_overlap"
+
+_enforced: Dict[str, bool] = {}
+_enforced_lock = threading.Lock()
+
+
+def database_enforces_overlaps(db: Session) -> bool:
+    """Indica si la base de datos tiene las restricciones de exclusión"""
+    mode = settings.schedule_overlap_enforcement
+    if mode != "auto":
+        return mode == "database"
+    engine = db.get_bind()
+    if engine.dialect.name != "postgresql":
+        return False
+    key = str(engine.url)
+    with locking.holding(_enforced_lock):
+        if key not in _enforced:
+            found = db.execute(
+                text("SELECT count(*) FROM pg_constraint WHERE conname IN (:classroom, :teacher)"),
+                {"classroom": CLASSROOM_CONSTRAINT, "teacher": TEACHER_CONSTRAINT},
+            ).scalar()
+            _enforced[key] = found == 2
+        return _enforced[key]
+
+
+def violated_constraint(exc: IntegrityError) -> Optional[str]:
+    """Nombre de la restricción de solapamiento violada, si es una de ellas"""
+    diag = getattr(exc.orig, "diag", None)
+    name = getattr(diag, "constraint_name", None)
+    if name in (CLASSROOM_CONSTRAINT, TEACHER_CONSTRAINT):
+        return name
+    message = str(exc.orig)
+    for constraint in (CLASSROOM_CONSTRAINT, TEACHER_CONSTRAINT):
+        if constraint in message:
+            return constraint
+    return None
+
+
+class _ResourceLocks:
+    """Cerrojos por (semestre, día, recurso) adquiridos en orden para evitar interbloqueos"""
+
+    def __init__(self):
+        self._guard = threading.Lock()
+        self._locks: Dict[tuple, threading.Lock] = {}
+
+    @contextmanager
+    def hold(self, keys: Iterable[tuple]):
+        keys = sorted(set(keys))
+        with self._guard:
+            locks = [self._locks.setdefault(key, threading.Lock()) for key in keys]
+        for lock in locks:
+            locking.acquire(lock)
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+
+
+_resource_locks = _ResourceLocks()
+
+
+def resource_keys(schedule) -> list:
+    return [
+        (schedule.semester, schedule.day_of_week, "classroom", schedule.classroom_id),
+        (schedule.semester, schedule.day_of_week, "teacher", schedule.teacher_id),
+    ]
+
+
+@contextmanager
+def serialize_writes(db: Session, schedules: Iterable):
+    """Serializar la verificación y el commit de los recursos afectados
+
+    Devuelve si la base de datos garantiza el no solapamiento; en ese caso no
+    se toma ningún cerrojo y la verificación previa puede omitirse.
+    """
+    if database_enforces_overlaps(db):
+        yield True
+        return
+    keys = [key for schedule in schedules for key in resource_keys(schedule)]
+    with _resource_locks.hold(keys):
+        yield False
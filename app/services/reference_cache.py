@@ -0,0 +1,136 @@
+"""
+Caché de las tablas de referencia: asignaturas, profesores, aulas y tipos de clase.
+
+Cada tabla se carga entera en una consulta como registros compactos con
+`__slots__` indexados por id, junto con la versión de la tabla
+(`app.services.versioning`). `snapshot` comprueba las versiones de todas las
+tablas en una sola consulta por clave primaria y recarga solo las que
+cambiaron, así que verificar claves foráneas o componer etiquetas son
+búsquedas en diccionarios. Las escrituras de los endpoints de referencia
+publican además en el bus de invalidación, que descarta la tabla en todos los
+workers.
+"""
+import threading
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.models.class_type import ClassType
+from app.models.classroom import Classroom
+from app.models.subject import Subject
+from app.models.teacher import Teacher
+from app.services import invalidation, locking, versioning
+
+
+class _Record:
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __repr__(self):
+        return f"<{type(self).__name__}(id={self.id})>"
+
+    def as_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class SubjectRecord(_Record):
+    __slots__ = ("id", "code", "name", "acronym", "credits", "is_active")
+
+
+class TeacherRecord(_Record):
+    __slots__ = ("id", "employee_id", "first_name", "last_name", "department", "is_active")
+
+    @property
+    def full_name(self) -> str:
+        return f"{self.first_name} {self.last_name}"
+
+    def as_dict(self) -> dict:
+        return {**super().as_dict(), "full_name": self.full_name}
+
+
+class ClassroomRecord(_Record):
+    __slots__ = ("id", "code", "name", "building", "floor", "capacity", "is_active")
+
+
+class ClassTypeRecord(_Record):
+    __slots__ = ("id", "name", "acronym", "color", "is_active")
+
+
+_TABLES = {
+    "subjects": (Subject, SubjectRecord),
+    "teachers": (Teacher, TeacherRecord),
+    "classrooms": (Classroom, ClassroomRecord),
+    "class_types": (ClassType, ClassTypeRecord),
+}
+
+# Campo del horario, tabla y mensaje si no existe, en el orden en que se comprueban
+FOREIGN_KEYS = (
+    ("subject_id", "subjects", "Asignatura no encontrada"),
+    ("class_type_id", "class_types", "Tipo de clase no encontrado"),
+    ("classroom_id", "classrooms", "Aula no encontrada"),
+    ("teacher_id", "teachers", "Profesor no encontrado"),
+)
+
+References = Dict[str, Dict[int, _Record]]
+
+
+class ReferenceCache:
+    """Registros de las tablas de referencia por id, válidos mientras no cambie su versión"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._tables: Dict[str, Tuple[int, Dict[int, _Record]]] = {}
+
+    def _load(self, db: Session, table: str) -> Dict[int, _Record]:
+        model, record = _TABLES[table]
+        rows = db.query(*(getattr(model, name) for name in record.__slots__))
+        return {row[0]: record(*row) for row in rows}
+
+    def snapshot(self, db: Session, tables: Iterable[str] = versioning.REFERENCE_TABLES) -> References:
+        """Registros actuales de `tables` (una consulta de versiones más una por tabla cambiada)"""
+        tables = list(tables)
+        scopes = {table: versioning.table_scope(table) for table in tables}
+        current = versioning.versions(db, scopes.values())
+        result = {}
+        for table in tables:
+            version = current[scopes[table]]
+            with locking.holding(self._lock):
+                cached = self._tables.get(table)
+            if cached is not None and cached[0] == version:
+                result[table] = cached[1]
+                continue
+            # Filas leídas después que la versión: como mucho más nuevas que ella
+            records = self._load(db, table)
+            with locking.holding(self._lock):
+                self._tables[table] = (version, records)
+            result[table] = records
+        return result
+
+    def missing(self, db: Session, values, references: Optional[References] = None) -> List[str]:
+        """Mensajes de las claves foráneas de `values` (objeto con *_id) que no existen"""
+        references = references if references is not None else self.snapshot(db)
+        return [
+            message for field, table, message in FOREIGN_KEYS
+            if getattr(values, field) not in references[table]
+        ]
+
+    def invalidate(self, table: Optional[str] = None):
+        with locking.holding(self._lock):
+            if table is None:
+                self._tables.clear()
+            else:
+                self._tables.pop(table, None)
+
+
+reference_cache = ReferenceCache()
+
+
+@invalidation.register
+def _on_change(event: invalidation.Event):
+    if event.table == invalidation.ALL:
+        reference_cache.invalidate()
+    elif event.table in _TABLES:
+        reference_cache.invalidate(event.table)
@@ -0,0 +1,233 @@
+"""
+Importación masiva de profesores, asignaturas y aulas.
+
+Las filas se leen en streaming (CSV o XLSX en modo solo lectura) y se
+procesan en lotes de `BATCH_SIZE`: cada lote se valida, se inserta o
+actualiza por su clave natural con `INSERT ... ON CONFLICT DO UPDATE` y se
+confirma por separado, así que la memoria no depende del tamaño del archivo.
+Solo se escriben las columnas presentes en el archivo (y siempre la clave):
+una columna que falta no borra el valor guardado de las filas existentes.
+En PostgreSQL con psycopg2 el lote se copia antes con COPY a una tabla
+temporal y el upsert es un único `INSERT ... SELECT`. Cada fila recibe un
+resultado: creada, actualizada o con errores.
+"""
+import csv
+import io
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import or_, select, text
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from app.models.classroom import Classroom
+from app.models.subject import Subject
+from app.models.teacher import Teacher
+from app.schemas.classroom import ClassroomCreate
+from app.schemas.subject import SubjectCreate
+from app.schemas.teacher import TeacherCreate
+from app.services import versioning
+from app.services.schedule_import import format_validation_error
+
+BATCH_SIZE = 1000
+
+CREATED = "created"
+UPDATED = "updated"
+FAILED = "failed"
+
+
+class _Target(NamedTuple):
+    model: type
+    schema: Type[BaseModel]
+    key: str
+    # Otras columnas únicas y el error si ya las usa otra fila
+    unique: Tuple[Tuple[str, str], ...] = ()
+
+
+TARGETS: Dict[str, _Target] = {
+    "teachers": _Target(
+        Teacher, TeacherCreate, "employee_id", (("email", "Ya existe un profesor con este email"),)
+    ),
+    "subjects": _Target(Subject, SubjectCreate, "code"),
+    "classrooms": _Target(Classroom, ClassroomCreate, "code"),
+}
+
+
+class RowOutcome(NamedTuple):
+    row: int
+    status: str
+    key: Optional[str] = None
+    id: Optional[int] = None
+    errors: Tuple[str, ...] = ()
+
+
+def _coerce(schema: Type[BaseModel], row: Dict[str, Any]) -> Dict[str, Any]:
+    # En XLSX los códigos numéricos llegan como números
+    result = dict(row)
+    for name, field in schema.model_fields.items():
+        value = result.get(name)
+        if field.annotation not in (str, Optional[str]):
+            continue
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            result[name] = str(int(value)) if float(value).is_integer() else str(value)
+    return result
+
+
+def _copy_upsert(db: Session, target: _Target, columns: List[str], rows: List[Dict[str, Any]]):
+    """Upsert vía COPY a una tabla temporal (PostgreSQL con psycopg2)"""
+    table = target.model.__tablename__
+    staging = f"import_{table}"
+    names = ", ".join(columns)
+    db.execute(text(
+        f"CREATE TEMP TABLE {staging} ON COMMIT DROP AS SELECT {names} FROM {table} WITH NO DATA"
+    ))
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        # Un campo vacío sin comillas es NULL en el formato csv de COPY
+        writer.writerow([row[column] for column in columns])
+    buffer.seek(0)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(f"COPY {staging} ({names}) FROM STDIN WITH (FORMAT csv)", buffer)
+    finally:
+        cursor.close()
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in columns if column != target.key)
+    db.execute(text(
+        f"INSERT INTO {table} ({names}, is_active) SELECT {names}, true FROM {staging} "
+        f"ON CONFLICT ({target.key}) DO UPDATE SET {updates}"
+    ))
+
+
+def _columns(target: _Target, batch: List[Tuple[int, Dict[str, Any]]]) -> List[str]:
+    """Campos del esquema presentes en la cabecera del archivo, con la clave siempre"""
+    present = set().union(*(row.keys() for _, row in batch))
+    return [name for name in target.schema.model_fields if name == target.key or name in present]
+
+
+def _upsert(db: Session, target: _Target, columns: List[str], rows: List[Dict[str, Any]]):
+    bind = db.get_bind()
+    if bind.dialect.name == "postgresql" and bind.dialect.driver == "psycopg2":
+        _copy_upsert(db, target, columns, rows)
+        return
+    insert = postgresql.insert if bind.dialect.name == "postgresql" else sqlite.insert
+    statement = insert(target.model.__table__)
+    statement = statement.on_conflict_do_update(
+        index_elements=[target.key],
+        set_={column: statement.excluded[column] for column in columns if column != target.key},
+    )
+    db.execute(statement, [{**{column: row[column] for column in columns}, "is_active": True} for row in rows])
+
+
+def _flush(
+    db: Session, target: _Target, table: str, batch: List[Tuple[int, Dict[str, Any]]]
+) -> List[RowOutcome]:
+    model = target.model
+    fields = _columns(target, batch)
+    failed: Dict[int, RowOutcome] = {}
+    valid: Dict[int, Dict[str, Any]] = {}
+    for number, row in batch:
+        # Las celdas vacías toman el valor por defecto del esquema
+        row = {name: value for name, value in row.items() if value is not None}
+        try:
+            valid[number] = target.schema.model_validate(_coerce(target.schema, row)).model_dump()
+        except ValidationError as exc:
+            key = row.get(target.key)
+            failed[number] = RowOutcome(
+                number, FAILED, None if key is None else str(key),
+                errors=tuple(format_validation_error(exc)),
+            )
+
+    # Claves repetidas dentro del lote: vale la primera aparición. Las columnas
+    # únicas que no trae el archivo no se escriben y no se comprueban
+    unique = tuple((column, message) for column, message in target.unique if column in fields)
+    columns = [target.key, *(column for column, _ in unique)]
+    seen: Dict[Tuple[str, Any], int] = {}
+    for number, data in list(valid.items()):
+        errors = []
+        for column in columns:
+            first = seen.setdefault((column, data[column]), number)
+            if first != number:
+                errors.append(f"{column} repetido en la fila {first}")
+        if errors:
+            failed[number] = RowOutcome(number, FAILED, data[target.key], errors=tuple(errors))
+            del valid[number]
+
+    # Filas existentes por clave natural y dueños de las demás columnas únicas
+    existing: Dict[str, int] = {}
+    owners: Dict[Tuple[str, Any], str] = {}
+    if valid:
+        conditions = [
+            getattr(model, column).in_({data[column] for data in valid.values()}) for column in columns
+        ]
+        query = select(model.id, *(getattr(model, column) for column in columns)).where(or_(*conditions))
+        for row in db.execute(query):
+            existing[row[1]] = row[0]
+            for column, value in zip(columns[1:], row[2:]):
+                owners[(column, value)] = row[1]
+    for number, data in list(valid.items()):
+        errors = [
+            message for column, message in unique
+            if owners.get((column, data[column]), data[target.key]) != data[target.key]
+        ]
+        if errors:
+            failed[number] = RowOutcome(number, FAILED, data[target.key], errors=tuple(errors))
+            del valid[number]
+
+    ids: Dict[str, int] = {}
+    if valid:
+        try:
+            _upsert(db, target, fields, list(valid.values()))
+            versioning.record_change(db, table)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        key_column = getattr(model, target.key)
+        ids = dict(db.execute(
+            select(key_column, model.id).where(key_column.in_([data[target.key] for data in valid.values()]))
+        ).all())
+
+    outcomes = list(failed.values())
+    for number, data in valid.items():
+        key = data[target.key]
+        outcomes.append(RowOutcome(number, UPDATED if key in existing else CREATED, key, ids.get(key)))
+    outcomes.sort(key=lambda outcome: outcome.row)
+    return outcomes
+
+
+def upsert(
+    db: Session,
+    table: str,
+    rows: Iterable[Dict[str, Any]],
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[RowOutcome]:
+    """Insertar o actualizar filas de `table` por su clave natural, lote a lote
+
+    Las filas se numeran desde 1. Cada lote se confirma por separado: las
+    filas con errores no impiden guardar las demás.
+    """
+    target = TARGETS[table]
+    batch: List[Tuple[int, Dict[str, Any]]] = []
+    for number, row in enumerate(rows, 1):
+        batch.append((number, row))
+        if len(batch) >= batch_size:
+            yield from _flush(db, target, table, batch)
+            batch = []
+    if batch:
+        yield from _flush(db, target, table, batch)
+
+
+def summarize(outcomes: Iterable[RowOutcome]) -> dict:
+    """Totales del informe y errores por fila"""
+    result = {"total": 0, CREATED: 0, UPDATED: 0, FAILED: 0, "errors": []}
+    for outcome in outcomes:
+        result["total"] += 1
+        result[outcome.status] += 1
+        if outcome.errors:
+            result["errors"].append({"row": outcome.row, "errors": list(outcome.errors)})
+    return result
+
+
+def import_rows(db: Session, table: str, rows: Iterable[Dict[str, Any]]) -> dict:
+    return summarize(upsert(db, table, rows))
@@ -0,0 +1,209 @@
+"""
+Importación masiva de horarios.
+
+Valida todas las filas de una vez: las claves foráneas contra la caché de
+tablas de referencia y un barrido ordenado por (semestre, día, recurso) para
+detectar solapamientos contra la base de datos y dentro del propio lote. Las filas
+válidas se insertan en lotes dentro de una única transacción.
+"""
+import csv
+import heapq
+import io
+from typing import Any, BinaryIO, Dict, Iterable, Iterator, List, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import and_, insert
+from sqlalchemy.orm import Session
+
+from app.models.schedule import Schedule
+from app.schemas.schedule import ScheduleCreate
+from app.services import occurrences, overlap_guard, versioning
+from app.services.interval_index import schedule_index, to_seconds
+from app.services.occupancy import occupancy_index
+from app.services.reference_cache import reference_cache
+
+INSERT_BATCH_SIZE = 1000
+
+
+def _clean(row: Dict[Any, Any], keep_empty: bool = False) -> Dict[str, Any]:
+    # Con `keep_empty` las celdas vacías quedan como None: la fila conserva las columnas de la cabecera
+    result = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        if isinstance(value, str):
+            value = value.strip() or None
+        if value is not None or keep_empty:
+            result[str(key).strip().lower()] = value
+    return result
+
+
+def read_csv(stream: BinaryIO, keep_empty: bool = False) -> Iterator[Dict[str, Any]]:
+    text = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    for row in csv.DictReader(text):
+        yield _clean(row, keep_empty)
+
+
+def read_xlsx(stream: BinaryIO, keep_empty: bool = False) -> Iterator[Dict[str, Any]]:
+    from openpyxl import load_workbook
+
+    workbook = load_workbook(stream, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        header = next(rows, None)
+        if header is None:
+            return
+        for values in rows:
+            if all(value is None for value in values):
+                continue
+            yield _clean(dict(zip(header, values)), keep_empty)
+    finally:
+        workbook.close()
+
+
+def format_validation_error(exc: ValidationError) -> List[str]:
+    # Los errores de validación del modelo completo no tienen campo
+    return [
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}" if error["loc"] else error["msg"]
+        for error in exc.errors()
+    ]
+
+
+def _sweep(groups: Dict[tuple, List[tuple]]) -> Iterator[Tuple[tuple, tuple]]:
+    """Pares de intervalos solapados dentro de cada grupo
+
+    Cada intervalo es (inicio, fin, referencia). Se ordenan por inicio y se
+    mantiene un montículo con los activos ordenados por fin.
+    """
+    for intervals in groups.values():
+        intervals.sort(key=lambda interval: interval[0])
+        active: List[tuple] = []
+        for start, end, ref in intervals:
+            while active and active[0][0] <= start:
+                heapq.heappop(active)
+            for _, other in active:
+                yield ref, other
+            heapq.heappush(active, (end, ref))
+
+
+def import_schedules(
+    db: Session,
+    rows: Iterable[Dict[str, Any]],
+    skip_invalid: bool = False,
+) -> dict:
+    """Validar e insertar un lote de horarios
+
+    Las filas se numeran desde 1. Si `skip_invalid` es falso y alguna fila
+    tiene errores no se inserta nada.
+    """
+    errors: Dict[int, List[str]] = {}
+    valid: Dict[int, ScheduleCreate] = {}
+    total = 0
+    for number, row in enumerate(rows, 1):
+        total = number
+        try:
+            valid[number] = ScheduleCreate.model_validate(row)
+        except ValidationError as exc:
+            errors[number] = format_validation_error(exc)
+
+    # Claves foráneas: búsquedas en la caché de referencia
+    if valid:
+        references = reference_cache.snapshot(db)
+        for number, schedule in valid.items():
+            missing = reference_cache.missing(db, schedule, references)
+            if missing:
+                errors.setdefault(number, []).extend(missing)
+
+    candidates = {n: s for n, s in valid.items() if n not in errors}
+
+    # Con restricciones en la base de datos el barrido solo sirve para el
+    # informe por fila; sin ellas además protege frente a escrituras concurrentes
+    with overlap_guard.serialize_writes(db, candidates.values()):
+        # Barrido de solapamientos contra la base de datos y dentro del lote
+        groups: Dict[tuple, List[tuple]] = {}
+
+        def add(kind, semester, day, resource, start, end, ref):
+            groups.setdefault((kind, semester, day, resource), []).append((start, end, ref))
+
+        semesters = {s.semester for s in candidates.values()}
+        if semesters:
+            existing = db.query(
+                Schedule.id, Schedule.semester, Schedule.day_of_week, Schedule.classroom_id,
+                Schedule.teacher_id, Schedule.start_time, Schedule.end_time
+            ).filter(and_(Schedule.semester.in_(semesters), Schedule.is_active == True))
+            for s in existing:
+                start, end = to_seconds(s.start_time), to_seconds(s.end_time)
+                add("classroom", s.semester, s.day_of_week, s.classroom_id, start, end, ("db", s.id))
+                add("teacher", s.semester, s.day_of_week, s.teacher_id, start, end, ("db", s.id))
+        for number, s in candidates.items():
+            start, end = to_seconds(s.start_time), to_seconds(s.end_time)
+            add("classroom", s.semester, s.day_of_week, s.classroom_id, start, end, ("row", number))
+            add("teacher", s.semester, s.day_of_week, s.teacher_id, start, end, ("row", number))
+
+        conflicts: Dict[int, Dict[str, List[str]]] = {}
+        for kind in ("classroom", "teacher"):
+            subset = {key: value for key, value in groups.items() if key[0] == kind}
+            for first, second in _sweep(subset):
+                for ref, other in ((first, second), (second, first)):
+                    if ref[0] != "row":
+                        continue
+                    label = f"horario {other[1]}" if other[0] == "db" else f"fila {other[1]}"
+                    conflicts.setdefault(ref[1], {}).setdefault(kind, []).append(label)
+
+        # Clases trasladadas o sustituidas: una consulta por semestre
+        for semester in semesters:
+            rows = [(n, s) for n, s in candidates.items() if s.semester == semester]
+            resolved = occurrences.resolved_exceptions(
+                db, semester,
+                min(s.week_start for _, s in rows), max(s.week_end for _, s in rows),
+                {s.classroom_id for _, s in rows}, {s.teacher_id for _, s in rows},
+            )
+            by_day: Dict[int, List[occurrences.Occurrence]] = {}
+            for occurrence in resolved:
+                by_day.setdefault(occurrence.date.weekday(), []).append(occurrence)
+            for number, s in rows:
+                found = occurrences.overlapping(by_day.get(s.day_of_week, ()), s)
+                for kind, ids in (("classroom", found.classroom), ("teacher", found.teacher)):
+                    if not ids:
+                        continue
+                    labels = conflicts.setdefault(number, {}).setdefault(kind, [])
+                    labels.extend(label for label in (f"horario {i}" for i in ids) if label not in labels)
+        for number, by_kind in sorted(conflicts.items()):
+            if "classroom" in by_kind:
+                errors.setdefault(number, []).append(
+                    "Conflicto de horario: el aula ya está ocupada en este horario "
+                    f"({', '.join(sorted(by_kind['classroom']))})"
+                )
+            if "teacher" in by_kind:
+                errors.setdefault(number, []).append(
+                    "Conflicto de horario: el profesor ya tiene clase en este horario "
+                    f"({', '.join(sorted(by_kind['teacher']))})"
+                )
+
+        to_insert = [] if errors and not skip_invalid else [
+            {**s.model_dump(), "is_active": True}
+            for n, s in sorted(candidates.items())
+            if n not in errors
+        ]
+        try:
+            for offset in range(0, len(to_insert), INSERT_BATCH_SIZE):
+                db.execute(insert(Schedule), to_insert[offset:offset + INSERT_BATCH_SIZE])
+            if to_insert:
+                versioning.record_change(db, "schedules", {row["semester"] for row in to_insert})
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        for semester in {row["semester"] for row in to_insert}:
+            schedule_index.invalidate(semester)
+            occupancy_index.invalidate(semester)
+
+    return {
+        "total": total,
+        "created": len(to_insert),
+        "failed": len(errors),
+        "errors": [
+            {"row": number, "errors": messages}
+            for number, messages in sorted(errors.items())
+        ],
+    }
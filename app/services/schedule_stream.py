@@ -0,0 +1,62 @@
+"""
+Exportación de un semestre completo, horario a horario.
+
+Los horarios activos se leen con un cursor del lado del servidor
+(`yield_per`) y se entregan por lotes en cuanto llegan, cada uno con los
+datos de su asignatura, tipo de clase, aula y profesor tomados de la caché de
+tablas de referencia. La memoria depende del tamaño del lote y no del
+semestre.
+"""
+from typing import Any, Dict, Iterator, List
+
+from sqlalchemy import and_, select
+
+from app.database import SessionLocal
+from app.models.schedule import Schedule
+from app.services.reference_cache import reference_cache
+
+BATCH_SIZE = 1000
+
+_COLUMNS = (
+    Schedule.id, Schedule.semester, Schedule.day_of_week, Schedule.start_time, Schedule.end_time,
+    Schedule.week_start, Schedule.week_end, Schedule.notes,
+    Schedule.subject_id, Schedule.class_type_id, Schedule.classroom_id, Schedule.teacher_id,
+)
+# Campo anidado, tabla de referencia y columna del horario
+_REFERENCES = (
+    ("subject", "subjects", "subject_id"),
+    ("class_type", "class_types", "class_type_id"),
+    ("classroom", "classrooms", "classroom_id"),
+    ("teacher", "teachers", "teacher_id"),
+)
+
+
+def batches(semester: str, batch_size: int = BATCH_SIZE) -> Iterator[List[Dict[str, Any]]]:
+    """Horarios activos del semestre, por id, en lotes de `batch_size`
+
+    Usa su propia sesión: el generador se consume después de que el endpoint
+    ha devuelto la respuesta.
+    """
+    db = SessionLocal()
+    try:
+        statement = select(*_COLUMNS).where(
+            and_(Schedule.semester == semester, Schedule.is_active == True)
+        ).order_by(Schedule.id).execution_options(yield_per=batch_size)
+        result = db.execute(statement)
+        # Después de abrir el cursor: toda referencia que vea ya está en la caché
+        references = reference_cache.snapshot(db)
+        nested: Dict[str, Dict[int, dict]] = {table: {} for _, table, _ in _REFERENCES}
+        for partition in result.partitions():
+            items = []
+            for row in partition:
+                item = row._asdict()
+                for field, table, column in _REFERENCES:
+                    value = item.pop(column)
+                    if value not in nested[table]:
+                        record = references[table].get(value)
+                        nested[table][value] = record.as_dict() if record is not None else {"id": value}
+                    item[field] = nested[table][value]
+                items.append(item)
+            yield items
+    finally:
+        db.close()
@@ -0,0 +1,225 @@
+"""
+Copia de un semestre a otro dentro de la base de datos.
+
+Los horarios activos del semestre de origen se copian con un único
+`INSERT ... SELECT`. Las fechas se desplazan los días que separan el inicio
+más temprano del origen del nuevo `week_start` y el fin se recorta al nuevo
+`week_end`; los profesores y aulas se pueden sustituir con tablas de
+correspondencia. Los solapamientos de las copias entre sí y con lo que ya
+hay en el destino se buscan con una sola consulta sobre la misma selección,
+y los choques con clases trasladadas o sustituidas del destino con otra; la
+simulación (`dry_run`) solo devuelve ese informe.
+"""
+from datetime import date
+from types import SimpleNamespace
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import Date, Select, and_, case, func, insert, literal, select, true, type_coerce, union_all
+from sqlalchemy.orm import Session, aliased
+
+from app.models.schedule import Schedule
+from app.schemas.semester import SemesterCloneRequest
+from app.services import occurrences, overlap_guard, versioning
+from app.services.interval_index import schedule_index
+from app.services.occupancy import occupancy_index
+from app.services.reference_cache import reference_cache
+
+_COPIED = ("subject_id", "class_type_id", "day_of_week", "start_time", "end_time", "notes")
+
+
+def _shift(db: Session, column, days: int):
+    if db.get_bind().dialect.name == "postgresql":
+        return column + days
+    return type_coerce(func.date(column, f"{days:+d} days"), Date)
+
+
+def _least(db: Session, *values):
+    if db.get_bind().dialect.name == "postgresql":
+        return func.least(*values)
+    return func.min(*values)
+
+
+def _mapped(column, mapping: Dict[int, int]):
+    return case(mapping, value=column, else_=column) if mapping else column
+
+
+def candidates(db: Session, source: str, request: SemesterCloneRequest, offset: int) -> Select:
+    """Filas que se insertarán en el destino, con el id del horario de origen"""
+    week_start = _shift(db, Schedule.week_start, offset)
+    return select(
+        Schedule.id.label("source_id"),
+        *(getattr(Schedule, column) for column in _COPIED),
+        _mapped(Schedule.classroom_id, request.classroom_map).label("classroom_id"),
+        _mapped(Schedule.teacher_id, request.teacher_map).label("teacher_id"),
+        literal(request.semester).label("semester"),
+        week_start.label("week_start"),
+        _least(db, _shift(db, Schedule.week_end, offset), literal(request.week_end, Date)).label("week_end"),
+        true().label("is_active"),
+    ).where(and_(
+        Schedule.semester == source,
+        Schedule.is_active == True,
+        week_start <= literal(request.week_end, Date),
+    ))
+
+
+def _conflict(schedule_id: int, resource: str, conflicting_schedule_id: int, is_clone: bool,
+              exception_id: Optional[int] = None) -> dict:
+    return {
+        "schedule_id": schedule_id,
+        "resource": resource,
+        "conflicting_schedule_id": conflicting_schedule_id,
+        "conflicting_is_clone": is_clone,
+        "conflicting_exception_id": exception_id,
+    }
+
+
+def _exception_conflicts(db: Session, rows: Select, request: SemesterCloneRequest) -> List[dict]:
+    """Copias que chocan con clases trasladadas o sustituidas del destino"""
+    clones = rows.subquery()
+    copies = db.execute(select(
+        clones.c.source_id, clones.c.day_of_week, clones.c.start_time, clones.c.end_time,
+        clones.c.classroom_id, clones.c.teacher_id, clones.c.week_start, clones.c.week_end,
+    )).all()
+    if not copies:
+        return []
+    resolved = occurrences.resolved_exceptions(
+        db, request.semester, request.week_start, request.week_end,
+        {row.classroom_id for row in copies}, {row.teacher_id for row in copies},
+    )
+    by_day: Dict[int, List[occurrences.Occurrence]] = {}
+    for occurrence in resolved:
+        by_day.setdefault(occurrence.date.weekday(), []).append(occurrence)
+    found = []
+    for row in copies:
+        for occurrence in by_day.get(row.day_of_week, ()):
+            overlap = occurrences.overlapping([occurrence], row)
+            for resource, ids in (("classroom", overlap.classroom), ("teacher", overlap.teacher)):
+                if ids:
+                    found.append(_conflict(
+                        row.source_id, resource, occurrence.schedule_id, False, occurrence.exception_id
+                    ))
+    return found
+
+
+def conflicts(db: Session, rows: Select, request: SemesterCloneRequest) -> List[dict]:
+    """Solapamientos de aula o profesor de las copias entre sí y con el destino
+
+    Incluye los choques con clases trasladadas o sustituidas del destino.
+    """
+    semester = request.semester
+    clones = rows.cte("clones")
+    other = clones.alias("other_clones")
+    existing = aliased(Schedule)
+    queries = []
+    for resource in ("classroom", "teacher"):
+        column = f"{resource}_id"
+        queries.append(select(
+            clones.c.source_id, literal(resource).label("resource"),
+            existing.id.label("conflicting_schedule_id"), literal(False).label("conflicting_is_clone"),
+        ).join(existing, and_(
+            existing.semester == semester,
+            existing.is_active == True,
+            existing.day_of_week == clones.c.day_of_week,
+            getattr(existing, column) == clones.c[column],
+            existing.start_time < clones.c.end_time,
+            clones.c.start_time < existing.end_time,
+        )))
+        queries.append(select(
+            clones.c.source_id, literal(resource).label("resource"),
+            other.c.source_id.label("conflicting_schedule_id"), literal(True).label("conflicting_is_clone"),
+        ).join(other, and_(
+            other.c.source_id != clones.c.source_id,
+            other.c.day_of_week == clones.c.day_of_week,
+            other.c[column] == clones.c[column],
+            other.c.start_time < clones.c.end_time,
+            clones.c.start_time < other.c.end_time,
+        )))
+    found = [
+        _conflict(row.source_id, row.resource, row.conflicting_schedule_id, bool(row.conflicting_is_clone))
+        for row in db.execute(union_all(*queries))
+    ]
+    found.extend(_exception_conflicts(db, rows, request))
+    found.sort(key=lambda conflict: (
+        conflict["schedule_id"], conflict["resource"], conflict["conflicting_schedule_id"],
+        conflict["conflicting_exception_id"] or 0,
+    ))
+    return found
+
+
+def _check_references(db: Session, request: SemesterCloneRequest):
+    references = reference_cache.snapshot(db, ("teachers", "classrooms"))
+    for mapping, table, message in (
+        (request.teacher_map, "teachers", "Profesor no encontrado"),
+        (request.classroom_map, "classrooms", "Aula no encontrada"),
+    ):
+        if any(target not in references[table] for target in mapping.values()):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=message
+            )
+
+
+def clone(db: Session, source: str, request: SemesterCloneRequest) -> dict:
+    """Copiar (o simular la copia de) los horarios activos de `source`"""
+    if request.semester == source:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El semestre destino debe ser distinto del de origen"
+        )
+    if request.week_end < request.week_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha final debe ser igual o posterior a la inicial"
+        )
+    _check_references(db, request)
+
+    first, available = db.execute(
+        select(func.min(Schedule.week_start), func.count())
+        .where(and_(Schedule.semester == source, Schedule.is_active == True))
+    ).one()
+    if not available:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No se encontraron horarios para este semestre"
+        )
+    if isinstance(first, str):  # SQLite sin tipo en agregados
+        first = date.fromisoformat(first)
+    rows = candidates(db, source, request, (request.week_start - first).days)
+
+    clones = rows.subquery()
+    total = db.execute(select(func.count()).select_from(clones)).scalar()
+    # Recursos afectados, para serializar la escritura si la base de datos no lo garantiza
+    resources = [
+        SimpleNamespace(semester=request.semester, **row._asdict())
+        for row in db.execute(
+            select(clones.c.day_of_week, clones.c.classroom_id, clones.c.teacher_id).distinct()
+        )
+    ]
+    result = {
+        "source": source,
+        "semester": request.semester,
+        "dry_run": request.dry_run,
+        "total": total,
+        "skipped": available - total,
+        "cloned": 0,
+        "conflicts": [],
+    }
+    with overlap_guard.serialize_writes(db, resources):
+        result["conflicts"] = conflicts(db, rows, request)
+        if request.dry_run or result["conflicts"] or not total:
+            return result
+        columns = [name for name in rows.selected_columns.keys() if name != "source_id"]
+        try:
+            inserted = db.execute(insert(Schedule).from_select(
+                columns, rows.with_only_columns(*(rows.selected_columns[name] for name in columns))
+            ))
+            versioning.record_change(db, "schedules", [request.semester])
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+    schedule_index.invalidate(request.semester)
+    occupancy_index.invalidate(request.semester)
+    result["cloned"] = inserted.rowcount
+    return result
@@ -0,0 +1,350 @@
+"""
+Motor de generación automática de horarios.
+
+Construye un horario semanal sin conflictos con una heurística constructiva
+(primero las sesiones más restringidas) seguida de una búsqueda local con
+expulsión de sesiones. Varias semillas se ejecutan en paralelo en un pool de
+procesos y se conserva la mejor solución.
+
+El módulo no depende de la base de datos: los procesos del pool solo importan
+la biblioteca estándar.
+"""
+import math
+import random
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+SLOT_MINUTES = 15
+
+# Pesos de las restricciones blandas
+SAME_DAY_PENALTY = 5.0          # misma asignatura dos veces el mismo día
+SECONDARY_TEACHER_PENALTY = 1.0  # no se usa el profesor principal
+CAPACITY_WASTE_PENALTY = 2.0    # fracción de asientos vacíos en el aula
+
+# Iteraciones sin mejora tras las que la búsqueda local se detiene
+STAGNATION_FACTOR = 50
+
+Placement = Tuple[int, int, int, int]  # (día, slot de inicio, aula, profesor)
+
+
+@dataclass(frozen=True)
+class Session:
+    """Sesión semanal a ubicar"""
+    subject_id: int
+    class_type_id: int
+    teachers: Tuple[int, ...]  # profesores habilitados, el principal primero
+    length: int                # duración en slots
+    students: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Room:
+    id: int
+    capacity: Optional[int]
+
+
+@dataclass
+class Problem:
+    sessions: List[Session]
+    rooms: List[Room]
+    days: Tuple[int, ...]
+    first_slot: int
+    last_slot: int   # fin de jornada (exclusivo)
+    start_step: int  # separación entre inicios candidatos, en slots
+    # Ocupación previa del semestre: (recurso, día) -> máscara de slots
+    busy_rooms: Dict[Tuple[int, int], int] = field(default_factory=dict)
+    busy_teachers: Dict[Tuple[int, int], int] = field(default_factory=dict)
+
+
+@dataclass
+class Solution:
+    seed: int
+    placements: List[Optional[Placement]]
+    unplaced: int
+    penalty: float
+    iterations: int
+
+    @property
+    def score(self):
+        return (self.unplaced, self.penalty)
+
+
+def slot_bits(start: int, length: int) -> int:
+    """Máscara de bits de `length` slots a partir de `start`"""
+    return ((1 << length) - 1) << start
+
+
+class _Solver:
+    def __init__(self, problem: Problem, seed: int):
+        self.problem = problem
+        self.rng = random.Random(seed)
+        self.sessions = problem.sessions
+        self.capacity = {room.id: room.capacity for room in problem.rooms}
+
+        # Aulas válidas por sesión, de menor a mayor capacidad
+        ordered_rooms = sorted(
+            problem.rooms, key=lambda r: (r.capacity is None, r.capacity or 0)
+        )
+        self.fitting = [
+            [r.id for r in ordered_rooms
+             if s.students is None or (r.capacity is not None and r.capacity >= s.students)]
+            for s in self.sessions
+        ]
+        self.starts = {}
+        for s in self.sessions:
+            if s.length not in self.starts:
+                self.starts[s.length] = list(
+                    range(problem.first_slot, problem.last_slot - s.length + 1, problem.start_step)
+                )
+
+        self.room_mask: Dict[Tuple[int, int], int] = {}
+        self.teacher_mask: Dict[Tuple[int, int], int] = {}
+        self.room_owners: Dict[Tuple[int, int], List[int]] = {}
+        self.teacher_owners: Dict[Tuple[int, int], List[int]] = {}
+        self.subject_day: Dict[Tuple[int, int], int] = {}
+        self.placements: List[Optional[Placement]] = [None] * len(self.sessions)
+        self.unplaced = set(range(len(self.sessions)))
+
+    # -- estado ---------------------------------------------------------
+
+    def _place(self, i: int, placement: Placement):
+        day, start, room, teacher = placement
+        bits = slot_bits(start, self.sessions[i].length)
+        self.room_mask[(room, day)] = self.room_mask.get((room, day), 0) | bits
+        self.teacher_mask[(teacher, day)] = self.teacher_mask.get((teacher, day), 0) | bits
+        self.room_owners.setdefault((room, day), []).append(i)
+        self.teacher_owners.setdefault((teacher, day), []).append(i)
+        key = (self.sessions[i].subject_id, day)
+        self.subject_day[key] = self.subject_day.get(key, 0) + 1
+        self.placements[i] = placement
+        self.unplaced.discard(i)
+
+    def _remove(self, i: int):
+        day, start, room, teacher = self.placements[i]
+        bits = slot_bits(start, self.sessions[i].length)
+        self.room_mask[(room, day)] &= ~bits
+        self.teacher_mask[(teacher, day)] &= ~bits
+        self.room_owners[(room, day)].remove(i)
+        self.teacher_owners[(teacher, day)].remove(i)
+        self.subject_day[(self.sessions[i].subject_id, day)] -= 1
+        self.placements[i] = None
+        self.unplaced.add(i)
+
+    def _fixed_conflict(self, room: int, teacher: int, day: int, bits: int) -> bool:
+        return bool(
+            self.problem.busy_rooms.get((room, day), 0) & bits
+            or self.problem.busy_teachers.get((teacher, day), 0) & bits
+        )
+
+    # -- costes ---------------------------------------------------------
+
+    def _room_cost(self, i: int, room: int) -> float:
+        students = self.sessions[i].students
+        capacity = self.capacity[room]
+        if not students or not capacity:
+            return 0.0
+        return CAPACITY_WASTE_PENALTY * (capacity - students) / capacity
+
+    def _cost(self, i: int, placement: Placement) -> float:
+        """Penalización de ubicar la sesión `i` dado el resto del estado"""
+        session = self.sessions[i]
+        day, _, room, teacher = placement
+        return (
+            SAME_DAY_PENALTY * self.subject_day.get((session.subject_id, day), 0)
+            + SECONDARY_TEACHER_PENALTY * session.teachers.index(teacher)
+            + self._room_cost(i, room)
+        )
+
+    def penalty(self) -> float:
+        total = 0.0
+        for i, placement in enumerate(self.placements):
+            if placement is None:
+                continue
+            session = self.sessions[i]
+            total += SECONDARY_TEACHER_PENALTY * session.teachers.index(placement[3])
+            total += self._room_cost(i, placement[2])
+        for count in self.subject_day.values():
+            total += SAME_DAY_PENALTY * count * (count - 1) / 2
+        return total
+
+    # -- movimientos ----------------------------------------------------
+
+    def _best_insertion(self, i: int) -> Tuple[Optional[Placement], float]:
+        """Mejor ubicación factible para la sesión `i` (sin expulsar a nadie)"""
+        session = self.sessions[i]
+        best, best_cost = None, math.inf
+        days = list(self.problem.days)
+        self.rng.shuffle(days)
+        starts = list(self.starts[session.length])
+        self.rng.shuffle(starts)
+
+        for day in days:
+            same_day = SAME_DAY_PENALTY * self.subject_day.get((session.subject_id, day), 0)
+            if same_day >= best_cost:
+                continue
+            for start in starts:
+                bits = slot_bits(start, session.length)
+                for rank, teacher in enumerate(session.teachers):
+                    base = same_day + SECONDARY_TEACHER_PENALTY * rank
+                    if base >= best_cost:
+                        break
+                    if (self.teacher_mask.get((teacher, day), 0)
+                            | self.problem.busy_teachers.get((teacher, day), 0)) & bits:
+                        continue
+                    # Las aulas están ordenadas por capacidad: la primera libre es la de menor desperdicio
+                    for room in self.fitting[i]:
+                        if (self.room_mask.get((room, day), 0)
+                                | self.problem.busy_rooms.get((room, day), 0)) & bits:
+                            continue
+                        cost = base + self._room_cost(i, room)
+                        if cost < best_cost:
+                            best, best_cost = (day, start, room, teacher), cost
+                        break
+        return best, best_cost
+
+    def _overlapping(self, owners: Dict[Tuple[int, int], List[int]], key, bits: int) -> List[int]:
+        result = []
+        for j in owners.get(key, ()):
+            _, start, _, _ = self.placements[j]
+            if slot_bits(start, self.sessions[j].length) & bits:
+                result.append(j)
+        return result
+
+    def _repair(self, i: int):
+        """Ubica una sesión pendiente expulsando las que estorban y reubicándolas"""
+        session = self.sessions[i]
+        if not self.fitting[i] or not self.starts[session.length]:
+            return
+        day = self.rng.choice(self.problem.days)
+        start = self.rng.choice(self.starts[session.length])
+        room = self.rng.choice(self.fitting[i])
+        teacher = self.rng.choice(session.teachers)
+        bits = slot_bits(start, session.length)
+        if self._fixed_conflict(room, teacher, day, bits):
+            return
+
+        victims = set(self._overlapping(self.room_owners, (room, day), bits))
+        victims.update(self._overlapping(self.teacher_owners, (teacher, day), bits))
+        before = len(self.unplaced)
+        previous = {j: self.placements[j] for j in victims}
+
+        for j in victims:
+            self._remove(j)
+        self._place(i, (day, start, room, teacher))
+        reinserted = []
+        for j in victims:
+            placement, _ = self._best_insertion(j)
+            if placement is not None:
+                self._place(j, placement)
+                reinserted.append(j)
+
+        if len(self.unplaced) > before:
+            for j in reinserted:
+                self._remove(j)
+            self._remove(i)
+            for j, placement in previous.items():
+                self._place(j, placement)
+
+    def _improve(self, i: int) -> bool:
+        """Reubica una sesión si existe una posición más barata"""
+        current = self.placements[i]
+        if current is None:
+            return False
+        self._remove(i)
+        current_cost = self._cost(i, current)
+        placement, cost = self._best_insertion(i)
+        if placement is not None and cost < current_cost - 1e-9:
+            self._place(i, placement)
+            return True
+        self._place(i, current)
+        return False
+
+    # -- algoritmo ------------------------------------------------------
+
+    def construct(self):
+        order = sorted(
+            range(len(self.sessions)),
+            key=lambda i: (
+                len(self.sessions[i].teachers),
+                len(self.fitting[i]),
+                -self.sessions[i].length,
+                self.rng.random(),
+            ),
+        )
+        for i in order:
+            placement, _ = self._best_insertion(i)
+            if placement is not None:
+                self._place(i, placement)
+
+    def local_search(self, deadline: float) -> int:
+        iterations = 0
+        stagnant = 0
+        limit = STAGNATION_FACTOR * max(len(self.sessions), 1)
+        while time.monotonic() < deadline and stagnant < limit:
+            iterations += 1
+            if self.unplaced:
+                before = len(self.unplaced)
+                self._repair(self.rng.choice(tuple(self.unplaced)))
+                stagnant = 0 if len(self.unplaced) < before else stagnant + 1
+            else:
+                improved = self._improve(self.rng.randrange(len(self.sessions)))
+                stagnant = 0 if improved else stagnant + 1
+        return iterations
+
+
+def solve(problem: Problem, seed: int, time_budget: float) -> Solution:
+    """Resolver el problema con una semilla dentro del presupuesto de tiempo (segundos)"""
+    deadline = time.monotonic() + time_budget
+    solver = _Solver(problem, seed)
+    solver.construct()
+    iterations = solver.local_search(deadline)
+    return Solution(
+        seed=seed,
+        placements=list(solver.placements),
+        unplaced=len(solver.unplaced),
+        penalty=round(solver.penalty(), 4),
+        iterations=iterations,
+    )
+
+
+def solve_parallel(
+    problem: Problem,
+    seeds: Sequence[int],
+    time_budget: float,
+    workers: int,
+    on_progress: Optional[Callable[[int, Solution], None]] = None,
+) -> Solution:
+    """Resolver con varias semillas en paralelo y devolver la mejor solución
+
+    El presupuesto se reparte entre las tandas necesarias cuando hay más
+    semillas que procesos, de modo que el tiempo total no lo supere.
+    """
+    workers = max(1, min(workers, len(seeds)))
+    per_seed = time_budget / math.ceil(len(seeds) / workers)
+    best: Optional[Solution] = None
+    done = 0
+
+    def collect(solution: Solution):
+        nonlocal best, done
+        done += 1
+        if best is None or solution.score < best.score:
+            best = solution
+        if on_progress is not None:
+            on_progress(done, best)
+
+    if workers == 1:
+        for seed in seeds:
+            collect(solve(problem, seed, per_seed))
+        return best
+
+    # El pool de procesos solo se importa al generar (arranque más rápido)
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        futures = [pool.submit(solve, problem, seed, per_seed) for seed in seeds]
+        for future in as_completed(futures):
+            collect(future.result())
+    return best
@@ -0,0 +1,315 @@
+"""
+Trabajos de generación automática de horarios.
+
+Carga los datos del semestre, ejecuta el motor de `app.services.timetable` en
+un hilo de fondo e inserta el resultado en una única transacción.
+"""
+import math
+import os
+import threading
+import time as clock
+import uuid
+from collections import Counter, OrderedDict
+from dataclasses import dataclass, field
+from datetime import datetime, time, timezone
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import and_, insert
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.database import SessionLocal
+from app.models.class_type import ClassType
+from app.models.classroom import Classroom
+from app.models.schedule import Schedule
+from app.models.subject import Subject
+from app.models.subject_teacher import SubjectTeacher
+from app.models.teacher import Teacher
+from app.schemas.timetable import TimetableGenerateRequest
+from app.services import occurrences, timetable, versioning
+from app.services.interval_index import schedule_index
+from app.services.occupancy import occupancy_index
+from app.services.timetable import SLOT_MINUTES, slot_bits
+
+# Cantidad de trabajos terminados que se conservan en memoria
+MAX_FINISHED_JOBS = 100
+
+
+@dataclass
+class GenerationJob:
+    id: str
+    semester: str
+    time_budget: float
+    seeds_total: int
+    status: str = "pending"  # pending, running, completed, failed
+    seeds_done: int = 0
+    best_unplaced: Optional[int] = None
+    best_penalty: Optional[float] = None
+    created: int = 0
+    unplaced: List[dict] = field(default_factory=list)
+    message: Optional[str] = None
+    created_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    started: Optional[float] = None
+    finished_at: Optional[datetime] = None
+
+    @property
+    def progress(self) -> float:
+        if self.status in ("completed", "failed"):
+            return 1.0
+        if self.started is None:
+            return 0.0
+        elapsed = (clock.monotonic() - self.started) / self.time_budget
+        return round(min(max(elapsed, self.seeds_done / self.seeds_total), 0.99), 3)
+
+
+_jobs: "OrderedDict[str, GenerationJob]" = OrderedDict()
+_jobs_lock = threading.Lock()
+
+
+def _to_slot(value: time, round_up: bool = False) -> int:
+    minutes = value.hour * 60 + value.minute + value.second / 60
+    slots = minutes / SLOT_MINUTES
+    return math.ceil(slots) if round_up else int(slots)
+
+
+def _to_time(slot: int) -> time:
+    minutes = slot * SLOT_MINUTES
+    return time(minutes // 60, minutes % 60)
+
+
+def build_problem(db: Session, request: TimetableGenerateRequest) -> timetable.Problem:
+    """Construir el problema de planificación a partir de la base de datos"""
+    if request.week_end < request.week_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La fecha de fin del semestre es anterior a la de inicio"
+        )
+    if request.day_end <= request.day_start:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La hora de fin de la jornada debe ser posterior a la de inicio"
+        )
+    if any(day < 0 or day > 6 for day in request.days):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Día de la semana inválido (0=Lunes, 6=Domingo)"
+        )
+
+    subject_ids = {d.subject_id for d in request.demands}
+    class_type_ids = {d.class_type_id for d in request.demands}
+
+    found = {s.id for s in db.query(Subject.id).filter(
+        Subject.id.in_(subject_ids), Subject.is_active == True
+    )}
+    if found != subject_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Asignatura no encontrada"
+        )
+    found = {c.id for c in db.query(ClassType.id).filter(ClassType.id.in_(class_type_ids))}
+    if found != class_type_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Tipo de clase no encontrado"
+        )
+
+    # Profesores habilitados por asignatura, el principal primero
+    qualified: Dict[int, List[int]] = {}
+    rows = (
+        db.query(SubjectTeacher.subject_id, SubjectTeacher.teacher_id, SubjectTeacher.is_primary)
+        .join(Teacher, Teacher.id == SubjectTeacher.teacher_id)
+        .filter(SubjectTeacher.subject_id.in_(subject_ids), Teacher.is_active == True)
+        .order_by(SubjectTeacher.is_primary.desc(), SubjectTeacher.teacher_id)
+        .all()
+    )
+    for row in rows:
+        qualified.setdefault(row.subject_id, []).append(row.teacher_id)
+
+    step = max(1, request.start_step_minutes // SLOT_MINUTES)
+    sessions = []
+    for demand in request.demands:
+        teachers = qualified.get(demand.subject_id, [])
+        if demand.teacher_id is not None:
+            if demand.teacher_id not in teachers:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="El profesor indicado no imparte esta asignatura"
+                )
+            teachers = [demand.teacher_id]
+        if not teachers:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"La asignatura {demand.subject_id} no tiene profesores asignados"
+            )
+        length = math.ceil(demand.duration_minutes / SLOT_MINUTES)
+        session = timetable.Session(
+            subject_id=demand.subject_id,
+            class_type_id=demand.class_type_id,
+            teachers=tuple(teachers),
+            length=length,
+            students=demand.students,
+        )
+        sessions.extend([session] * demand.sessions_per_week)
+
+    rooms = [
+        timetable.Room(id=c.id, capacity=c.capacity)
+        for c in db.query(Classroom.id, Classroom.capacity).filter(Classroom.is_active == True)
+    ]
+    if not rooms:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No hay aulas activas disponibles"
+        )
+
+    problem = timetable.Problem(
+        sessions=sessions,
+        rooms=rooms,
+        days=tuple(sorted(set(request.days))),
+        first_slot=_to_slot(request.day_start, round_up=True),
+        last_slot=_to_slot(request.day_end),
+        start_step=step,
+    )
+    problem.busy_rooms, problem.busy_teachers = _occupancy(db, request)
+    return problem
+
+
+def _occupancy(db: Session, request: TimetableGenerateRequest):
+    """Máscaras de ocupación de aulas y profesores ya planificados en el semestre
+
+    Una clase trasladada o sustituida dentro del periodo ocupa su franja en
+    todas las semanas: el horario generado se repite en cada una.
+    """
+    rooms: Dict[tuple, int] = {}
+    teachers: Dict[tuple, int] = {}
+    rows = db.query(
+        Schedule.classroom_id, Schedule.teacher_id, Schedule.day_of_week,
+        Schedule.start_time, Schedule.end_time
+    ).filter(and_(Schedule.semester == request.semester, Schedule.is_active == True))
+    busy = [tuple(row) for row in rows]
+    busy.extend(
+        (occurrence.classroom_id, occurrence.teacher_id, occurrence.date.weekday(),
+         occurrence.start_time, occurrence.end_time)
+        for occurrence in occurrences.resolved_exceptions(
+            db, request.semester, request.week_start, request.week_end
+        )
+    )
+    for classroom_id, teacher_id, day, start_time, end_time in busy:
+        start = _to_slot(start_time)
+        # Los horarios antiguos con la hora de fin invertida no ocupan nada
+        bits = slot_bits(start, max(0, _to_slot(end_time, round_up=True) - start))
+        key = (classroom_id, day)
+        rooms[key] = rooms.get(key, 0) | bits
+        key = (teacher_id, day)
+        teachers[key] = teachers.get(key, 0) | bits
+    return rooms, teachers
+
+
+def _unplaced_report(problem: timetable.Problem, solution: timetable.Solution) -> List[dict]:
+    counts = Counter(
+        (s.subject_id, s.class_type_id)
+        for s, placement in zip(problem.sessions, solution.placements)
+        if placement is None
+    )
+    return [
+        {"subject_id": subject_id, "class_type_id": class_type_id, "count": count}
+        for (subject_id, class_type_id), count in sorted(counts.items())
+    ]
+
+
+def _persist(request: TimetableGenerateRequest, problem: timetable.Problem,
+             solution: timetable.Solution) -> int:
+    """Insertar la solución en una única transacción"""
+    db = SessionLocal()
+    try:
+        # Otro usuario pudo ocupar aulas o profesores mientras se resolvía
+        busy_rooms, busy_teachers = _occupancy(db, request)
+        rows = []
+        for session, placement in zip(problem.sessions, solution.placements):
+            if placement is None:
+                continue
+            day, start, room, teacher = placement
+            bits = slot_bits(start, session.length)
+            if busy_rooms.get((room, day), 0) & bits or busy_teachers.get((teacher, day), 0) & bits:
+                raise ValueError("El semestre fue modificado durante la generación")
+            rows.append({
+                "subject_id": session.subject_id,
+                "class_type_id": session.class_type_id,
+                "classroom_id": room,
+                "teacher_id": teacher,
+                "day_of_week": day,
+                "start_time": _to_time(start),
+                "end_time": _to_time(start + session.length),
+                "semester": request.semester,
+                "week_start": request.week_start,
+                "week_end": request.week_end,
+                "notes": "Generado automáticamente",
+                "is_active": True,
+            })
+        if rows:
+            db.execute(insert(Schedule), rows)
+            versioning.record_change(db, "schedules", [request.semester])
+        db.commit()
+        schedule_index.invalidate(request.semester)
+        occupancy_index.invalidate(request.semester)
+        return len(rows)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        db.close()
+
+
+def _run(job: GenerationJob, request: TimetableGenerateRequest, problem: timetable.Problem):
+    job.status = "running"
+    job.started = clock.monotonic()
+
+    def on_progress(done: int, best: timetable.Solution):
+        job.seeds_done = done
+        job.best_unplaced = best.unplaced
+        job.best_penalty = best.penalty
+
+    try:
+        workers = settings.timetable_workers or os.cpu_count() or 1
+        seeds = [uuid.uuid4().int % (2 ** 31) for _ in range(job.seeds_total)]
+        best = timetable.solve_parallel(problem, seeds, job.time_budget, workers, on_progress)
+        job.unplaced = _unplaced_report(problem, best)
+        if not request.dry_run:
+            job.created = _persist(request, problem, best)
+        job.status = "completed"
+        if best.unplaced:
+            job.message = f"{best.unplaced} sesiones no pudieron ubicarse"
+    except Exception as exc:
+        job.status = "failed"
+        job.message = str(exc)
+    finally:
+        job.finished_at = datetime.now(timezone.utc)
+
+
+def start_generation(db: Session, request: TimetableGenerateRequest) -> GenerationJob:
+    """Validar la solicitud y lanzar la generación en segundo plano"""
+    problem = build_problem(db, request)
+    job = GenerationJob(
+        id=uuid.uuid4().hex,
+        semester=request.semester,
+        time_budget=request.time_budget_seconds or settings.timetable_time_budget,
+        seeds_total=request.seeds,
+    )
+    with _jobs_lock:
+        if any(j.semester == request.semester and j.status in ("pending", "running")
+               for j in _jobs.values()):
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Ya hay una generación en curso para este semestre"
+            )
+        _jobs[job.id] = job
+        finished = [k for k, j in _jobs.items() if j.status in ("completed", "failed")]
+        for key in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del _jobs[key]
+
+    threading.Thread(target=_run, args=(job, request, problem), daemon=True).start()
+    return job
+
+
+def get_job(job_id: str) -> Optional[GenerationJob]:
+    return _jobs.get(job_id)
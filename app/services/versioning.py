@@ -0,0 +1,121 @@
+"""
+Contadores de cambios por tabla y por semestre.
+
+Cada escritura llama a `record_change` antes de su commit, de modo que el
+incremento forma parte de la misma transacción. Las escrituras de horarios
+solo incrementan los semestres afectados y la versión de la tabla se deriva
+de ellos: no hay una fila común que bloquee hasta el commit las escrituras
+de semestres distintos. Los contadores viven en la
+base de datos y son por tanto comunes a todos los workers y sobreviven a los
+reinicios, lo que permite usarlos como versión de los datos en las cachés.
+`record_change` publica además la escritura en el bus de invalidación
+(`app.services.invalidation`) para las cachés en memoria de cada worker.
+"""
+from datetime import datetime, timezone
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import func, literal, or_, select, union_all, update
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+
+from app.models.change_counter import ChangeCounter
+from app.services import invalidation
+
+REFERENCE_TABLES = ("subjects", "teachers", "classrooms", "class_types")
+# Tablas cuya versión es la suma de la de todos los semestres
+SEMESTER_TABLES = ("schedules",)
+
+
+def table_scope(table: str) -> str:
+    return f"table:{table}"
+
+
+def semester_scope(semester: str) -> str:
+    return f"semester:{semester}"
+
+
+def _bump(db: Session, scope: str):
+    dialect = db.get_bind().dialect.name
+    if dialect in ("postgresql", "sqlite"):
+        insert = pg_insert if dialect == "postgresql" else sqlite_insert
+        statement = insert(ChangeCounter).values(scope=scope, version=1)
+        db.execute(statement.on_conflict_do_update(
+            index_elements=[ChangeCounter.scope],
+            set_={"version": ChangeCounter.version + 1, "updated_at": func.now()},
+        ))
+        return
+    result = db.execute(
+        update(ChangeCounter)
+        .where(ChangeCounter.scope == scope)
+        .values(version=ChangeCounter.version + 1)
+    )
+    if result.rowcount == 0:
+        db.add(ChangeCounter(scope=scope, version=1))
+        db.flush()
+
+
+def record_change(
+    db: Session, table: str, semesters: Iterable[Optional[str]] = (), ids: Iterable[Optional[int]] = ()
+):
+    """Incrementar la versión de la tabla y de los semestres afectados y publicar el cambio"""
+    semesters = sorted({s for s in semesters if s})
+    ids = sorted({i for i in ids if i is not None})
+    scopes = {semester_scope(s) for s in semesters}
+    if table not in SEMESTER_TABLES or not scopes:
+        scopes.add(table_scope(table))
+    for scope in sorted(scopes):
+        _bump(db, scope)
+    invalidation.publish(db, [
+        invalidation.Event(table, row_id, semester)
+        for row_id in ids or [None]
+        for semester in semesters or [None]
+    ])
+
+
+def _counters(db: Session, scopes: List[str]) -> list:
+    """Filas (ámbito, versión, último cambio) de los ámbitos, en una sola consulta"""
+    derived = {table_scope(table) for table in SEMESTER_TABLES}
+    statements = []
+    plain = [scope for scope in scopes if scope not in derived]
+    if plain:
+        statements.append(
+            select(ChangeCounter.scope, ChangeCounter.version, ChangeCounter.updated_at)
+            .where(ChangeCounter.scope.in_(plain))
+        )
+    for scope in derived.intersection(scopes):
+        statements.append(
+            select(literal(scope), func.sum(ChangeCounter.version), func.max(ChangeCounter.updated_at))
+            .where(or_(ChangeCounter.scope == scope, ChangeCounter.scope.like(semester_scope("%"))))
+            .having(func.count() > 0)
+        )
+    if not statements:
+        return []
+    statement = statements[0] if len(statements) == 1 else union_all(*statements)
+    return db.execute(statement).all()
+
+
+def versions(db: Session, scopes: Iterable[str]) -> Dict[str, int]:
+    """Versión actual de cada ámbito (0 si nunca cambió) en una sola consulta"""
+    scopes = list(scopes)
+    found = {scope: version for scope, version, _ in _counters(db, scopes)}
+    return {scope: found.get(scope, 0) for scope in scopes}
+
+
+def snapshot(db: Session, scopes: Iterable[str]) -> Tuple[Dict[str, int], Optional[datetime]]:
+    """Versiones de los ámbitos y fecha (UTC) de su último cambio, en una sola consulta"""
+    scopes = list(scopes)
+    rows = _counters(db, scopes)
+    found = {scope: version for scope, version, _ in rows}
+    changed = [
+        updated_at if updated_at.tzinfo else updated_at.replace(tzinfo=timezone.utc)
+        for _, _, updated_at in rows if updated_at is not None
+    ]
+    return {scope: found.get(scope, 0) for scope in scopes}, max(changed, default=None)
+
+
+def semester_data_version(db: Session, semester: str) -> str:
+    """Versión de los datos que intervienen en los horarios de un semestre"""
+    scopes = [semester_scope(semester)] + [table_scope(t) for t in REFERENCE_TABLES]
+    current = versions(db, scopes)
+    return ".".join(str(current[scope]) for scope in scopes)
@@ -0,0 +1,216 @@
+"""
+Arranque del servicio: esquema, precalentamiento y tiempos.
+
+`SCHEMA_MANAGEMENT` decide qué se hace con el esquema al arrancar:
+`create_all` (desarrollo: crear las tablas que falten), `migrations` (el
+esquema es de Alembic; solo se comprueba que la base de datos está en la
+última revisión, sin DDL ni reflexión) o `none`. `STARTUP_PREWARM` lista lo
+que se carga antes de aceptar peticiones; lo demás se carga en el primer uso.
+
+Los tiempos de cada fase se guardan en `phases`, se registran en el log y se
+publican en /metrics.
+"""
+import ast
+import logging
+import os
+import re
+import time
+from typing import Callable, Dict, List, Set
+
+from sqlalchemy import select, text
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.pool import QueuePool
+
+from app.config import settings
+
+# app.main importa este módulo antes que nada: referencia para la fase de imports
+IMPORT_STARTED = time.perf_counter()
+
+SCHEMA_MODES = ("create_all", "migrations", "none")
+PREWARM_TARGETS = ("pool", "indexes", "references", "exports", "analytics", "timetable")
+
+logger = logging.getLogger(__name__)
+phases: Dict[str, float] = {}
+
+_VERSIONS = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "alembic", "versions")
+_ASSIGNMENT = re.compile(r"^(revision|down_revision)\s*(?::[^=]*)?=\s*(.+?)\s*$", re.MULTILINE)
+
+
+def create_tables(engine: Engine):
+    """Crear las tablas que falten a partir de los modelos"""
+    import app.models  # noqa: F401  (registrar todos los modelos)
+    from app.database import Base
+
+    Base.metadata.create_all(bind=engine)
+
+
+def migration_heads() -> Set[str]:
+    """Revisiones de alembic/versions de las que no parte ninguna otra
+
+    Se leen las asignaciones `revision`/`down_revision` de cada archivo en vez
+    de importar Alembic, que costaría más que todo el resto del arranque.
+    """
+    revisions, parents = set(), set()
+    for name in os.listdir(_VERSIONS):
+        if not name.endswith(".py"):
+            continue
+        with open(os.path.join(_VERSIONS, name), encoding="utf-8") as f:
+            values = dict(_ASSIGNMENT.findall(f.read()))
+        if "revision" not in values:
+            continue
+        revisions.add(ast.literal_eval(values["revision"]))
+        down = ast.literal_eval(values.get("down_revision", "None"))
+        parents.update(down if isinstance(down, tuple) else [down] if down else [])
+    return revisions - parents
+
+
+def check_migrations(engine: Engine):
+    """Exigir que la base de datos esté en la última revisión de Alembic"""
+    expected = migration_heads()
+    with engine.connect() as connection:
+        try:
+            current = set(connection.execute(text("SELECT version_num FROM alembic_version")).scalars())
+        except DBAPIError:
+            current = set()
+    if current != expected:
+        raise RuntimeError(
+            f"La base de datos no está en la última migración "
+            f"(actual: {', '.join(sorted(current)) or 'ninguna'}; "
+            f"esperada: {', '.join(sorted(expected))}). Ejecute `alembic upgrade head`."
+        )
+
+
+def prepare_schema(engine: Engine):
+    mode = settings.schema_management
+    if mode == "create_all":
+        create_tables(engine)
+    elif mode == "migrations":
+        check_migrations(engine)
+    elif mode != "none":
+        raise ValueError(f"SCHEMA_MANAGEMENT debe ser uno de {', '.join(SCHEMA_MODES)}")
+
+
+def prewarm_targets() -> List[str]:
+    targets = [target.strip() for target in settings.startup_prewarm.split(",") if target.strip()]
+    unknown = set(targets) - set(PREWARM_TARGETS)
+    if unknown:
+        raise ValueError(
+            f"STARTUP_PREWARM admite {', '.join(PREWARM_TARGETS)} (recibido: {', '.join(sorted(unknown))})"
+        )
+    return targets
+
+
+def _pool_size(engine: Engine) -> int:
+    return engine.pool.size() if isinstance(engine.pool, QueuePool) else 1
+
+
+def _warm_pool(engine: Engine):
+    # Abrir las conexiones fijas del pool para que las primeras peticiones no esperen
+    connections = []
+    try:
+        for _ in range(_pool_size(engine)):
+            connections.append(engine.connect())
+    finally:
+        for connection in connections:
+            connection.close()
+
+
+async def _warm_async_pool(async_engine):
+    connections = []
+    try:
+        for _ in range(_pool_size(async_engine.sync_engine)):
+            connections.append(await async_engine.connect())
+    finally:
+        for connection in connections:
+            await connection.close()
+
+
+def _active_semesters(db) -> List[str]:
+    from app.models.schedule import Schedule
+
+    return list(db.execute(
+        select(Schedule.semester).where(Schedule.is_active == True).distinct()
+    ).scalars())
+
+
+def _warm_indexes(engine: Engine):
+    from app.database import SessionLocal
+    from app.services.interval_index import schedule_index
+    from app.services.occupancy import occupancy_index
+
+    with SessionLocal() as db:
+        for semester in _active_semesters(db):
+            schedule_index.warm(db, semester)
+            occupancy_index.warm(db, semester)
+
+
+def _warm_references(engine: Engine):
+    from app.database import SessionLocal
+    from app.services.reference_cache import reference_cache
+
+    with SessionLocal() as db:
+        reference_cache.snapshot(db)
+
+
+def _warm_exports(engine: Engine):
+    from app.services import excel_export
+
+    excel_export.preload()
+
+
+def _warm_analytics(engine: Engine):
+    from app.database import SessionLocal
+    from app.services.analytics import analytics_cache
+
+    with SessionLocal() as db:
+        for semester in _active_semesters(db):
+            analytics_cache.frame(db, semester)
+
+
+def _warm_timetable(engine: Engine):
+    import multiprocessing  # noqa: F401
+    from concurrent.futures import ProcessPoolExecutor  # noqa: F401
+
+
+_PREWARM: Dict[str, Callable[[Engine], None]] = {
+    "pool": _warm_pool,
+    "indexes": _warm_indexes,
+    "references": _warm_references,
+    "exports": _warm_exports,
+    "analytics": _warm_analytics,
+    "timetable": _warm_timetable,
+}
+
+
+def run(engine: Engine) -> Dict[str, float]:
+    """Preparar el esquema y precalentar; devuelve la duración de cada fase en segundos"""
+    started = time.perf_counter()
+    phases["imports"] = started - IMPORT_STARTED
+    prepare_schema(engine)
+    phases["schema"] = time.perf_counter() - started
+    for target in prewarm_targets():
+        target_started = time.perf_counter()
+        _PREWARM[target](engine)
+        phases[f"prewarm_{target}"] = time.perf_counter() - target_started
+    phases["total"] = time.perf_counter() - IMPORT_STARTED
+    _log()
+    return dict(phases)
+
+
+def _log():
+    logger.info(
+        "Servicio listo en %.3fs (%s)", phases["total"],
+        ", ".join(f"{name}={seconds:.3f}s" for name, seconds in phases.items() if name != "total"),
+    )
+
+
+async def run_async(async_engine):
+    """Precalentar el pool del engine asíncrono si `pool` está en STARTUP_PREWARM"""
+    if "pool" not in prewarm_targets():
+        return
+    started = time.perf_counter()
+    await _warm_async_pool(async_engine)
+    phases["prewarm_pool_async"] = time.perf_counter() - started
+    phases["total"] = time.perf_counter() - IMPORT_STARTED
+    _log()
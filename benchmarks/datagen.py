@@ -0,0 +1,131 @@
+"""
+Generador determinista de datos sintéticos para los benchmarks.
+
+Con la misma escala y semilla produce siempre los mismos registros. Los
+horarios se reparten sin solapamientos de aula ni de profesor, en bloques de
+dos horas de lunes a sábado, y se insertan por lotes con executemany.
+"""
+import random
+from dataclasses import asdict
+from datetime import date, time
+from typing import Dict, List
+
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.models.class_type import ClassType
+from app.models.classroom import Classroom
+from app.models.schedule import Schedule
+from app.models.subject import Subject
+from app.models.teacher import Teacher
+from app.services import versioning
+from benchmarks.scales import Scale
+
+BATCH_SIZE = 5000
+DAYS = range(6)  # Lunes a Sábado
+BLOCK_STARTS = (7, 9, 11, 13, 15, 17, 19)  # bloques de dos horas
+
+_CLASS_TYPES = (
+    ("Conferencia", "C"), ("Clase Práctica", "CP"), ("Laboratorio", "L"), ("Seminario", "S"),
+)
+_FIRST_NAMES = ("Ana", "Luis", "María", "Jorge", "Elena", "Raúl", "Carmen", "Pedro", "Lucía", "Óscar")
+_LAST_NAMES = ("Pérez", "García", "Rodríguez", "López", "Fernández", "Martínez", "Díaz", "Sánchez")
+
+
+def _bulk_insert(db: Session, model, rows: List[dict]):
+    for offset in range(0, len(rows), BATCH_SIZE):
+        db.execute(insert(model), rows[offset:offset + BATCH_SIZE])
+
+
+def _schedules(scale: Scale, rng: random.Random) -> List[dict]:
+    per_semester = -(-scale.schedules // scale.semesters)
+    capacity = min(scale.classrooms, scale.teachers) * len(DAYS) * len(BLOCK_STARTS)
+    if per_semester > capacity:
+        raise ValueError(
+            f"{per_semester} horarios por semestre no caben en {capacity} bloques "
+            f"({scale.classrooms} aulas, {scale.teachers} profesores)"
+        )
+    rows = []
+    for semester in scale.semester_names():
+        year = int(semester.split("-")[0])
+        cells = [(day, block, room) for day in DAYS for block in BLOCK_STARTS
+                 for room in range(1, scale.classrooms + 1)]
+        rng.shuffle(cells)
+        busy_teachers = set()
+        quota = min(per_semester, scale.schedules - len(rows))
+        placed = 0
+        for day, block, room in cells:
+            if placed >= quota:
+                break
+            teacher = None
+            for _ in range(20):
+                candidate = rng.randint(1, scale.teachers)
+                if (day, block, candidate) not in busy_teachers:
+                    teacher = candidate
+                    break
+            if teacher is None:
+                continue
+            busy_teachers.add((day, block, teacher))
+            placed += 1
+            rows.append({
+                "subject_id": rng.randint(1, scale.subjects),
+                "class_type_id": rng.randint(1, len(_CLASS_TYPES)),
+                "classroom_id": room,
+                "teacher_id": teacher,
+                "day_of_week": day,
+                "start_time": time(block, 0),
+                "end_time": time(block + 2, 0),
+                "semester": semester,
+                "week_start": date(year, 2, 5),
+                "week_end": date(year, 6, 28),
+                "is_active": True,
+            })
+    return rows
+
+
+def generate(db: Session, scale: Scale) -> Dict[str, int]:
+    """Insertar los datos de `scale` en una base vacía y devolver los conteos"""
+    rng = random.Random(scale.seed)
+    _bulk_insert(db, ClassType, [
+        {"name": name, "acronym": acronym, "is_active": True} for name, acronym in _CLASS_TYPES
+    ])
+    _bulk_insert(db, Teacher, [
+        {
+            "employee_id": f"EMP{i:06d}",
+            "first_name": rng.choice(_FIRST_NAMES),
+            "last_name": rng.choice(_LAST_NAMES),
+            "email": f"profesor{i}@bench.cujae.edu.cu",
+            "department": f"Departamento {i % 12 + 1}",
+            "is_active": True,
+        }
+        for i in range(1, scale.teachers + 1)
+    ])
+    _bulk_insert(db, Classroom, [
+        {
+            "code": f"A{i:05d}",
+            "name": f"Aula {i}",
+            "building": f"Edificio {i % 8 + 1}",
+            "capacity": rng.choice((20, 30, 40, 60, 120)),
+            "is_active": True,
+        }
+        for i in range(1, scale.classrooms + 1)
+    ])
+    _bulk_insert(db, Subject, [
+        {
+            "code": f"ASG{i:05d}",
+            "name": f"Asignatura {i}",
+            "acronym": f"S{i}"[:10],
+            "credits": rng.randint(2, 6),
+            "is_active": True,
+        }
+        for i in range(1, scale.subjects + 1)
+    ])
+    schedules = _schedules(scale, rng)
+    _bulk_insert(db, Schedule, schedules)
+    for table in versioning.REFERENCE_TABLES:
+        versioning.record_change(db, table)
+    versioning.record_change(db, "schedules", scale.semester_names())
+    db.commit()
+    counts = asdict(scale)
+    counts["schedules"] = len(schedules)
+    return counts
@@ -0,0 +1,226 @@
+"""
+Benchmarks de las rutas críticas.
+
+Uso:
+    python -m benchmarks.run --scale small
+    python -m benchmarks.run --scale medium --output results.json --baseline benchmarks/baseline.json
+    python -m benchmarks.run --database-url postgresql://... --reset --scale medium
+
+Sin `--database-url` se usa un SQLite temporal. Con cualquier otra base de
+datos `--reset` es obligatorio, porque se borran y recrean todas las tablas.
+Los casos llaman directamente a los endpoints y servicios (sin HTTP) y cada
+resultado incluye mínimo, mediana, p95 y media en milisegundos. Si se indica
+una línea base, un caso cuya mediana supere la de la base en más de
+`--tolerance` se marca como regresión y el proceso termina con código 1.
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, time as dtime, timezone
+from typing import Callable, Dict, List
+
+from benchmarks.scales import SCALES
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmarks de CUJAE Calendar")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--database-url", help="Base de datos de pruebas (por defecto, SQLite temporal)")
+    parser.add_argument("--reset", action="store_true", help="Borrar y recrear las tablas de --database-url")
+    parser.add_argument("--repeat", type=int, default=20, help="Repeticiones por caso")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument("--baseline", help="Resultados previos con los que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento admitido (0.25 = 25%%)")
+    parser.add_argument("--case", action="append", help="Ejecutar solo estos casos")
+    return parser.parse_args(argv)
+
+
+def _timings(func: Callable[[], None], repeat: int) -> Dict[str, float]:
+    func()  # calentamiento: carga de índices y cachés de consultas
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    samples.sort()
+    return {
+        "repeat": repeat,
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "p95_ms": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def _cases(SessionLocal, scale) -> Dict[str, Callable[[], None]]:
+    from fastapi import HTTPException, Response
+    from pydantic import TypeAdapter
+
+    from app.api.v1.endpoints import schedules as endpoints
+    from app.models.schedule import Schedule
+    from app.schemas.schedule import ScheduleCreate, ScheduleResponse
+    from app.api import fast_json
+    from app.services import excel_export, schedule_stream
+    from app.services.reference_cache import reference_cache
+
+    rng = random.Random(scale.seed)
+    semester = scale.semester_names()[0]
+    db = SessionLocal()
+    busiest_teacher = db.query(Schedule.teacher_id).filter(Schedule.semester == semester).first()[0]
+    teacher = reference_cache.snapshot(db)["teachers"][busiest_teacher]
+    serializer = TypeAdapter(List[ScheduleResponse])
+    free_slots = iter(
+        (room, hour) for hour in range(7, 21) for room in range(1, scale.classrooms + 1)
+    )
+
+    def candidate(day: int, hour: int, room: int, teacher_id: int) -> ScheduleCreate:
+        return ScheduleCreate(
+            subject_id=1, class_type_id=1, classroom_id=room, teacher_id=teacher_id,
+            day_of_week=day, start_time=dtime(hour, 0), end_time=dtime(hour + 1, 0),
+            semester=semester, week_start="2020-02-05", week_end="2020-06-28",
+        )
+
+    def conflict_check():
+        # Mezcla de candidatos libres y ocupados en los días con horarios
+        for _ in range(100):
+            schedule = candidate(
+                rng.randrange(6), rng.randrange(7, 21),
+                rng.randint(1, scale.classrooms), rng.randint(1, scale.teachers),
+            )
+            try:
+                endpoints._check_conflicts(db, schedule)
+            except HTTPException:
+                pass
+
+    def create_schedule():
+        # El domingo está libre en los datos generados: cada alta es válida
+        room, hour = next(free_slots)
+        endpoints.create_schedule(candidate(6, hour, room, room % scale.teachers + 1), db=db)
+
+    def list_filtered():
+        endpoints.get_schedules(Response(), semester=semester, teacher_id=busiest_teacher, db=db)
+        page = json.loads(endpoints.get_schedules(Response(), semester=semester, cursor="", limit=500, db=db).body)
+        endpoints.get_schedules(Response(), semester=semester, cursor=page["next_cursor"], limit=500, db=db)
+
+    def export_weekly():
+        rows = excel_export.load_schedules(db, semester)
+        excel_export.write_weekly_workbook(io.BytesIO(), semester, rows, reference_cache.snapshot(db))
+
+    def export_teacher():
+        rows = excel_export.load_schedules(db, semester, teacher_id=busiest_teacher)
+        excel_export.write_teacher_workbook(io.BytesIO(), teacher, rows, reference_cache.snapshot(db))
+
+    def list_serialization():
+        # Camino anterior de los listados: objetos ORM validados uno a uno con Pydantic
+        rows = db.query(Schedule).filter(Schedule.semester == semester).order_by(Schedule.id).limit(1000).all()
+        serializer.dump_json(serializer.validate_python(rows, from_attributes=True))
+        db.expunge_all()
+
+    def list_fast_json():
+        endpoints.get_schedules(Response(), semester=semester, limit=1000, db=db)
+
+    def stream_semester():
+        for _ in fast_json.gzip(fast_json.ndjson(schedule_stream.batches(semester))):
+            pass
+
+    return {
+        "schedule_conflict_check_x100": conflict_check,
+        "create_schedule": create_schedule,
+        "get_schedules_filtered": list_filtered,
+        "export_weekly": export_weekly,
+        "export_teacher": export_teacher,
+        "list_serialization_1000": list_serialization,
+        "list_fast_json_1000": list_fast_json,
+        "stream_semester_gzip": stream_semester,
+    }
+
+
+def compare(results: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Casos cuya mediana empeoró más de `tolerance` respecto a la línea base"""
+    regressions = []
+    for name, current in results["results"].items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous or not previous.get("median_ms"):
+            continue
+        ratio = current["median_ms"] / previous["median_ms"]
+        current["baseline_median_ms"] = previous["median_ms"]
+        current["ratio"] = round(ratio, 3)
+        if ratio > 1 + tolerance:
+            regressions.append(
+                f"{name}: {current['median_ms']} ms frente a {previous['median_ms']} ms (x{ratio:.2f})"
+            )
+    return regressions
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    if args.database_url and not args.reset:
+        print("Con --database-url hay que indicar --reset (se borran todas las tablas)", file=sys.stderr)
+        return 2
+    workdir = tempfile.mkdtemp(prefix="cujae-bench-")
+    database_url = args.database_url or f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    # La configuración se lee al importar la aplicación
+    os.environ["DATABASE_URL"] = database_url
+    os.environ["DATABASE_ASYNC"] = "false"
+    os.environ.setdefault("EXPORT_ARTIFACT_DIR", os.path.join(workdir, "exports"))
+    os.environ.setdefault("EXPORT_CACHE_DIR", os.path.join(workdir, "exports", "cache"))
+
+    from app.database import Base, SessionLocal, engine
+    import app.models  # noqa: F401 (registrar todas las tablas)
+    from benchmarks.datagen import generate
+
+    scale = SCALES[args.scale]
+    Base.metadata.drop_all(bind=engine)
+    Base.metadata.create_all(bind=engine)
+    start = time.perf_counter()
+    db = SessionLocal()
+    try:
+        counts = generate(db, scale)
+    finally:
+        db.close()
+    load_seconds = time.perf_counter() - start
+
+    cases = _cases(SessionLocal, scale)
+    selected = args.case or list(cases)
+    results = {
+        "meta": {
+            "scale": args.scale,
+            "data": counts,
+            "load_seconds": round(load_seconds, 3),
+            "dialect": engine.dialect.name,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": {},
+    }
+    for name in selected:
+        results["results"][name] = _timings(cases[name], args.repeat)
+        print(f"{name}: {results['results'][name]['median_ms']} ms", file=sys.stderr)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    for regression in regressions:
+        print(f"REGRESIÓN {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
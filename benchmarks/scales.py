@@ -0,0 +1,26 @@
+"""
+Escalas de datos de los benchmarks (sin dependencias de la aplicación, para
+poder elegirlas antes de configurar la base de datos).
+"""
+from dataclasses import dataclass
+from typing import Dict, List
+
+
+@dataclass(frozen=True)
+class Scale:
+    teachers: int
+    classrooms: int
+    subjects: int
+    schedules: int
+    semesters: int
+    seed: int = 42
+
+    def semester_names(self) -> List[str]:
+        return [f"{2020 + i // 2}-{i % 2 + 1}" for i in range(self.semesters)]
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(teachers=50, classrooms=30, subjects=40, schedules=2_000, semesters=2),
+    "medium": Scale(teachers=300, classrooms=150, subjects=200, schedules=20_000, semesters=4),
+    "large": Scale(teachers=1_000, classrooms=400, subjects=600, schedules=80_000, semesters=6),
+}
@@ -0,0 +1,128 @@
+"""
+Tiempo de arranque del servicio.
+
+Uso:
+    python -m benchmarks.startup
+    python -m benchmarks.startup --schema-management migrations --prewarm indexes,exports
+    python -m benchmarks.startup --baseline startup-baseline.json --max-seconds 3
+
+Cada repetición arranca un intérprete nuevo que importa `app.main` y ejecuta
+los eventos de arranque, así que incluye el coste de los imports. Se informa
+del tiempo total del proceso (`process`) y de cada fase de `app.startup`, con
+el mismo formato y la misma comparación con una línea base que
+`benchmarks.run`. Con `--max-seconds`, una mediana de `process` mayor también
+hace terminar con código 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List
+
+from benchmarks.run import compare
+
+_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_CHILD = """
+import asyncio, json
+from app.main import app
+from app import startup
+asyncio.run(app.router.startup())
+asyncio.run(app.router.shutdown())
+print(json.dumps(startup.phases))
+"""
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Tiempo de arranque de CUJAE Calendar")
+    parser.add_argument("--database-url", help="Base de datos (por defecto, SQLite temporal migrado)")
+    parser.add_argument("--schema-management", default="migrations", help="create_all, migrations o none")
+    parser.add_argument("--prewarm", default="", help="Valor de STARTUP_PREWARM")
+    parser.add_argument("--repeat", type=int, default=5, help="Arranques a medir")
+    parser.add_argument("--output", help="Archivo JSON de resultados (por defecto, salida estándar)")
+    parser.add_argument("--baseline", help="Resultados previos con los que comparar")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Empeoramiento admitido (0.25 = 25%%)")
+    parser.add_argument("--max-seconds", type=float, help="Máximo admitido para la mediana de `process`")
+    return parser.parse_args(argv)
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    samples = sorted(seconds * 1000 for seconds in samples)
+    return {
+        "repeat": len(samples),
+        "min_ms": round(samples[0], 3),
+        "median_ms": round(statistics.median(samples), 3),
+        "max_ms": round(samples[-1], 3),
+        "mean_ms": round(statistics.fmean(samples), 3),
+    }
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    workdir = tempfile.mkdtemp(prefix="cujae-startup-")
+    env = dict(
+        os.environ,
+        DATABASE_URL=args.database_url or f"sqlite:///{os.path.join(workdir, 'startup.db')}",
+        DATABASE_ASYNC=os.environ.get("DATABASE_ASYNC", "false"),
+        SCHEMA_MANAGEMENT=args.schema_management,
+        STARTUP_PREWARM=args.prewarm,
+        EXPORT_ARTIFACT_DIR=os.path.join(workdir, "exports"),
+        EXPORT_CACHE_DIR=os.path.join(workdir, "exports", "cache"),
+    )
+    if not args.database_url:
+        subprocess.run(
+            [sys.executable, "-m", "alembic", "upgrade", "head"],
+            cwd=_ROOT, env=env, check=True, capture_output=True,
+        )
+
+    samples: Dict[str, List[float]] = {"process": []}
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        child = subprocess.run(
+            [sys.executable, "-c", _CHILD], cwd=_ROOT, env=env, check=True, capture_output=True, text=True,
+        )
+        samples["process"].append(time.perf_counter() - start)
+        for phase, seconds in json.loads(child.stdout.strip().splitlines()[-1]).items():
+            samples.setdefault(phase, []).append(seconds)
+
+    results = {
+        "meta": {
+            "schema_management": args.schema_management,
+            "prewarm": args.prewarm,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "timestamp": datetime.now(timezone.utc).isoformat(),
+        },
+        "results": {phase: _stats(values) for phase, values in samples.items()},
+    }
+    for phase, stats in results["results"].items():
+        print(f"{phase}: {stats['median_ms']} ms", file=sys.stderr)
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        results["regressions"] = regressions
+    median = results["results"]["process"]["median_ms"]
+    if args.max_seconds is not None and median > args.max_seconds * 1000:
+        regressions.append(f"process: {median} ms supera el máximo de {args.max_seconds * 1000:g} ms")
+
+    output = json.dumps(results, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    for regression in regressions:
+        print(f"REGRESIÓN {regression}", file=sys.stderr)
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Script para importar profesores, asignaturas o aulas desde CSV o XLSX
+
+Uso:
+    python scripts/import_reference.py teachers profesores.xlsx --report informe.csv
+    python scripts/import_reference.py subjects asignaturas.csv
+
+El informe tiene una línea por fila del archivo (fila, resultado, clave, id,
+errores) y se escribe a medida que se guarda cada lote; sin `--report` va a
+la salida estándar. El resumen se imprime en la salida de errores.
+"""
+import argparse
+import csv
+import os
+import sys
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database import SessionLocal
+from app.services import reference_import, schedule_import
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Importar datos de referencia")
+    parser.add_argument("table", choices=sorted(reference_import.TARGETS))
+    parser.add_argument("file", help="Archivo .csv o .xlsx con una fila de cabecera")
+    parser.add_argument("--report", help="Archivo CSV del informe por fila (por defecto, salida estándar)")
+    parser.add_argument("--batch-size", type=int, default=reference_import.BATCH_SIZE)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    if args.file.lower().endswith(".xlsx"):
+        read = schedule_import.read_xlsx
+    elif args.file.lower().endswith(".csv"):
+        read = schedule_import.read_csv
+    else:
+        print("Formato de archivo no soportado (use .csv o .xlsx)", file=sys.stderr)
+        return 2
+
+    report = open(args.report, "w", encoding="utf-8", newline="") if args.report else sys.stdout
+    db = SessionLocal()
+    totals = {reference_import.CREATED: 0, reference_import.UPDATED: 0, reference_import.FAILED: 0}
+    try:
+        writer = csv.writer(report)
+        writer.writerow(["fila", "resultado", "clave", "id", "errores"])
+        with open(args.file, "rb") as stream:
+            rows = read(stream, keep_empty=True)
+            for outcome in reference_import.upsert(db, args.table, rows, args.batch_size):
+                totals[outcome.status] += 1
+                writer.writerow([
+                    outcome.row, outcome.status, outcome.key or "", outcome.id or "", "; ".join(outcome.errors)
+                ])
+    finally:
+        db.close()
+        if report is not sys.stdout:
+            report.close()
+
+    print(
+        f"{sum(totals.values())} filas: {totals['created']} creadas, "
+        f"{totals['updated']} actualizadas, {totals['failed']} con errores",
+        file=sys.stderr,
+    )
+    return 1 if totals[reference_import.FAILED] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())